@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from utils.AccelRenderer import apply_crop_resize, compute_video_crop_and_size, plan_crop_resize  # noqa: E402
+
+
+class _SourceGeometry:
+    """compute_video_crop_and_size 只读取 width / height"""
+
+    def __init__(self, width: int, height: int):
+        self.width = width
+        self.height = height
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Compare resize-then-crop against crop-then-resize for chart video frames."
+    )
+    parser.add_argument("--game-type", default="maimai", choices=["maimai", "chunithm"])
+    parser.add_argument("--output", default="1920x1080", help="Output resolution, e.g. 1920x1080")
+    parser.add_argument("--sources", default="1280x720,1920x1080,2560x1440,3840x2160",
+                        help="Comma separated source resolutions")
+    parser.add_argument("--frames", type=int, default=200, help="Iterations per case")
+    parser.add_argument("--interpolation", default="linear", choices=["linear", "area"],
+                        help="Interpolation used by the crop-then-resize path")
+    return parser.parse_args()
+
+
+def _parse_size(text: str) -> tuple:
+    w, h = text.lower().split("x")
+    return int(w), int(h)
+
+
+def resize_then_crop(frame: np.ndarray, target_size: tuple, crop_rect: tuple):
+    """渲染循环中原有的顺序：整帧缩放后切片"""
+    resized = cv2.resize(frame, target_size)
+    if crop_rect:
+        x1, y1, x2, y2 = crop_rect
+        x1, y1 = max(0, x1), max(0, y1)
+        x2 = min(resized.shape[1], x2)
+        y2 = min(resized.shape[0], y2)
+        resized = resized[y1:y2, x1:x2]
+    return resized
+
+
+def time_per_frame(func, frames: int) -> float:
+    func()
+    t_start = time.perf_counter()
+    for _ in range(frames):
+        func()
+    return (time.perf_counter() - t_start) / frames
+
+
+def main() -> int:
+    args = parse_args()
+    resolution = _parse_size(args.output)
+    rng = np.random.default_rng(0)
+
+    print(f"{args.game_type} @ {resolution[0]}x{resolution[1]}, {args.frames} iterations per case, "
+          f"crop+resize uses {args.interpolation}")
+    for source in args.sources.split(","):
+        src_w, src_h = _parse_size(source)
+        frame = rng.integers(0, 256, (src_h, src_w, 3), dtype=np.uint8)
+        target_size, crop_rect, _ = compute_video_crop_and_size(
+            args.game_type, _SourceGeometry(src_w, src_h), resolution)
+        interpolation = cv2.INTER_AREA if args.interpolation == "area" else cv2.INTER_LINEAR
+        plan = plan_crop_resize((src_w, src_h), target_size, crop_rect, interpolation)
+
+        before = time_per_frame(lambda: resize_then_crop(frame, target_size, crop_rect), args.frames)
+        after = time_per_frame(lambda: apply_crop_resize(frame, plan), args.frames)
+
+        reference = resize_then_crop(frame, target_size, crop_rect).astype(np.int16)
+        diff = np.abs(apply_crop_resize(frame, plan).astype(np.int16) - reference)
+        print(f"  {source:>10} -> {plan['out_size'][0]}x{plan['out_size'][1]}  "
+              f"resize+crop {before * 1000:6.2f} ms   crop+resize {after * 1000:6.2f} ms   "
+              f"speedup {before / after:4.2f}x   max diff {int(diff.max()):3d}   mean diff {diff.mean():.3f}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -5,6 +5,7 @@ import os
 from datetime import datetime
 from utils.PageUtils import load_style_config, open_file_explorer, read_global_config, write_global_config, get_game_type_text
 from utils.PathUtils import get_user_media_dir
+from utils.AccelRenderer import resolve_render_engine
 from utils.VideoUtils import render_all_video_clips, combine_full_video_direct, combine_full_video_ffmpeg_concat_gl, render_complete_full_video
 from db_utils.DatabaseDataHandler import get_database_handler
 
@@ -93,7 +94,7 @@ with st.container(border=True):
             index=_mode_index)
     
     no_main_clip = st.checkbox("生成视频片段时，跳过全部曲目片段（仅生成开场、结尾）", value=False)
-    force_render_clip = st.checkbox("生成视频片段时，强制覆盖已存在的视频文件（否则将跳过同名片段的生成）", value=False)
+    force_render_clip = st.checkbox("生成视频片段时，强制覆盖已存在的视频文件（否则将跳过内容未变化的同名片段）", value=False)
 
 trans_config_placeholder = st.empty()
 with trans_config_placeholder.container(border=True):
@@ -117,17 +118,81 @@ with st.container(border=True):
     st.write("视频帧率")
     v_fps = st.number_input("输出帧率 (fps)", min_value=24, max_value=120, value=_video_fps, step=1)
 
-_gpu_accel = G_config.get('USE_GPU_ACCEL', False)
+_render_engine = resolve_render_engine(G_config.get('USE_GPU_ACCEL', False))
+_render_engines = ["moviepy", "numpy"] + (["taichi"] if st.session_state.taichi_accel_installed else [])
+_render_engine_labels = {"moviepy": "MoviePy（CPU，兼容模式）", "numpy": "NumPy 加速（CPU）", "taichi": "Taichi GPU 加速"}
+if _render_engine not in _render_engines:
+    _render_engine = "numpy"
 with st.container(border=True):
-    st.markdown("##### 🚀 GPU 加速渲染（实验性）")
-    gpu_accel = st.checkbox(
-        "启用 Taichi GPU 加速",
-        value=_gpu_accel and st.session_state.taichi_accel_installed,
-        disabled=not st.session_state.taichi_accel_installed,
-        help="使用 Taichi GPU 合成 + FFmpeg 硬件编码加速视频渲染。如果无法勾选，请在主页检查是否安装Taichi加速组件。"
-             "启用后将自动检测最佳 GPU 后端（CUDA/Vulkan/Metal）和硬件编码器（NVENC/VideoToolbox 等）。"
+    st.markdown("##### 🚀 加速渲染（实验性）")
+    render_engine = st.selectbox(
+        "渲染引擎", _render_engines,
+        index=_render_engines.index(_render_engine),
+        format_func=lambda e: _render_engine_labels[e],
+        help="NumPy 加速与 Taichi GPU 加速使用相同的加速渲染管线（OpenCV 解码 + FFmpeg 硬件编码），"
+             "区别在于逐帧合成在 CPU（NumPy/OpenCV）还是 GPU（Taichi）上完成。没有可用 GPU 时推荐 NumPy 加速。"
+             "如果没有 Taichi 选项，请在主页检查是否安装Taichi加速组件。"
+             "Taichi 将自动检测最佳 GPU 后端（CUDA/Vulkan/Metal），编码器自动检测（NVENC/VideoToolbox 等）。"
+    )
+    # 以下选项及进度显示对 NumPy / Taichi 两个加速引擎都生效
+    gpu_accel = render_engine != "moviepy"
+    _render_workers = G_config.get('RENDER_WORKERS', 1)
+    _parallel_modes = ["thread", "process"]
+    _parallel_mode = G_config.get('RENDER_PARALLEL_MODE', 'thread')
+    pcol1, pcol2 = st.columns(2)
+    render_workers = pcol1.number_input(
+        "同时渲染片段数", min_value=1, max_value=8, value=int(_render_workers), step=1,
+        disabled=not gpu_accel,
+        help="同时渲染多个片段，重叠解码、合成与编码以提高 GPU/CPU 利用率。"
+             "注意：消费级 NVIDIA 显卡的 NVENC 同时编码会话数有限（通常为 3~8 个），超出时编码会失败。"
+    )
+    parallel_mode = pcol2.selectbox(
+        "并行方式", _parallel_modes,
+        index=_parallel_modes.index(_parallel_mode) if _parallel_mode in _parallel_modes else 0,
+        format_func=lambda m: "线程（共享 GPU 合成）" if m == "thread" else "进程（CPU 合成）",
+        disabled=not gpu_accel,
+    )
+    _decoders = ["opencv", "ffmpeg", "ffmpeg_hw"]
+    _decoder_labels = {"opencv": "OpenCV（默认）", "ffmpeg": "FFmpeg", "ffmpeg_hw": "FFmpeg 硬件解码"}
+    _decoder = G_config.get('VIDEO_DECODER', 'opencv')
+    video_decoder = st.selectbox(
+        "谱面视频解码方式", _decoders,
+        index=_decoders.index(_decoder) if _decoder in _decoders else 0,
+        format_func=lambda d: _decoder_labels[d],
+        disabled=not gpu_accel,
+        help="FFmpeg 解码时由 FFmpeg 滤镜完成帧率转换、缩放与裁剪；"
+             "硬件解码使用 -hwaccel auto（NVDEC/VideoToolbox/QSV 等），可减轻 AV1/H.264 源的 CPU 解码压力。"
+    )
+    render_batch_size = st.number_input(
+        "Taichi 批量合成帧数", min_value=1, max_value=16,
+        value=int(G_config.get('RENDER_BATCH_SIZE', 4)), step=1,
+        disabled=render_engine != "taichi",
+        help="每次向 GPU 工作线程提交的帧数。批量提交可摊薄逐帧的线程同步与 kernel 启动开销，"
+             "对 60fps 的短片段效果最明显；数值越大占用的内存越多。"
+    )
+    pipe_yuv = st.checkbox(
+        "以 yuv420p 格式向 FFmpeg 传输帧",
+        value=G_config.get('RENDER_PIPE_PIX_FMT', 'rgb24') == 'yuv420p',
+        disabled=not gpu_accel,
+        help="在合成后直接转换为 yuv420p 再送入编码器，管道数据量减半并省去 FFmpeg 的颜色转换，"
+             "1440p/4K 输出时效果最明显。要求输出宽高为偶数。"
+    )
+    keep_intermediate = st.checkbox(
+        "保留不含评论文字的中间视频（加快修改评论后的重新生成）",
+        value=bool(G_config.get('RENDER_KEEP_INTERMEDIATE', False)),
+        disabled=not gpu_accel,
+        help="生成片段时额外保存一份不含评论文字的高质量中间视频（输出目录下的 .intermediate 文件夹）。"
+             "之后只修改了评论文字的片段直接在中间视频上重新叠加文字，不再重新解码与合成谱面视频。"
+             "中间视频会占用额外的磁盘空间。"
+    )
+    direct_full_video = st.checkbox(
+        "直接生成完整视频（单次编码，不保存片段）",
+        value=bool(G_config.get('RENDER_DIRECT_FULL_VIDEO', False)),
+        disabled=not gpu_accel,
+        help="生成完整视频时，所有片段的画面依次直接送入同一个编码器，转场在合成时完成，"
+             "音频在同一次编码中混合与均衡化，不生成片段文件和拼接临时文件。"
+             "此模式下不能跳过未修改的片段，也不会并行渲染片段；仅对生成完整视频生效。"
     )
-    gpu_accel = gpu_accel and st.session_state.taichi_accel_installed
 
 v_mode_index = options.index(mode_str)
 v_bitrate_kbps = f"{v_bitrate}k"
@@ -163,7 +228,14 @@ def save_video_render_config():
     G_config['VIDEO_FPS'] = v_fps
     G_config['VIDEO_TRANS_ENABLE'] = trans_enable
     G_config['VIDEO_TRANS_TIME'] = trans_time
-    G_config['USE_GPU_ACCEL'] = gpu_accel
+    G_config['USE_GPU_ACCEL'] = render_engine
+    G_config['RENDER_WORKERS'] = render_workers
+    G_config['RENDER_PARALLEL_MODE'] = parallel_mode
+    G_config['RENDER_PIPE_PIX_FMT'] = 'yuv420p' if pipe_yuv else 'rgb24'
+    G_config['VIDEO_DECODER'] = video_decoder
+    G_config['RENDER_BATCH_SIZE'] = render_batch_size
+    G_config['RENDER_KEEP_INTERMEDIATE'] = keep_intermediate
+    G_config['RENDER_DIRECT_FULL_VIDEO'] = direct_full_video
     write_global_config(G_config)
     st.toast("配置已保存！")
 
@@ -211,7 +283,7 @@ if st.button("开始生成视频", use_container_width=True, type="primary"):
                         ending_configs=ending_configs,
                         trans_time=trans_time,
                         force_render=force_render_clip,
-                        use_gpu_accel=gpu_accel,
+                        use_gpu_accel=render_engine,
                         progress_callback=progress_cb
                     )
                     if not gpu_accel:
@@ -240,7 +312,7 @@ if st.button("开始生成视频", use_container_width=True, type="primary"):
                         video_trans_enable=trans_enable,
                         video_trans_time=trans_time,
                         full_last_clip=False,
-                        use_gpu_accel=gpu_accel,
+                        use_gpu_accel=render_engine,
                         progress_callback=progress_cb,
                         force_render=force_render_clip
                     )
@@ -290,7 +362,7 @@ with st.expander("展开其他视频生成方案"):
                             video_trans_enable=trans_enable,
                             video_trans_time=trans_time,
                             full_last_clip=False,
-                            use_gpu_accel=True,
+                            use_gpu_accel=render_engine,
                             progress_callback=progress_cb,
                             force_render=force_render_clip
                         )
@@ -5,8 +5,8 @@ AccelRenderer.py - 加速渲染管线
 提供与 VideoUtils.py 兼容的 API，可作为可选后端使用。
 """
 
+import collections
 import os
-import shutil
 import subprocess
 import traceback
 import time
@@ -16,6 +16,7 @@ from PIL import Image
 from typing import Optional, Tuple, List
 
 from utils.PageUtils import remove_invalid_chars
+from utils.ProbeCache import get_ffmpeg_binary
 
 
 # ============================================================================
@@ -26,19 +27,6 @@ _FFMPEG_MIN_VERSION = (5, 0)  # 最低要求 FFmpeg 5.0（NVENC 新版 preset AP
 _ffmpeg_version_checked = False
 
 
-def get_ffmpeg_binary(tool_name: str = 'ffmpeg') -> str:
-    """解析 FFmpeg 工具路径，优先使用运行目录中的打包二进制。"""
-    executable = f"{tool_name}.exe" if os.name == 'nt' else tool_name
-    local_path = os.path.join(os.getcwd(), executable)
-    if os.path.exists(local_path):
-        return local_path
-
-    resolved = shutil.which(tool_name)
-    if resolved:
-        return resolved
-
-    raise FileNotFoundError(f"未找到 {executable}")
-
 def check_ffmpeg_version():
     """检测 FFmpeg 版本，低于最低要求时抛出 RuntimeError。
 
@@ -149,43 +137,19 @@ def get_ffmpeg_encoder_args(codec: str, bitrate: str = "5000k") -> list:
         return ['-c:v', 'libx264', '-b:v', bitrate, '-preset', 'medium']
 
 
-# ============================================================================
-# 音频响度测量
-# ============================================================================
-
-import re as _re
-
-def _measure_audio_rms(audio_path: str, start: float = 0, duration: float = None) -> float:
-    """使用 FFmpeg volumedetect 测量音频片段的 RMS 电平 (dB)
-    
-    Returns:
-        float: mean_volume in dB, or -20.0 if measurement fails
-    """
-    cmd = [get_ffmpeg_binary('ffmpeg'), '-hide_banner', '-loglevel', 'info']
-    if start > 0:
-        cmd += ['-ss', str(start)]
-    if duration:
-        cmd += ['-t', str(duration)]
-    cmd += ['-i', audio_path, '-af', 'volumedetect', '-f', 'null', '-']
-    
-    try:
-        result = subprocess.run(cmd, capture_output=True, text=True, timeout=30)
-        match = _re.search(r'mean_volume:\s*([-\d.]+)\s*dB', result.stderr)
-        if match:
-            return float(match.group(1))
-    except Exception as e:
-        print(f"[AccelRenderer] Warning: 音频RMS测量失败: {e}")
-    return -20.0  # fallback: 假设已在目标电平
-
-
 # ============================================================================
 # 视频帧读取工具
 # ============================================================================
 
 class VideoFrameReader:
-    """使用 OpenCV 读取视频帧，支持顺序读取模式避免随机 seek 开销"""
+    """使用 OpenCV 读取视频帧，支持顺序读取模式避免随机 seek 开销
 
-    def __init__(self, video_path: str):
+    sequential=True 时启用帧率转换读取模式：get_frame 只向前解码，
+    源帧率高于输出帧率时用 grab() 丢弃中间帧，低于输出帧率时重复上一帧，
+    仅在首次读取或时间轴回退（如循环背景视频回到开头）时 seek。
+    """
+
+    def __init__(self, video_path: str, sequential: bool = False):
         self.path = video_path
         self.cap = cv2.VideoCapture(video_path)
         if not self.cap.isOpened():
@@ -195,36 +159,77 @@ class VideoFrameReader:
         self.width = int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH))
         self.height = int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
         self.duration = self.frame_count / self.fps if self.fps > 0 else 0
+        self.sequential = sequential
+        self.seek_count = 0
         self._current_pos = 0
+        # 顺序模式下缓存最近解码的帧，用于低帧率源的重复帧
+        self._last_idx = -1
+        self._last_frame = None
 
-    def seek_to(self, time_sec: float):
-        """定位到指定时间点，用于开始顺序读取前的初始定位"""
-        frame_idx = int(time_sec * self.fps)
-        frame_idx = max(0, min(frame_idx, self.frame_count - 1))
+    def _time_to_index(self, time_sec: float) -> int:
+        # 加微小偏移，避免 t * fps 的浮点误差（如 20.999999）导致多余的重复/丢帧
+        frame_idx = int(time_sec * self.fps + 1e-6)
+        return max(0, min(frame_idx, self.frame_count - 1))
+
+    def _seek_index(self, frame_idx: int):
         self.cap.set(cv2.CAP_PROP_POS_FRAMES, frame_idx)
         self._current_pos = frame_idx
+        self._last_idx = -1
+        self._last_frame = None
+        self.seek_count += 1
+
+    def seek_to(self, time_sec: float):
+        """定位到指定时间点，用于开始顺序读取前的初始定位"""
+        self._seek_index(self._time_to_index(time_sec))
 
     def read_next(self) -> Optional[np.ndarray]:
         """顺序读取下一帧 (RGB uint8)，避免随机 seek 开销"""
         ret, frame = self.cap.read()
         if ret:
+            self._last_idx = self._current_pos
             self._current_pos += 1
             return cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
         return None
 
     def get_frame(self, time_sec: float) -> Optional[np.ndarray]:
         """获取指定时间点的帧 (RGB uint8)，需要随机访问时使用"""
-        frame_idx = int(time_sec * self.fps)
-        frame_idx = max(0, min(frame_idx, self.frame_count - 1))
+        frame_idx = self._time_to_index(time_sec)
+        if self.sequential:
+            return self._get_frame_sequential(frame_idx)
         if frame_idx != self._current_pos:
-            self.cap.set(cv2.CAP_PROP_POS_FRAMES, frame_idx)
-            self._current_pos = frame_idx
+            self._seek_index(frame_idx)
         ret, frame = self.cap.read()
         if ret:
             self._current_pos += 1
             return cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
         return None
 
+    def _get_frame_sequential(self, frame_idx: int) -> Optional[np.ndarray]:
+        """帧率转换读取：只向前解码，按输出时间轴丢帧或重复帧。
+
+        返回的帧在下一次解码前会被重复返回，调用方不应原地修改。
+        """
+        if frame_idx == self._last_idx and self._last_frame is not None:
+            return self._last_frame
+
+        # 仅在首次读取（尚未定位）或时间轴回退时 seek
+        if (self._last_frame is None and frame_idx != self._current_pos) or frame_idx < self._current_pos:
+            self._seek_index(frame_idx)
+
+        # 丢弃中间帧：grab() 只解复用+解码，不做 retrieve 和颜色转换
+        while self._current_pos < frame_idx:
+            if not self.cap.grab():
+                return None
+            self._current_pos += 1
+
+        ret, frame = self.cap.read()
+        if not ret:
+            return None
+        self._current_pos += 1
+        self._last_idx = frame_idx
+        self._last_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        return self._last_frame
+
     def close(self):
         if self.cap:
             self.cap.release()
@@ -233,43 +238,190 @@ class VideoFrameReader:
         self.close()
 
 
+def probe_video_stream(video_path: str) -> dict:
+    """使用 ffprobe 读取首个视频流的宽高、帧率与时长（按文件大小/mtime 缓存，见 ProbeCache）"""
+    from utils.ProbeCache import probe_media
+    info = probe_media(video_path)
+    if info is None:
+        raise IOError(f"ffprobe 无法读取视频: {video_path}")
+    if not info.get('video_codec'):
+        raise IOError(f"未找到视频流: {video_path}")
+    return {key: info[key] for key in ("width", "height", "fps", "duration", "frame_count")}
+
+
+class FFmpegFrameReader:
+    """
+    使用 FFmpeg 子进程解码谱面视频，可选硬件解码（-hwaccel）。
+
+    open_stream 之后由 FFmpeg 滤镜链完成 帧率转换 → 裁剪 → 缩放，
+    输出尺寸的 rgb24 原始帧经管道 readinto 到预分配的环形缓冲区，
+    Python 端不再逐帧 cvtColor / resize。
+    width / height / fps / duration 来自 ffprobe，
+    compute_video_crop_and_size 等几何计算与 VideoFrameReader 通用。
+    """
+
+    def __init__(self, video_path: str, hwaccel: str = None):
+        self.path = video_path
+        self.hwaccel = hwaccel
+        info = probe_video_stream(video_path)
+        self.width, self.height = info['width'], info['height']
+        self.fps = info['fps']
+        self.duration = info['duration']
+        self.frame_count = info['frame_count']
+        self.process = None
+        self._buffers = []
+        self._buf_idx = 0
+
+    def _input_args(self, start: float) -> list:
+        cmd = [get_ffmpeg_binary('ffmpeg'), '-hide_banner', '-loglevel', 'error', '-nostdin']
+        if self.hwaccel:
+            cmd += ['-hwaccel', self.hwaccel]
+        if start > 0:
+            cmd += ['-ss', f'{start:.3f}']
+        return cmd + ['-i', self.path]
+
+    def get_frame(self, time_sec: float) -> Optional[np.ndarray]:
+        """解码单帧原始分辨率 RGB（用于居中检测等一次性分析）"""
+        cmd = self._input_args(time_sec) + [
+            '-frames:v', '1', '-an', '-f', 'rawvideo', '-pix_fmt', 'rgb24', 'pipe:1']
+        result = subprocess.run(cmd, capture_output=True, timeout=60)
+        frame_bytes = self.width * self.height * 3
+        if result.returncode != 0 or len(result.stdout) < frame_bytes:
+            return None
+        return np.frombuffer(result.stdout[:frame_bytes], dtype=np.uint8).reshape(self.height, self.width, 3)
+
+    def open_stream(self, start: float, duration: float, fps: float,
+                    scale_size: tuple, crop_rect: tuple = None, num_buffers: int = 2):
+        """
+        启动顺序解码：从 start 开始、时长 duration，输出帧率 fps，
+        输出等价于先缩放到 scale_size (w, h) 再按 crop_rect (x1, y1, x2, y2, 缩放后坐标) 裁剪，
+        实际在源坐标上先裁剪再缩放（见 plan_crop_resize）。
+
+        num_buffers: 环形缓冲区数量。read_next 返回的帧在之后 num_buffers-1 次
+        调用内保持有效，流水线中需不少于在途帧数。
+        """
+        self.close()
+        # 与 OpenCV 路径相同：先在源坐标裁剪，再缩放
+        plan = plan_crop_resize((self.width, self.height), scale_size, crop_rect)
+        filters = [f'fps={fps}']
+        sx1, sy1, sx2, sy2 = plan["src_rect"]
+        if (sx1, sy1, sx2, sy2) != (0, 0, self.width, self.height):
+            filters.append(f'crop={sx2 - sx1}:{sy2 - sy1}:{sx1}:{sy1}')
+        flags = 'area' if plan["interpolation"] == cv2.INTER_AREA else 'bilinear'
+        filters.append(f'scale={plan["resize_size"][0]}:{plan["resize_size"][1]}:flags={flags}')
+        if plan["post_crop"]:
+            x1, y1, x2, y2 = plan["post_crop"]
+            filters.append(f'crop={x2 - x1}:{y2 - y1}:{x1}:{y1}')
+        out_w, out_h = plan["out_size"]
+        self.out_size = (out_w, out_h)
+
+        cmd = self._input_args(start)
+        if duration:
+            cmd += ['-t', f'{duration:.3f}']
+        cmd += ['-an', '-vf', ','.join(filters), '-f', 'rawvideo', '-pix_fmt', 'rgb24', 'pipe:1']
+        self.process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        self._buffers = [np.empty((out_h, out_w, 3), dtype=np.uint8) for _ in range(max(1, num_buffers))]
+        self._buf_idx = 0
+
+    def read_next(self) -> Optional[np.ndarray]:
+        """读取下一帧到环形缓冲区并返回该缓冲区；流结束时返回 None"""
+        if self.process is None:
+            return None
+        buf = self._buffers[self._buf_idx]
+        self._buf_idx = (self._buf_idx + 1) % len(self._buffers)
+        view = memoryview(buf).cast('B')
+        filled = 0
+        while filled < len(view):
+            n = self.process.stdout.readinto(view[filled:])
+            if not n:
+                return None
+            filled += n
+        return buf
+
+    def close(self):
+        if self.process is not None:
+            if self.process.stdout:
+                self.process.stdout.close()
+            if self.process.poll() is None:
+                self.process.kill()
+            self.process.wait()
+            if self.process.stderr:
+                self.process.stderr.close()
+            self.process = None
+
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass
+
+
 # ============================================================================
 # FFmpeg 写入管线
 # ============================================================================
 
 class FFmpegWriter:
-    """通过 stdin pipe 向 FFmpeg 写入原始帧数据"""
+    """
+    通过 stdin pipe 向 FFmpeg 写入原始帧数据
+
+    threaded=True 时使用双缓冲写入线程：write_frame 只把帧拷贝到两块自有缓冲区之一
+    并立即返回，管道写入阻塞（FFmpeg 编码跟不上）不再阻塞合成循环。
+
+    input_pix_fmt="yuv420p" 时管道输入为平面 I420 帧 (H*3/2, W)，每像素 1.5 字节，
+    FFmpeg 不再做 RGB→YUV 转换；传入 RGB 帧时在 Python 端用 OpenCV 转换。
+
+    encoder_args 覆盖按 codec/bitrate 生成的视频编码参数（如中间文件使用的高质量编码）；
+    include_audio=False 时输出不含音频流（不生成静音音轨）。
+    force_key_frames 为需要强制关键帧 (IDR) 的时间点（秒），见 transition_keyframe_times。
+    audio_inputs / audio_filter: 外部构建的音频滤镜图（输入参数列表与输出 [aout] 的 filter_complex），
+    用于整片流式渲染时混合所有片段的音频，此时忽略 audio_path 等单片段音频参数。
+    """
 
     def __init__(self, output_path: str, width: int, height: int,
                  fps: int = 30, codec: str = None, bitrate: str = "5000k",
                  audio_path: str = None, audio_start: float = 0, audio_duration: float = None,
                  audio_fade_in: float = 0, audio_fade_out: float = 0,
-                 volume_adjust_db: float = 0):
+                 volume_adjust_db: float = 0, threaded: bool = False,
+                 input_pix_fmt: str = "rgb24", encoder_args: list = None,
+                 include_audio: bool = True, force_key_frames: list = None,
+                 audio_inputs: list = None, audio_filter: str = None):
         self.output_path = output_path
         self.width = width
         self.height = height
+        if input_pix_fmt == "yuv420p" and (width % 2 or height % 2):
+            print(f"[FFmpegWriter] Warning: {width}x{height} 不是偶数尺寸，无法使用 yuv420p 输入，改用 rgb24")
+            input_pix_fmt = "rgb24"
+        self.input_pix_fmt = input_pix_fmt
+        if input_pix_fmt == "yuv420p":
+            self._frame_shape = (height * 3 // 2, width)
+        else:
+            self._frame_shape = (height, width, 3)
+        # 首帧校验通过后记录其 (shape, dtype)，之后同规格的帧直接走零拷贝路径
+        self._validated_spec = None
 
-        if codec is None:
-            codec, _ = detect_hw_encoder()
-
-        encoder_args = get_ffmpeg_encoder_args(codec, bitrate)
+        if encoder_args is None:
+            if codec is None:
+                codec, _ = detect_hw_encoder()
+            encoder_args = get_ffmpeg_encoder_args(codec, bitrate)
 
         cmd = [
             get_ffmpeg_binary('ffmpeg'), '-y', '-hide_banner', '-loglevel', 'warning',
             # 视频输入 (raw frames from stdin)
-            '-f', 'rawvideo', '-pix_fmt', 'rgb24',
+            '-f', 'rawvideo', '-pix_fmt', input_pix_fmt,
             '-s', f'{width}x{height}', '-r', str(fps),
             '-i', 'pipe:0',
         ]
 
         # 音频输入
-        has_audio = audio_path and os.path.exists(audio_path)
-        if has_audio:
+        has_audio = include_audio and audio_path and os.path.exists(audio_path) and not audio_filter
+        if audio_filter:
+            cmd += list(audio_inputs or [])
+        elif has_audio:
             cmd += ['-ss', str(audio_start)]
             if audio_duration:
                 cmd += ['-t', str(audio_duration)]
             cmd += ['-i', audio_path]
-        else:
+        elif include_audio:
             # 无音频源时生成静音音轨，确保输出始终包含音频流（xfade 拼接需要）
             cmd += ['-f', 'lavfi', '-i',
                     f'anullsrc=channel_layout=stereo:sample_rate=44100']
@@ -277,6 +429,11 @@ class FFmpegWriter:
         # 视频编码参数
         cmd += encoder_args
         cmd += ['-pix_fmt', 'yuv420p']
+        if force_key_frames:
+            cmd += ['-force_key_frames', ','.join(f'{t:.6f}' for t in force_key_frames)]
+            if 'h264_nvenc' in encoder_args:
+                # NVENC 默认把强制关键帧编码为非 IDR 的 I 帧
+                cmd += ['-forced-idr', '1']
 
         # 音频编码 + 可选淡入淡出滤镜
         if has_audio:
@@ -296,9 +453,14 @@ class FFmpegWriter:
             if af_filters:
                 cmd += ['-af', ','.join(af_filters)]
             cmd += ['-c:a', 'aac', '-b:a', '192k', '-ar', '48000', '-map', '0:v', '-map', '1:a', '-shortest']
-        else:
+        elif audio_filter:
+            cmd += ['-filter_complex', audio_filter,
+                    '-c:a', 'aac', '-b:a', '192k', '-ar', '48000', '-map', '0:v', '-map', '[aout]']
+        elif include_audio:
             # 静音音轨：仅需编码，用 -shortest 使其匹配视频长度
             cmd += ['-c:a', 'aac', '-b:a', '192k', '-ar', '48000', '-map', '0:v', '-map', '1:a', '-shortest']
+        else:
+            cmd += ['-an']
 
         cmd += [output_path]
         
@@ -309,17 +471,92 @@ class FFmpegWriter:
             stderr=subprocess.PIPE
         )
 
+        self._write_thread = None
+        self._write_error = None
+        if threaded:
+            self._start_write_thread()
+
+    @property
+    def frame_shape(self) -> tuple:
+        """管道输入帧的形状：rgb24 为 (H, W, 3)，yuv420p 为 (H*3/2, W)"""
+        return self._frame_shape
+
+    def _conform_frame(self, frame: np.ndarray, out: np.ndarray = None) -> np.ndarray:
+        """将任意 RGB(A) 帧转换为管道输入格式的 C 连续 uint8 帧（慢路径）"""
+        if frame.shape[0] != self.height or frame.shape[1] != self.width:
+            frame = cv2.resize(frame, (self.width, self.height))
+        if frame.ndim == 3 and frame.shape[2] == 4:
+            frame = frame[:, :, :3]
+        frame = np.ascontiguousarray(frame, dtype=np.uint8)
+        if self.input_pix_fmt == "yuv420p":
+            from utils.CpuAccel import rgb_to_yuv420p
+            return rgb_to_yuv420p(frame, out)
+        if out is not None:
+            np.copyto(out, frame)
+            return out
+        return frame
+
+    def _prepare_frame(self, frame: np.ndarray) -> np.ndarray:
+        if frame.flags.c_contiguous and (frame.shape, frame.dtype) == self._validated_spec:
+            return frame
+        if frame.shape == self._frame_shape and frame.dtype == np.uint8 and frame.flags.c_contiguous:
+            self._validated_spec = (frame.shape, frame.dtype)
+            return frame
+        return self._conform_frame(frame)
+
+    def _start_write_thread(self):
+        import queue as _queue_module
+        import threading
+        self._free_buffers = _queue_module.Queue()
+        for _ in range(2):
+            self._free_buffers.put(np.empty(self._frame_shape, dtype=np.uint8))
+        self._pending = _queue_module.Queue()
+
+        def write_loop():
+            while True:
+                buf = self._pending.get()
+                if buf is None:
+                    return
+                try:
+                    if self._write_error is None:
+                        self.process.stdin.write(memoryview(buf))
+                except Exception as e:
+                    self._write_error = e
+                finally:
+                    self._free_buffers.put(buf)
+
+        self._write_thread = threading.Thread(target=write_loop, name="FFmpegWriter", daemon=True)
+        self._write_thread.start()
+
     def write_frame(self, frame: np.ndarray):
-        """写入一帧 RGB uint8 数据"""
-        if self.process.stdin:
-            # 确保帧尺寸正确
-            if frame.shape[0] != self.height or frame.shape[1] != self.width:
-                frame = cv2.resize(frame, (self.width, self.height))
-            if frame.shape[2] == 4:
-                frame = frame[:, :, :3]
-            self.process.stdin.write(frame.astype(np.uint8).tobytes())
+        """
+        写入一帧 uint8 数据：RGB (H, W, 3)，或 yuv420p 输入时的 I420 (H*3/2, W)。
+
+        已是管道输入格式的 C 连续 uint8 帧通过 buffer 协议直接写入管道，不产生中间拷贝；
+        其他形状/类型的帧先缩放、去 alpha、转换类型（及 RGB→yuv420p）。
+        """
+        if not self.process.stdin:
+            return
+        if self._write_thread is None:
+            frame = self._prepare_frame(frame)
+            self.process.stdin.write(memoryview(frame))
+            return
+        if self._write_error is not None:
+            raise self._write_error
+        buf = self._free_buffers.get()
+        if frame.shape == self._frame_shape and frame.dtype == np.uint8:
+            np.copyto(buf, frame)
+        else:
+            self._conform_frame(frame, buf)
+        self._pending.put(buf)
 
     def close(self):
+        if self._write_thread is not None:
+            self._pending.put(None)
+            self._write_thread.join()
+            self._write_thread = None
+            if self._write_error is not None:
+                print(f"[FFmpegWriter] Warning: 写入管道失败: {self._write_error}")
         if self.process.stdin:
             self.process.stdin.close()
         self.process.wait()
@@ -468,6 +705,389 @@ def compute_video_crop_and_size(game_type: str, video_reader: VideoFrameReader,
     return (target_w, target_h), crop_rect, video_pos
 
 
+def _plan_crop_axis(src_len: int, dst_len: int, c1: int, c2: int):
+    """
+    单轴的“先裁剪后缩放”映射：缩放后坐标 [c1, c2) 对应的源区间。
+
+    dst_len / src_len 化简为 step_t / step_s 后，缩放后每 step_t 个像素恰好对应
+    step_s 个源像素。把裁剪边界向外对齐到 step_t 的整数倍（并各多留一格作为插值邻域），
+    缩放比例与采样位置就与整帧缩放一致，只是少算了裁剪掉的部分。
+    源区间起点不同，OpenCV 定点插值系数在个别行/列的舍入会有差异，像素值最多相差 1。
+
+    Returns:
+        (s1, s2, resized_len, offset)：缩放源区间 [s1, s2) 到 resized_len，
+        再从 offset 开始取 c2-c1 个像素
+    """
+    from math import gcd
+    g = gcd(dst_len, src_len)
+    step_t, step_s = dst_len // g, src_len // g
+    if step_t > 64:
+        # 比例无法在较小的边距内对齐，退化为整轴缩放
+        return 0, src_len, dst_len, c1
+    t1 = max(0, (c1 // step_t - 1) * step_t)
+    t2 = min(dst_len, (-(-c2 // step_t) + 1) * step_t)
+    return t1 // step_t * step_s, t2 // step_t * step_s, t2 - t1, c1 - t1
+
+
+def plan_crop_resize(src_size: tuple, target_size: tuple, crop_rect: tuple = None,
+                     interpolation: int = cv2.INTER_LINEAR) -> dict:
+    """
+    将 compute_video_crop_and_size 给出的“缩放后裁剪”几何换算为“先裁剪源帧再缩放”，
+    只缩放最终需要的源区域（16:9 maimai 源约省去 44% 的缩放像素）。
+
+    Args:
+        src_size: (w, h) 源帧尺寸
+        target_size: (w, h) 整帧缩放后的尺寸
+        crop_rect: (x1, y1, x2, y2) 缩放后坐标的裁剪区域，None 表示不裁剪
+        interpolation: 默认 INTER_LINEAR，与整帧 cv2.resize 相差不超过 1 LSB。
+            INTER_AREA 在缩小到一半以下时抗锯齿更好，但输出不再等价且慢数倍
+            （见 scripts/bench_crop_resize.py --interpolation area）
+    Returns:
+        {"src_rect", "resize_size", "post_crop", "interpolation", "out_size"}
+    """
+    src_w, src_h = int(src_size[0]), int(src_size[1])
+    tw, th = int(target_size[0]), int(target_size[1])
+    if crop_rect:
+        x1, y1, x2, y2 = crop_rect
+        x1, y1 = max(0, int(x1)), max(0, int(y1))
+        x2, y2 = min(tw, int(x2)), min(th, int(y2))
+    else:
+        x1, y1, x2, y2 = 0, 0, tw, th
+    sx1, sx2, rw, ox = _plan_crop_axis(src_w, tw, x1, x2)
+    sy1, sy2, rh, oy = _plan_crop_axis(src_h, th, y1, y2)
+    out_w, out_h = x2 - x1, y2 - y1
+    post_crop = None
+    if (rw, rh) != (out_w, out_h):
+        post_crop = (ox, oy, ox + out_w, oy + out_h)
+    return {
+        "src_rect": (sx1, sy1, sx2, sy2),
+        "resize_size": (rw, rh),
+        "post_crop": post_crop,
+        "interpolation": interpolation,
+        "out_size": (out_w, out_h),
+    }
+
+
+def apply_crop_resize(frame: np.ndarray, plan: dict) -> np.ndarray:
+    """按 plan_crop_resize 的结果裁剪源帧并缩放"""
+    sx1, sy1, sx2, sy2 = plan["src_rect"]
+    region = frame[sy1:sy2, sx1:sx2]
+    resized = cv2.resize(region, plan["resize_size"], interpolation=plan["interpolation"])
+    if plan["post_crop"]:
+        x1, y1, x2, y2 = plan["post_crop"]
+        resized = resized[y1:y2, x1:x2]
+    return resized
+
+
+# ============================================================================
+# 解码 → 合成 → 编码 流水线
+# ============================================================================
+
+class _PipelineAborted(Exception):
+    """流水线中其他阶段已失败，当前阶段提前退出"""
+
+
+def _queue_put(q, item, stop_event) -> float:
+    """阻塞放入队列，返回等待时间（秒）。其他阶段失败时抛出 _PipelineAborted"""
+    import queue as _queue_module
+    t0 = time.perf_counter()
+    while True:
+        if stop_event.is_set():
+            raise _PipelineAborted()
+        try:
+            q.put(item, timeout=0.1)
+            return time.perf_counter() - t0
+        except _queue_module.Full:
+            continue
+
+
+def _queue_get(q, stop_event):
+    """阻塞取出队列元素，返回 (item, 等待时间)。其他阶段失败时抛出 _PipelineAborted"""
+    import queue as _queue_module
+    t0 = time.perf_counter()
+    while True:
+        if stop_event.is_set():
+            raise _PipelineAborted()
+        try:
+            item = q.get(timeout=0.1)
+            return item, time.perf_counter() - t0
+        except _queue_module.Empty:
+            continue
+
+
+def run_frame_pipeline(total_frames: int, decode_fn, composite_fn, write_fn,
+                       frame_shape: tuple, pipeline_depth: int = 4,
+                       progress_fn=None, composite_batch_fn=None, batch_size: int = 1,
+                       composite_async_fn=None, finish_fn=None, max_inflight: int = 2) -> dict:
+    """
+    以有界队列连接的三段流水线渲染 total_frames 帧：
+
+        解码线程 decode_fn(i) ──► 合成（调用线程）composite_fn(i, decoded) ──► 编码线程 write_fn(frame)
+
+    合成器返回的是内部缓冲区（下次调用会被覆盖），因此合成阶段把结果拷贝到
+    输出缓冲池中的一块再交给编码线程，编码完成后缓冲区归还缓冲池。
+    合成保持在调用线程中执行：Taichi kernel 已由 TaichiAccel 的工作线程统一调度。
+
+    Args:
+        decode_fn: (frame_idx) -> 任意解码结果，传给 composite_fn
+        composite_fn: (frame_idx, decoded) -> (H, W, 3) uint8 帧
+        write_fn: (frame) -> None
+        frame_shape: 输出帧形状 (H, W, 3)，用于预分配缓冲池
+        pipeline_depth: 每个队列的最大长度；<= 0 时在调用线程中串行执行
+        progress_fn: (frames_done) -> None，在调用线程中调用
+        composite_batch_fn: (frame_indices, decoded_list) -> 可迭代的帧序列；提供且 batch_size > 1 时
+            合成阶段一次取出最多 batch_size 个解码结果批量合成。返回的帧可以复用同一块缓冲区，
+            流水线逐个取出并立即拷贝到输出缓冲池
+        batch_size: 批量合成的帧数
+        composite_async_fn: (frame_idx, decoded) -> handle，非阻塞提交一帧合成（如 Future）；
+            与 finish_fn 同时提供且未启用批量合成时，合成阶段最多保持 max_inflight 帧在途，
+            在下一帧合成期间完成上一帧的取回与拷贝
+        finish_fn: (handle) -> (frame, release)，按提交顺序在调用线程中取回结果；
+            release 为拷贝完成后调用的回调（归还合成器缓冲区），可以为 None
+    Returns:
+        各阶段等待时间（秒）：
+        {"decode_stall": 解码等待合成取走, "composite_wait_input": 合成等待解码,
+         "composite_wait_output": 合成等待编码释放缓冲区, "write_stall": 编码等待合成,
+         "elapsed": 总耗时}
+    """
+    import queue as _queue_module
+    import threading
+
+    stats = {"decode_stall": 0.0, "composite_wait_input": 0.0,
+             "composite_wait_output": 0.0, "write_stall": 0.0, "elapsed": 0.0}
+    t_start = time.perf_counter()
+
+    if pipeline_depth <= 0:
+        for frame_idx in range(total_frames):
+            write_fn(composite_fn(frame_idx, decode_fn(frame_idx)))
+            if progress_fn:
+                progress_fn(frame_idx + 1)
+        stats["elapsed"] = time.perf_counter() - t_start
+        return stats
+
+    decoded_q = _queue_module.Queue(maxsize=pipeline_depth)
+    encode_q = _queue_module.Queue(maxsize=pipeline_depth)
+    free_buffers = _queue_module.Queue()
+    for _ in range(pipeline_depth + 2):
+        free_buffers.put(np.empty(frame_shape, dtype=np.uint8))
+
+    stop_event = threading.Event()
+    errors = []
+    _END = object()
+
+    def decode_worker():
+        try:
+            for frame_idx in range(total_frames):
+                decoded = decode_fn(frame_idx)
+                stats["decode_stall"] += _queue_put(decoded_q, (frame_idx, decoded), stop_event)
+            _queue_put(decoded_q, _END, stop_event)
+        except _PipelineAborted:
+            pass
+        except BaseException as e:
+            errors.append(e)
+            stop_event.set()
+
+    def write_worker():
+        try:
+            while True:
+                buf, waited = _queue_get(encode_q, stop_event)
+                stats["write_stall"] += waited
+                if buf is _END:
+                    return
+                write_fn(buf)
+                free_buffers.put(buf)
+        except _PipelineAborted:
+            pass
+        except BaseException as e:
+            errors.append(e)
+            stop_event.set()
+
+    decode_thread = threading.Thread(target=decode_worker, name="FrameDecode", daemon=True)
+    write_thread = threading.Thread(target=write_worker, name="FrameEncode", daemon=True)
+    decode_thread.start()
+    write_thread.start()
+
+    use_batch = composite_batch_fn is not None and batch_size > 1
+    use_async = not use_batch and composite_async_fn is not None and finish_fn is not None
+    inflight = collections.deque()
+
+    def emit(frame_idx, composed, release=None):
+        buf, waited = _queue_get(free_buffers, stop_event)
+        stats["composite_wait_output"] += waited
+        np.copyto(buf, composed[:, :, :3] if composed.ndim == 3 else composed)
+        if release is not None:
+            release()
+        stats["composite_wait_output"] += _queue_put(encode_q, buf, stop_event)
+        if progress_fn:
+            progress_fn(frame_idx + 1)
+
+    def finish_oldest():
+        frame_idx, handle = inflight.popleft()
+        emit(frame_idx, *finish_fn(handle))
+
+    try:
+        reached_end = False
+        while not reached_end:
+            item, waited = _queue_get(decoded_q, stop_event)
+            stats["composite_wait_input"] += waited
+            if item is _END:
+                break
+            batch = [item]
+            while use_batch and len(batch) < batch_size:
+                item, waited = _queue_get(decoded_q, stop_event)
+                stats["composite_wait_input"] += waited
+                if item is _END:
+                    reached_end = True
+                    break
+                batch.append(item)
+
+            if use_async:
+                frame_idx, decoded = batch[0]
+                inflight.append((frame_idx, composite_async_fn(frame_idx, decoded)))
+                while len(inflight) >= max(1, max_inflight):
+                    finish_oldest()
+                continue
+            if use_batch:
+                composed_frames = composite_batch_fn([idx for idx, _ in batch], [d for _, d in batch])
+            else:
+                composed_frames = [composite_fn(*batch[0])]
+            for (frame_idx, _), composed in zip(batch, composed_frames):
+                emit(frame_idx, composed)
+        while inflight:
+            finish_oldest()
+        _queue_put(encode_q, _END, stop_event)
+    except _PipelineAborted:
+        pass
+    except BaseException as e:
+        errors.append(e)
+        stop_event.set()
+    finally:
+        write_thread.join()
+        if errors:
+            stop_event.set()
+        decode_thread.join()
+
+    if errors:
+        raise errors[0]
+    stats["elapsed"] = time.perf_counter() - t_start
+    return stats
+
+
+def _format_pipeline_stats(stats: dict) -> str:
+    return (f"解码阻塞 {stats['decode_stall']:.2f}s / "
+            f"合成等待输入 {stats['composite_wait_input']:.2f}s / "
+            f"合成等待输出 {stats['composite_wait_output']:.2f}s / "
+            f"编码等待 {stats['write_stall']:.2f}s")
+
+
+def _clip_volume_adjust_db(audio_path: str, audio_start: float, duration: float, clip_name: str) -> float:
+    """逐片段音频响度均衡：返回将片段调整到目标响度所需的增益 (dB)，响度测量结果带缓存（见 LoudnessCache）"""
+    from utils.LoudnessCache import loudness_gain_db
+    return loudness_gain_db(audio_path, audio_start, duration, clip_name)
+
+
+# 不含评论文字的中间文件：高质量 x264（视觉无损），重新叠加文字时作为视频层解码
+MEZZANINE_ENCODER_ARGS = ['-c:v', 'libx264', '-preset', 'ultrafast', '-crf', '10']
+_EMPTY_LAYER = np.zeros((1, 1, 4), dtype=np.uint8)
+
+
+def _partial_path(path: str) -> str:
+    """写入中的临时文件名，完成后 os.replace 到目标路径，中断时不会留下看似完整的文件"""
+    root, ext = os.path.splitext(path)
+    return f"{root}.partial{ext}"
+
+
+def _close_mezzanine(mezzanine_writer, mezzanine_path: str, keep: bool = True):
+    """关闭中间文件写入器；编码成功时替换到目标路径，否则删除临时文件"""
+    mezzanine_writer.close()
+    partial = _partial_path(mezzanine_path)
+    if keep and mezzanine_writer.process.returncode == 0:
+        os.replace(partial, mezzanine_path)
+        return
+    if keep:
+        print(f"[AccelRenderer] Warning: 中间文件写入失败，已丢弃: {mezzanine_path}")
+    if os.path.exists(partial):
+        os.remove(partial)
+
+
+def _text_layer_writer(text_layer, frame_brightness, writer, mezzanine_writer=None, yuv_converter=None):
+    """
+    写入阶段：（可选）先把不含文字的帧写入中间文件，再叠加文字层并乘入淡入淡出亮度后写入输出。
+    在编码线程中按帧顺序调用。
+    """
+    frame_idx = 0
+
+    def write_frame(frame):
+        nonlocal frame_idx
+        if mezzanine_writer is not None:
+            mezzanine_writer.write_frame(frame)
+        composed = text_layer.composite(frame, frame_brightness(frame_idx))
+        frame_idx += 1
+        writer.write_frame(yuv_converter.convert(composed) if yuv_converter is not None else composed)
+    return write_frame
+
+
+def transition_keyframe_times(total_frames: int, fps: float, trans_time: float) -> list:
+    """
+    片段中转场窗口的边界时间点 trans_time 与 duration - trans_time（对齐到帧），
+    编码时在此强制关键帧，transition island 拼接时主体部分可以直接流拷贝。
+    """
+    if not trans_time or trans_time <= 0 or fps <= 0:
+        return []
+    boundary = int(round(trans_time * fps))
+    if boundary <= 0 or total_frames - boundary <= boundary:
+        return []
+    return [boundary / fps, (total_frames - boundary) / fps]
+
+
+def _make_fade_brightness(total_frames: int, fade_in: float, fade_out: float, fps: float):
+    """返回 frame_idx -> 亮度 的淡入淡出曲线"""
+    fade_in_frames = int(fade_in * fps) if fade_in > 0 else 0
+    fade_out_frames = int(fade_out * fps) if fade_out > 0 else 0
+
+    def frame_brightness(frame_idx):
+        if fade_in_frames > 0 and frame_idx < fade_in_frames:
+            return frame_idx / fade_in_frames
+        if fade_out_frames > 0 and frame_idx >= total_frames - fade_out_frames:
+            return (total_frames - 1 - frame_idx) / fade_out_frames
+        return 1.0
+    return frame_brightness
+
+
+def _render_content_text(game_type: str, clip_config: dict, style_config: dict, resolution: tuple):
+    """使用 TextRenderer 预渲染内容片段的评论文字，返回 (RGBA 文字图, 文字位置)"""
+    from utils.TextRenderer import TextRenderer, TextStyle, LayoutConfig
+    font_path = style_config['asset_paths']['comment_font']
+    text_size = style_config['content_text_style']['font_size']
+    inline_max = style_config['content_text_style']['inline_max_chara']
+    text_area_width = max(400, inline_max * text_size)
+    interline = style_config['content_text_style']['interline']
+    h_align = style_config['content_text_style']['horizontal_align']
+    text_color = style_config['content_text_style']['font_color']
+    enable_stroke = style_config['content_text_style']['enable_stroke']
+    stroke_color = style_config['content_text_style'].get('stroke_color') if enable_stroke else None
+    stroke_width = style_config['content_text_style'].get('stroke_width', 0) if enable_stroke else 0
+
+    text_style = TextStyle(
+        font_path=font_path, font_size=text_size, color=text_color,
+        stroke_color=stroke_color, stroke_width=stroke_width
+    )
+    text_layout = LayoutConfig(
+        width=text_area_width, auto_height=True,
+        padding=(10, 10, 10, 10), line_spacing=interline * 1.2,
+        horizontal_align=h_align, vertical_align="top"
+    )
+    renderer = TextRenderer(text_style, text_layout)
+    text_pil = renderer.render(clip_config.get('text', ''))
+    text_img = np.array(text_pil)
+
+    # 文字位置
+    rel_t_pos_map = {"maimai": (0.54, 0.54), "chunithm": (0.76, 0.227)}
+    tmx, tmy = rel_t_pos_map.get(game_type, (0.54, 0.54))
+    text_pos = (int(tmx * resolution[0]), int(tmy * resolution[1]))
+    return text_img, text_pos
+
+
 def render_segment_accel(
     game_type: str,
     clip_config: dict,
@@ -479,27 +1099,56 @@ def render_segment_accel(
     codec: str = None,
     progress_callback=None,
     fade_in: float = 0,
-    fade_out: float = 0
+    fade_out: float = 0,
+    use_static_plate: bool = True,
+    use_taichi: bool = True,
+    pipeline_depth: int = 4,
+    pipe_pix_fmt: str = "rgb24",
+    decoder: str = "opencv",
+    batch_size: int = 1,
+    async_inflight: int = 2,
+    mezzanine_path: str = None,
+    transition_keyframes: float = 0,
+    frame_sink=None
 ) -> dict:
     """
     使用 Taichi GPU + FFmpeg 硬件编码渲染单个视频片段。
     替代 VideoUtils.create_video_segment() + write_videofile() 的组合。
+    Taichi 不可用时使用 CpuAccel.NumpyFrameCompositor 在 CPU 上合成。
+
+    use_static_plate: 静态背景时将视频矩形以外的内容预合成为底板，逐帧只合成视频区域
+    use_taichi: False 时强制使用 CPU 合成（多进程渲染的子进程中使用）
+    pipeline_depth: 解码/合成/编码流水线的队列深度，<= 0 时串行渲染
+    pipe_pix_fmt: 送入 FFmpeg 的像素格式，"yuv420p" 时在合成阶段转换并减半管道带宽
+    decoder: 谱面视频解码方式。"opencv"：cv2.VideoCapture；"ffmpeg"：FFmpeg 子进程解码并在
+        滤镜链中完成帧率转换/缩放/裁剪；"ffmpeg_hw"：同上并启用 -hwaccel auto
+    batch_size: Taichi 合成时每次提交到工作线程的帧数（FrameCompositor.composite_batch），1 为逐帧
+    async_inflight: 逐帧 Taichi 合成时最多同时在途的帧数（FrameCompositor.composite_async），
+        <= 1 时同步合成
+    mezzanine_path: 同时输出不含评论文字、不含淡入淡出的高质量中间文件（无音频），
+        之后只修改评论时可由 reblend_segment_text_accel 在其上重新叠加文字
+    transition_keyframes: > 0 时在距首尾该秒数处强制关键帧（见 transition_keyframe_times）
+    frame_sink: 整片流式渲染时的帧接收端（FullVideoStream.begin_clip 的返回值），
+        帧写入 frame_sink 而不是 output_path，音频由整片的音频滤镜图处理
     
     Returns:
-        {"status": "success"|"error", "info": str}
+        {"status": "success"|"error", "info": str, "pipeline_stats": dict}
     """
     from utils.TaichiAccel import (
         is_available as ti_available,
-        composite_five_layers,
         FrameCompositor
     )
+    from utils.CpuAccel import NumpyFrameCompositor, NumpyInfoFrameCompositor
 
     clip_name = clip_config.get('clip_title_name', 'clip')
-    print(f"[AccelRenderer] 正在渲染: {clip_name} (GPU加速)")
-
-    if not ti_available():
-        return {"status": "error", "info": "Taichi GPU 加速不可用"}
-
+    use_gpu = use_taichi and ti_available()
+    # 非阻塞提交只用于逐帧 Taichi 合成；串行渲染时没有可重叠的解码/编码阶段
+    use_async = use_gpu and batch_size <= 1 and async_inflight > 1 and pipeline_depth > 0
+    print(f"[AccelRenderer] 正在渲染: {clip_name} ({'GPU加速' if use_gpu else 'CPU合成'})")
+
+    # 解码器在 finally 中关闭：FFmpeg 解码器持有子进程，渲染失败时也必须结束
+    video_reader = None
+    bg_video_reader = None
     try:
         duration = clip_config.get('duration', 10)
         total_frames = int(duration * fps)
@@ -520,11 +1169,14 @@ def render_segment_accel(
         bg_frame = _load_image_rgb(bg_path, resolution)
 
         # 背景视频（如果启用）
-        bg_video_reader = None
         if using_video_bg:
             bg_video_path = style_config['asset_paths'].get('content_bg_video', None)
             if bg_video_path and os.path.exists(bg_video_path):
-                bg_video_reader = VideoFrameReader(bg_video_path)
+                # 短循环素材：使用进程级解码帧缓存（已缩放到输出分辨率），超出预算时流式解码
+                from utils.FrameCache import get_cached_loop_video
+                bg_video_reader = get_cached_loop_video(bg_video_path, resolution)
+                if bg_video_reader is None:
+                    bg_video_reader = VideoFrameReader(bg_video_path, sequential=True)
 
         # 成绩图 (RGBA)
         if 'main_image' in clip_config and clip_config['main_image'] and os.path.exists(clip_config.get('main_image', '')):
@@ -536,45 +1188,28 @@ def render_segment_accel(
         else:
             score_img_resized = np.zeros((resolution[1], resolution[0], 4), dtype=np.uint8)
 
-        # 文字图 (RGBA) - 使用 TextRenderer 预渲染
-        from utils.TextRenderer import TextRenderer, TextStyle, LayoutConfig
-        font_path = style_config['asset_paths']['comment_font']
-        text_size = style_config['content_text_style']['font_size']
-        inline_max = style_config['content_text_style']['inline_max_chara']
-        text_area_width = max(400, inline_max * text_size)
-        interline = style_config['content_text_style']['interline']
-        h_align = style_config['content_text_style']['horizontal_align']
-        text_color = style_config['content_text_style']['font_color']
-        enable_stroke = style_config['content_text_style']['enable_stroke']
-        stroke_color = style_config['content_text_style'].get('stroke_color') if enable_stroke else None
-        stroke_width = style_config['content_text_style'].get('stroke_width', 0) if enable_stroke else 0
-
-        text_style = TextStyle(
-            font_path=font_path, font_size=text_size, color=text_color,
-            stroke_color=stroke_color, stroke_width=stroke_width
-        )
-        text_layout = LayoutConfig(
-            width=text_area_width, auto_height=True,
-            padding=(10, 10, 10, 10), line_spacing=interline * 1.2,
-            horizontal_align=h_align, vertical_align="top"
-        )
-        renderer = TextRenderer(text_style, text_layout)
-        text_pil = renderer.render(clip_config.get('text', ''))
-        text_img = np.array(text_pil)
-
-        # 文字位置
-        rel_t_pos_map = {"maimai": (0.54, 0.54), "chunithm": (0.76, 0.227)}
-        tmx, tmy = rel_t_pos_map.get(game_type, (0.54, 0.54))
-        text_pos = (int(tmx * resolution[0]), int(tmy * resolution[1]))
+        # 文字图 (RGBA) 与位置
+        text_img, text_pos = _render_content_text(game_type, clip_config, style_config, resolution)
+        # 输出中间文件时文字不参与合成，在写入阶段叠加到中间帧上
+        text_layer = None
+        if mezzanine_path:
+            text_layer = NumpyInfoFrameCompositor(_EMPTY_LAYER, text_img, text_pos,
+                                                  bg_dim=1.0, output_size=resolution)
 
         # === 准备视频源 ===
-        video_reader = None
         video_pos = (0, 0)
         target_video_size = (540, 540)
         crop_rect = None
 
         if 'video' in clip_config and clip_config['video'] and os.path.exists(clip_config.get('video', '')):
-            video_reader = VideoFrameReader(clip_config['video'])
+            if decoder in ("ffmpeg", "ffmpeg_hw"):
+                try:
+                    video_reader = FFmpegFrameReader(
+                        clip_config['video'], hwaccel="auto" if decoder == "ffmpeg_hw" else None)
+                except (OSError, ValueError, subprocess.SubprocessError) as e:
+                    print(f"[AccelRenderer] Warning: FFmpeg 解码器不可用，回退到 OpenCV: {e}")
+            if video_reader is None:
+                video_reader = VideoFrameReader(clip_config['video'], sequential=True)
 
             # 自动居中对齐：检测视觉中心（maimai 圆形检测）
             visual_center = None
@@ -601,6 +1236,12 @@ def render_segment_accel(
             target_video_size, crop_rect, video_pos = compute_video_crop_and_size(
                 game_type, video_reader, resolution, visual_center=visual_center
             )
+
+        use_ffmpeg_decode = isinstance(video_reader, FFmpegFrameReader)
+        crop_plan = None
+        if video_reader is not None:
+            crop_plan = plan_crop_resize((video_reader.width, video_reader.height),
+                                         target_video_size, crop_rect)
         
         start_time = clip_config.get('start', 0)
         end_time = clip_config.get('end', start_time + duration)
@@ -611,94 +1252,275 @@ def render_segment_accel(
 
         # === 逐片段音频响度均衡（匹配 CPU 路径的 per-clip RMS 归一化）===
         volume_adjust_db = 0
-        if audio_path and os.path.exists(audio_path):
-            measured_rms = _measure_audio_rms(audio_path, audio_start, duration)
-            target_rms_db = -20.0
-            volume_adjust_db = target_rms_db - measured_rms
-            # 限制增益范围：对应 CPU 路径 gain clamp [0.1, 3.0] → [-20dB, +9.5dB]
-            volume_adjust_db = max(-20.0, min(9.5, volume_adjust_db))
-            if abs(volume_adjust_db) > 0.5:
-                print(f"[AccelRenderer] 音频均衡: {clip_name} RMS={measured_rms:.1f}dB, 调整={volume_adjust_db:+.1f}dB")
+        if frame_sink is None:
+            volume_adjust_db = _clip_volume_adjust_db(audio_path, audio_start, duration, clip_name)
+
+        # 视频淡入淡出：亮度作为合成参数传入，在合成 kernel 内乘入；
+        # 输出中间文件时合成阶段保持原亮度，淡入淡出与文字层一起在写入阶段处理
+        frame_brightness = _make_fade_brightness(total_frames, fade_in, fade_out, fps)
 
         # === FFmpeg 写入器 ===
-        writer = FFmpegWriter(
+        writer = frame_sink or FFmpegWriter(
             output_path, resolution[0], resolution[1],
             fps=fps, codec=codec, bitrate=bitrate,
             audio_path=audio_path, audio_start=audio_start, audio_duration=duration,
             audio_fade_in=fade_in, audio_fade_out=fade_out,
-            volume_adjust_db=volume_adjust_db
+            volume_adjust_db=volume_adjust_db,
+            # 流水线模式下已有独立编码线程；串行模式使用写入线程避免管道阻塞合成
+            threaded=pipeline_depth <= 0,
+            input_pix_fmt=pipe_pix_fmt,
+            force_key_frames=transition_keyframe_times(total_frames, fps, transition_keyframes)
         )
-
-        # === 预计算淡入淡出帧数 ===
-        fade_in_frames = int(fade_in * fps) if fade_in > 0 else 0
-        fade_out_frames = int(fade_out * fps) if fade_out > 0 else 0
+        # 底板模式下只有视频矩形逐帧变化，yuv420p 转换也只处理该区域
+        yuv_converter = None
+        if writer.input_pix_fmt == "yuv420p":
+            from utils.CpuAccel import Yuv420pConverter
+            yuv_converter = Yuv420pConverter(resolution[0], resolution[1])
+        write_fn = writer.write_frame
+        mezzanine_writer = None
+        if text_layer is not None:
+            os.makedirs(os.path.dirname(os.path.abspath(mezzanine_path)), exist_ok=True)
+            mezzanine_writer = FFmpegWriter(
+                _partial_path(mezzanine_path), resolution[0], resolution[1], fps=fps,
+                encoder_args=MEZZANINE_ENCODER_ARGS, include_audio=False, threaded=True)
+            write_fn = _text_layer_writer(text_layer, frame_brightness, writer, mezzanine_writer,
+                                          yuv_converter)
+            # 合成阶段输出 RGB 中间帧，yuv420p 转换在叠加文字后进行
+            yuv_converter = None
 
         # === 逐帧渲染（使用 FrameCompositor 预计算静态层）===
-        compositor = FrameCompositor(
+        # 静态背景时启用底板模式；背景视频逐帧变化，只能整帧合成
+        compositor_kwargs = dict(
             bg=bg_frame,
             score_image=score_img_resized,
-            text_image=text_img,
+            text_image=text_img if text_layer is None else _EMPTY_LAYER,
             video_pos=video_pos,
             text_pos=text_pos,
             bg_brightness=0.8,
             output_size=resolution,
         )
+        if use_gpu:
+            compositor = FrameCompositor(
+                static_plate=use_static_plate and bg_video_reader is None,
+                async_buffers=async_inflight + 1,
+                **compositor_kwargs
+            )
+        else:
+            compositor = NumpyFrameCompositor(**compositor_kwargs)
 
-        for frame_idx in range(total_frames):
-            t = start_time + frame_idx / fps
+        if use_ffmpeg_decode:
+            # 流水线中最多 pipeline_depth 帧排队 + 1 帧合成中 + 1 帧解码中
+            # 批量合成时合成阶段同时持有 batch_size 帧，异步提交时同时持有 async_inflight 帧
+            held_frames = max(1, batch_size, async_inflight if use_async else 1)
+            video_reader.open_stream(start_time, duration, fps, target_video_size, crop_rect,
+                                     num_buffers=max(2, pipeline_depth + held_frames + 2))
 
-            # 准备当前视频帧
-            if video_reader:
+        def decode_frame(frame_idx):
+            """解码线程：读取并缩放/裁剪谱面视频帧与背景视频帧"""
+            t = start_time + frame_idx / fps
+            if use_ffmpeg_decode:
+                video_frame = video_reader.read_next()
+                if video_frame is None:
+                    out_w, out_h = video_reader.out_size
+                    video_frame = np.zeros((out_h, out_w, 3), dtype=np.uint8)
+            elif video_reader:
                 raw_frame = video_reader.get_frame(t)
-                if raw_frame is None:
-                    raw_frame = np.zeros((target_video_size[1], target_video_size[0], 3), dtype=np.uint8)
+                if raw_frame is None or crop_plan is None:
+                    video_frame = np.zeros((target_video_size[1], target_video_size[0], 3), dtype=np.uint8)
                 else:
-                    raw_frame = cv2.resize(raw_frame, (target_video_size[0], target_video_size[1]))
-                    if crop_rect:
-                        x1, y1, x2, y2 = crop_rect
-                        x1, y1 = max(0, x1), max(0, y1)
-                        x2 = min(raw_frame.shape[1], x2)
-                        y2 = min(raw_frame.shape[0], y2)
-                        raw_frame = raw_frame[y1:y2, x1:x2]
-                video_frame = raw_frame
+                    # 先裁剪源帧再缩放，只处理最终可见的区域
+                    video_frame = apply_crop_resize(raw_frame, crop_plan)
             else:
                 video_frame = np.zeros((target_video_size[1], target_video_size[0], 3), dtype=np.uint8)
 
             # 动态背景
+            current_bg = None
             if bg_video_reader:
                 bg_t = t % bg_video_reader.duration if bg_video_reader.duration > 0 else 0
-                current_bg = _prepare_bg_frame(bg_path, resolution, is_video=True,
-                                               reader=bg_video_reader, time_sec=bg_t)
+                if isinstance(bg_video_reader, VideoFrameReader):
+                    current_bg = _prepare_bg_frame(bg_path, resolution, is_video=True,
+                                                   reader=bg_video_reader, time_sec=bg_t)
+                else:
+                    current_bg = bg_video_reader.get_frame(bg_t)
+            return video_frame, current_bg
+
+        def composite_brightness(frame_idx):
+            return 1.0 if text_layer is not None else frame_brightness(frame_idx)
+
+        def composite_frame(frame_idx, decoded):
+            video_frame, current_bg = decoded
+            if current_bg is not None:
                 compositor.update_bg(current_bg)
 
-            # GPU 快速合成（零拷贝路径）
-            composed = compositor.composite(video_frame)
+            # 快速合成（底板模式下只处理视频矩形区域）
+            composed = compositor.composite(video_frame, composite_brightness(frame_idx))
+
+            if yuv_converter is not None:
+                return yuv_converter.convert(composed, compositor.dirty_rect)
+            return composed
+
+        def composite_batch(frame_indices, decoded_list):
+            """批量合成：一次工作线程提交合成多帧，逐帧产出（yuv 转换复用同一缓冲区）"""
+            bgs = [bg for _, bg in decoded_list]
+            frames = compositor.composite_batch(
+                [video for video, _ in decoded_list],
+                [composite_brightness(idx) for idx in frame_indices],
+                bgs if any(bg is not None for bg in bgs) else None)
+            for n, composed in enumerate(frames):
+                if yuv_converter is not None:
+                    yield yuv_converter.convert(composed, compositor.batch_dirty_rects[n])
+                else:
+                    yield composed
 
-            # 视频淡入淡出（GPU 亮度渐变）
-            if fade_in_frames > 0 and frame_idx < fade_in_frames:
-                brightness = frame_idx / fade_in_frames
-                composed = (composed.astype(np.float32) * brightness).clip(0, 255).astype(np.uint8)
-            elif fade_out_frames > 0 and frame_idx >= total_frames - fade_out_frames:
-                brightness = (total_frames - 1 - frame_idx) / fade_out_frames
-                composed = (composed.astype(np.float32) * brightness).clip(0, 255).astype(np.uint8)
+        def composite_submit(frame_idx, decoded):
+            """异步提交：kernel 在工作线程执行期间，合成线程可以取回并拷贝上一帧"""
+            video_frame, current_bg = decoded
+            if current_bg is not None:
+                compositor.update_bg(current_bg)
+            return compositor.composite_async(video_frame, composite_brightness(frame_idx))
 
-            writer.write_frame(composed)
+        def composite_finish(future):
+            composed, dirty_rect = future.result()
+            if yuv_converter is not None:
+                yuv = yuv_converter.convert(composed, dirty_rect)
+                compositor.release(composed)
+                return yuv, None
+            return composed, lambda: compositor.release(composed)
 
+        def report_progress(frames_done):
             # 节流的进度回调（每 30 帧或最后一帧）
-            if progress_callback and (frame_idx % 30 == 0 or frame_idx == total_frames - 1):
-                progress_callback(frame_idx + 1, total_frames, clip_name)
+            if progress_callback and ((frames_done - 1) % 30 == 0 or frames_done == total_frames):
+                progress_callback(frames_done, total_frames, clip_name)
+
+        try:
+            pipeline_stats = run_frame_pipeline(
+                total_frames, decode_frame, composite_frame, write_fn,
+                frame_shape=writer.frame_shape if text_layer is None else (resolution[1], resolution[0], 3),
+                pipeline_depth=pipeline_depth, progress_fn=report_progress,
+                composite_batch_fn=composite_batch if use_gpu else None,
+                batch_size=batch_size,
+                composite_async_fn=composite_submit if use_async else None,
+                finish_fn=composite_finish if use_async else None,
+                max_inflight=async_inflight,
+            )
+        except BaseException:
+            writer.close()
+            if mezzanine_writer is not None:
+                _close_mezzanine(mezzanine_writer, mezzanine_path, keep=False)
+            raise
+        print(f"[Timer] {clip_name} 流水线: {_format_pipeline_stats(pipeline_stats)}")
         writer.close()
+        if mezzanine_writer is not None:
+            _close_mezzanine(mezzanine_writer, mezzanine_path)
+
+        print(f"[AccelRenderer] ✓ 渲染完成: {clip_name}")
+        return {"status": "success", "info": f"GPU加速渲染 {clip_name} 完成",
+                "pipeline_stats": pipeline_stats}
+
+    except Exception as e:
+        print(f"[AccelRenderer] Error: {traceback.format_exc()}")
+        return {"status": "error", "info": f"GPU渲染失败: {str(e)}"}
+    finally:
         if video_reader:
             video_reader.close()
         if bg_video_reader:
             bg_video_reader.close()
 
-        print(f"[AccelRenderer] ✓ 渲染完成: {clip_name}")
-        return {"status": "success", "info": f"GPU加速渲染 {clip_name} 完成"}
+
+def reblend_segment_text_accel(
+    game_type: str,
+    clip_config: dict,
+    style_config: dict,
+    resolution: tuple,
+    mezzanine_path: str,
+    output_path: str,
+    fps: int = 30,
+    bitrate: str = "5000k",
+    codec: str = None,
+    progress_callback=None,
+    fade_in: float = 0,
+    fade_out: float = 0,
+    pipeline_depth: int = 4,
+    pipe_pix_fmt: str = "rgb24",
+    transition_keyframes: float = 0
+) -> dict:
+    """
+    只修改了评论文字的片段：解码 render_segment_accel 输出的不含文字中间文件，
+    重新叠加文字层与淡入淡出后编码，跳过谱面视频解码/裁剪与整帧合成。
+    输出与完整渲染一致（中间文件为高质量有损编码，视频区域存在一次额外的编码损失）。
+
+    Returns:
+        {"status": "success"|"error", "info": str, "pipeline_stats": dict}
+    """
+    from utils.CpuAccel import NumpyInfoFrameCompositor
+
+    clip_name = clip_config.get('clip_title_name', 'clip')
+    print(f"[AccelRenderer] 正在重新叠加文字: {clip_name}")
+    reader = None
+    try:
+        duration = clip_config.get('duration', 10)
+        total_frames = int(duration * fps)
+        text_img, text_pos = _render_content_text(game_type, clip_config, style_config, resolution)
+        text_layer = NumpyInfoFrameCompositor(_EMPTY_LAYER, text_img, text_pos,
+                                              bg_dim=1.0, output_size=resolution)
+
+        # 中间文件与输出同分辨率、同帧率，顺序读取即可
+        reader = VideoFrameReader(mezzanine_path, sequential=True)
+
+        audio_path = clip_config.get('video', None)
+        audio_start = clip_config.get('start', 0)
+        writer = FFmpegWriter(
+            output_path, resolution[0], resolution[1],
+            fps=fps, codec=codec, bitrate=bitrate,
+            audio_path=audio_path, audio_start=audio_start, audio_duration=duration,
+            audio_fade_in=fade_in, audio_fade_out=fade_out,
+            volume_adjust_db=_clip_volume_adjust_db(audio_path, audio_start, duration, clip_name),
+            threaded=pipeline_depth <= 0,
+            input_pix_fmt=pipe_pix_fmt,
+            force_key_frames=transition_keyframe_times(total_frames, fps, transition_keyframes)
+        )
+        yuv_converter = None
+        if writer.input_pix_fmt == "yuv420p":
+            from utils.CpuAccel import Yuv420pConverter
+            yuv_converter = Yuv420pConverter(resolution[0], resolution[1])
+        write_fn = _text_layer_writer(text_layer, _make_fade_brightness(total_frames, fade_in, fade_out, fps),
+                                      writer, yuv_converter=yuv_converter)
+
+        last_frame = np.zeros((resolution[1], resolution[0], 3), dtype=np.uint8)
+
+        def decode_frame(frame_idx):
+            # 中间文件帧数可能因取整少一帧，末尾重复最后一帧
+            nonlocal last_frame
+            frame = reader.read_next()
+            if frame is not None:
+                if frame.shape[:2] != last_frame.shape[:2]:
+                    frame = cv2.resize(frame, resolution)
+                last_frame = frame
+            return last_frame
+
+        def report_progress(frames_done):
+            if progress_callback and ((frames_done - 1) % 30 == 0 or frames_done == total_frames):
+                progress_callback(frames_done, total_frames, clip_name)
+
+        try:
+            pipeline_stats = run_frame_pipeline(
+                total_frames, decode_frame, lambda frame_idx, frame: frame, write_fn,
+                frame_shape=(resolution[1], resolution[0], 3),
+                pipeline_depth=pipeline_depth, progress_fn=report_progress,
+            )
+        finally:
+            writer.close()
+        print(f"[Timer] {clip_name} 流水线: {_format_pipeline_stats(pipeline_stats)}")
+        print(f"[AccelRenderer] ✓ 文字重新叠加完成: {clip_name}")
+        return {"status": "success", "info": f"重新叠加文字 {clip_name} 完成",
+                "pipeline_stats": pipeline_stats}
 
     except Exception as e:
         print(f"[AccelRenderer] Error: {traceback.format_exc()}")
-        return {"status": "error", "info": f"GPU渲染失败: {str(e)}"}
+        return {"status": "error", "info": f"重新叠加文字失败: {str(e)}"}
+    finally:
+        if reader is not None:
+            reader.close()
 
 
 def render_info_segment_accel(
@@ -711,14 +1533,24 @@ def render_info_segment_accel(
     codec: str = None,
     progress_callback=None,
     fade_in: float = 0,
-    fade_out: float = 0
+    fade_out: float = 0,
+    use_taichi: bool = True,
+    pipe_pix_fmt: str = "rgb24",
+    transition_keyframes: float = 0,
+    frame_sink=None
 ) -> dict:
     """
     使用 FFmpeg 硬件编码渲染开场/结尾信息片段。
+    use_taichi: False 时强制使用 CPU 合成（多进程渲染的子进程中使用）
+    pipe_pix_fmt: 送入 FFmpeg 的像素格式（"rgb24" 或 "yuv420p"）
+    transition_keyframes: > 0 时在距首尾该秒数处强制关键帧（见 transition_keyframe_times）
+    frame_sink: 整片流式渲染时的帧接收端，见 render_segment_accel
     """
-    from utils.TaichiAccel import is_available as ti_available, multiply_brightness, alpha_composite
+    from utils.TaichiAccel import is_available as ti_available, InfoFrameCompositor
+    from utils.CpuAccel import NumpyInfoFrameCompositor
 
     clip_name = clip_config.get('clip_title_name', '片段')
+    use_gpu = use_taichi and ti_available()
     print(f"[AccelRenderer] 正在渲染信息片段: {clip_name}")
 
     try:
@@ -733,8 +1565,14 @@ def render_info_segment_accel(
         text_bg = _load_image_rgba(intro_text_bg_path)
         text_bg_resized = cv2.resize(text_bg, resolution, interpolation=cv2.INTER_AREA)
 
-        # 背景视频
-        bg_reader = VideoFrameReader(intro_video_bg_path)
+        # 背景视频：优先使用进程级解码帧缓存（已缩放，CPU 合成时已预暗化），超出预算时流式解码
+        from utils.FrameCache import get_cached_loop_video
+        bg_cache_dim = 1.0 if use_gpu else 0.75
+        bg_reader = get_cached_loop_video(intro_video_bg_path, resolution, bg_cache_dim)
+        if bg_reader is None:
+            bg_reader = VideoFrameReader(intro_video_bg_path, sequential=True)
+            bg_cache_dim = 1.0
+        bg_prescaled = not isinstance(bg_reader, VideoFrameReader)
 
         # 渲染文字
         from utils.TextRenderer import TextRenderer, TextStyle, LayoutConfig
@@ -757,89 +1595,56 @@ def render_info_segment_accel(
         text_img = np.array(text_pil)
         text_pos = (int(0.16 * resolution[0]), int(0.18 * resolution[1]))
 
-        # 预拆分静态 RGBA 层（循环外一次性完成）
-        text_bg_rgb = text_bg_resized[:, :, :3].astype(np.float32)
-        text_bg_mask = text_bg_resized[:, :, 3].astype(np.float32) / 255.0 if text_bg_resized.shape[2] == 4 else None
-        text_img_rgb = text_img[:, :, :3].astype(np.float32)
-        text_img_mask = text_img[:, :, 3].astype(np.float32) / 255.0 if text_img.shape[2] == 4 else None
-        tx, ty = text_pos
+        # 静态层（text_bg + text）在合成器构造时一次性融合为预乘叠加层
+        if use_gpu:
+            compositor = InfoFrameCompositor(text_bg_resized, text_img, text_pos,
+                                             bg_dim=0.75, output_size=resolution)
+        else:
+            # 缓存帧已预暗化时不再重复暗化
+            compositor = NumpyInfoFrameCompositor(text_bg_resized, text_img, text_pos,
+                                                  bg_dim=0.75 if bg_cache_dim == 1.0 else 1.0,
+                                                  output_size=resolution)
 
         # === 逐片段音频响度均衡 ===
         volume_adjust_db = 0
-        if intro_bgm_path and os.path.exists(intro_bgm_path):
-            measured_rms = _measure_audio_rms(intro_bgm_path, 0, duration)
-            target_rms_db = -20.0
-            volume_adjust_db = target_rms_db - measured_rms
-            volume_adjust_db = max(-20.0, min(9.5, volume_adjust_db))
-            if abs(volume_adjust_db) > 0.5:
-                print(f"[AccelRenderer] 音频均衡: {clip_name} RMS={measured_rms:.1f}dB, 调整={volume_adjust_db:+.1f}dB")
+        if frame_sink is None:
+            volume_adjust_db = _clip_volume_adjust_db(intro_bgm_path, 0, duration, clip_name)
 
-        writer = FFmpegWriter(
+        writer = frame_sink or FFmpegWriter(
             output_path, resolution[0], resolution[1],
             fps=fps, codec=codec, bitrate=bitrate,
             audio_path=intro_bgm_path, audio_start=0, audio_duration=duration,
             audio_fade_in=fade_in, audio_fade_out=fade_out,
-            volume_adjust_db=volume_adjust_db
+            volume_adjust_db=volume_adjust_db,
+            threaded=True,
+            input_pix_fmt=pipe_pix_fmt,
+            force_key_frames=transition_keyframe_times(total_frames, fps, transition_keyframes)
         )
 
         # 预计算淡入淡出帧数
         fade_in_frames = int(fade_in * fps) if fade_in > 0 else 0
         fade_out_frames = int(fade_out * fps) if fade_out > 0 else 0
 
-        # 使用顺序读取模式
-        bg_reader.seek_to(0)
-
         for frame_idx in range(total_frames):
             t = frame_idx / fps
+            # 顺序模式：按输出时间轴丢帧/重复帧，仅在循环回到开头时 seek
             bg_t = t % bg_reader.duration if bg_reader.duration > 0 else 0
-            # 循环播放背景视频时需要 seek 回起始点
-            if frame_idx > 0 and bg_t < (frame_idx - 1) / fps % bg_reader.duration:
-                bg_reader.seek_to(bg_t)
-            bg_frame = bg_reader.read_next()
-            if bg_frame is None:
-                bg_reader.seek_to(bg_t)
-                bg_frame = bg_reader.read_next()
+            bg_frame = bg_reader.get_frame(bg_t)
             if bg_frame is None:
                 bg_frame = np.zeros((resolution[1], resolution[0], 3), dtype=np.uint8)
-            else:
+            elif not bg_prescaled:
                 bg_frame = cv2.resize(bg_frame, resolution)
 
-            if ti_available():
-                bg_frame = multiply_brightness(bg_frame, 0.75)
-                composed = alpha_composite(bg_frame if bg_frame.shape[2] == 4 else
-                    np.dstack([bg_frame, np.full(bg_frame.shape[:2], 255, dtype=np.uint8)]),
-                    text_bg_resized, (0, 0))
-                composed = alpha_composite(
-                    np.dstack([composed[:, :, :3], np.full(composed.shape[:2], 255, dtype=np.uint8)]),
-                    text_img, text_pos)
-            else:
-                # CPU fallback: 完整合成（暗化背景 + text_bg + text）
-                composed = (bg_frame.astype(np.float32) * 0.75).clip(0, 255)
-                # 叠加 text_bg
-                if text_bg_mask is not None:
-                    h, w = text_bg_rgb.shape[:2]
-                    mask3 = text_bg_mask[:, :, np.newaxis]
-                    composed[:h, :w] = composed[:h, :w] * (1 - mask3) + text_bg_rgb * mask3
-                # 叠加 text
-                if text_img_mask is not None:
-                    th, tw = text_img_rgb.shape[:2]
-                    y1, y2 = ty, min(ty + th, composed.shape[0])
-                    x1, x2 = tx, min(tx + tw, composed.shape[1])
-                    sh, sw = y2 - y1, x2 - x1
-                    if sh > 0 and sw > 0:
-                        mask3 = text_img_mask[:sh, :sw, np.newaxis]
-                        composed[y1:y2, x1:x2] = composed[y1:y2, x1:x2] * (1 - mask3) + text_img_rgb[:sh, :sw] * mask3
-                composed = composed.clip(0, 255).astype(np.uint8)
-
-            # 视频淡入淡出（亮度渐变）
-            out_frame = composed[:, :, :3]
+            # 视频淡入淡出（亮度渐变），作为合成的最后一步乘入
+            brightness = 1.0
             if fade_in_frames > 0 and frame_idx < fade_in_frames:
                 brightness = frame_idx / fade_in_frames
-                out_frame = (out_frame.astype(np.float32) * brightness).clip(0, 255).astype(np.uint8)
             elif fade_out_frames > 0 and frame_idx >= total_frames - fade_out_frames:
                 brightness = (total_frames - 1 - frame_idx) / fade_out_frames
-                out_frame = (out_frame.astype(np.float32) * brightness).clip(0, 255).astype(np.uint8)
 
+            composed = compositor.composite(bg_frame, brightness)
+
+            out_frame = composed[:, :, :3]
             writer.write_frame(out_frame)
 
             if progress_callback and (frame_idx % 30 == 0 or frame_idx == total_frames - 1):
@@ -854,6 +1659,156 @@ def render_info_segment_accel(
         return {"status": "error", "info": f"渲染失败: {str(e)}"}
 
 
+def _make_frame_cb(progress_callback, clip_index: int, total_clips: int):
+    """把单个片段的逐帧进度 (frame, total_frames, clip_name) 转发为整体进度回调"""
+    def frame_cb(frame, total_frames, clip_name):
+        progress_callback(clip_index, total_clips, frame, total_frames, clip_name)
+    return frame_cb
+
+
+def _render_clip_job(job: dict, progress_queue=None, frame_callback=None) -> dict:
+    """
+    执行单个片段渲染任务，可在主线程、工作线程或子进程中运行。
+
+    Args:
+        job: 由 render_all_clips_accel 构造的任务描述（仅包含可 pickle 的数据）
+        progress_queue: 并行模式下的进度队列，帧进度以
+            (clip_index, frame, total_frames, clip_name) 投递，由主线程统一回调
+        frame_callback: 串行模式下直接调用的帧级回调
+    Returns:
+        {"status", "info", "elapsed"}
+    """
+    clip_index = job['clip_index']
+    if job.get('bg_cache_mb') is not None:
+        # 子进程中缓存是独立的，需要按主进程配置重新设置预算
+        from utils.FrameCache import configure_frame_cache, get_frame_cache
+        if get_frame_cache().budget_bytes != int(job['bg_cache_mb']) * 1024 * 1024:
+            configure_frame_cache(job['bg_cache_mb'])
+    if progress_queue is not None:
+        def frame_callback(frame, total_frames, clip_name):
+            progress_queue.put((clip_index, frame, total_frames, clip_name))
+
+    t_clip_start = time.perf_counter()
+    common = dict(
+        fps=job['fps'], bitrate=job['bitrate'], codec=job['codec'],
+        progress_callback=frame_callback,
+        fade_in=job['fade_in'], fade_out=job['fade_out'],
+        use_taichi=job['use_taichi'],
+        pipe_pix_fmt=job['pipe_pix_fmt'],
+        transition_keyframes=job.get('transition_keyframes', 0),
+    )
+    if job.get('reblend'):
+        result = reblend_segment_text_accel(
+            job['game_type'], job['config'], job['style_config'], job['resolution'],
+            job['mezzanine_path'], job['output_file'],
+            **{k: v for k, v in common.items() if k != 'use_taichi'}
+        )
+    elif job['clip_type'] == "content":
+        result = render_segment_accel(
+            job['game_type'], job['config'], job['style_config'], job['resolution'],
+            job['output_file'], decoder=job['decoder'], batch_size=job.get('batch_size', 1),
+            mezzanine_path=job.get('mezzanine_path'), **common
+        )
+    else:
+        result = render_info_segment_accel(
+            job['config'], job['style_config'], job['resolution'],
+            job['output_file'], **common
+        )
+    result['elapsed'] = time.perf_counter() - t_clip_start
+    return result
+
+
+def _worker_cache_budget_mb(bg_cache_mb, max_workers: int, parallel_mode: str):
+    """
+    单个渲染任务使用的背景帧缓存预算（MB）。
+    多进程模式下每个子进程各有一份独立的缓存，总预算按进程数平分；线程模式共享主进程的缓存。
+    """
+    if bg_cache_mb is None or parallel_mode != "process" or max_workers <= 1:
+        return bg_cache_mb
+    return int(bg_cache_mb) // max_workers
+
+
+def _run_clip_jobs_parallel(jobs: list, max_workers: int, parallel_mode: str,
+                            total_clips: int, progress_callback=None) -> dict:
+    """
+    并发渲染多个片段，返回 {clip_index: result}。
+
+    parallel_mode:
+        "thread": 同进程线程池，所有线程共享 Taichi 工作线程的 kernel 队列
+                  （GPU 合成串行排队），解码/缩放/FFmpeg 编码在各线程中并行
+        "process": 子进程池，子进程不初始化 Taichi，使用 CPU 合成
+    进度回调始终在调用线程中触发（Streamlit 只能在脚本线程更新界面）。
+    """
+    import queue as _queue_module
+    from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, wait, FIRST_COMPLETED
+
+    manager = None
+    if parallel_mode == "process":
+        import multiprocessing
+        # spawn：避免 fork 继承父进程的 CUDA/Taichi 运行时状态
+        ctx = multiprocessing.get_context("spawn")
+        manager = ctx.Manager()
+        progress_queue = manager.Queue()
+        executor = ProcessPoolExecutor(max_workers=max_workers, mp_context=ctx)
+    else:
+        progress_queue = _queue_module.Queue()
+        executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="ClipRender")
+
+    def drain_progress():
+        while True:
+            try:
+                idx, frame, total_frames, clip_name = progress_queue.get_nowait()
+            except _queue_module.Empty:
+                return
+            if progress_callback:
+                progress_callback(idx, total_clips, frame, total_frames, clip_name)
+
+    results = {}
+    try:
+        with executor:
+            futures = {executor.submit(_render_clip_job, job, progress_queue): job for job in jobs}
+            pending = set(futures)
+            while pending:
+                done, pending = wait(pending, timeout=0.2, return_when=FIRST_COMPLETED)
+                drain_progress()
+                for future in done:
+                    job = futures[future]
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        result = {"status": "error", "info": str(e), "elapsed": 0.0}
+                    results[job['clip_index']] = result
+                    print(f"[Timer] 片段 {job['file_stem']} 渲染耗时: {result['elapsed']:.2f}s")
+                    if result['status'] == 'error':
+                        # 取消尚未开始的任务，已在运行的任务等待其结束
+                        for other in pending:
+                            other.cancel()
+            drain_progress()
+    finally:
+        if manager is not None:
+            manager.shutdown()
+    return results
+
+
+RENDER_ENGINES = ("moviepy", "numpy", "taichi")
+
+
+def resolve_render_engine(value) -> str:
+    """
+    解析 USE_GPU_ACCEL 配置为渲染引擎名称：
+    "moviepy"（MoviePy CompositeVideoClip）、"numpy"（加速管线 + NumPy/OpenCV 合成）、
+    "taichi"（加速管线 + Taichi 合成）。兼容旧版布尔值：True → taichi，False → moviepy。
+    """
+    if isinstance(value, str):
+        engine = value.strip().lower()
+        if engine in RENDER_ENGINES:
+            return engine
+        if engine in ("true", "1", "gpu"):
+            return "taichi"
+        return "moviepy"
+    return "taichi" if value else "moviepy"
+
+
 def render_all_clips_accel(
     game_type: str,
     style_config: dict,
@@ -867,92 +1822,378 @@ def render_all_clips_accel(
     trans_time: float = 1,
     force_render: bool = False,
     fps: int = 30,
-    progress_callback=None
+    progress_callback=None,
+    max_workers: int = 1,
+    parallel_mode: str = "thread",
+    pipe_pix_fmt: str = "rgb24",
+    bg_cache_mb: int = None,
+    decoder: str = "opencv",
+    engine: str = "taichi",
+    batch_size: int = 1,
+    keep_intermediate: bool = False
 ):
     """
-    使用 GPU 加速渲染所有视频片段 —— 替代 VideoUtils.render_all_video_clips()
+    使用加速管线渲染所有视频片段 —— 替代 VideoUtils.render_all_video_clips()
     progress_callback: (clip_index, total_clips, frame, total_frames, clip_name) -> None
+    max_workers: 同时渲染的片段数，1 为逐个渲染
+    parallel_mode: "thread"（共享 GPU 合成队列）或 "process"（纯 CPU 合成子进程）
+    pipe_pix_fmt: 送入 FFmpeg 的像素格式，"yuv420p" 时在 Python 端转换并减半管道带宽
+    bg_cache_mb: 背景视频解码帧缓存的内存预算（MB），None 时保持 FrameCache 当前设置，0 禁用；
+        多进程模式下为所有子进程的总预算，按进程数平分
+    decoder: 谱面视频解码方式（"opencv" / "ffmpeg" / "ffmpeg_hw"），见 render_segment_accel
+    engine: 合成引擎，"taichi" 或 "numpy"（纯 CPU 合成，不初始化 Taichi）
+    batch_size: Taichi 合成时每次批量提交的帧数，见 FrameCompositor.composite_batch
+    keep_intermediate: 为内容片段保留不含评论文字的中间文件（.intermediate/），
+        之后只修改评论文字的片段直接在中间文件上重新叠加文字
     """
     codec, codec_name = detect_hw_encoder()
-    print(f"[AccelRenderer] 使用编码器: {codec_name}")
+    # 多进程模式的子进程不初始化 Taichi，始终使用 NumPy 合成
+    use_taichi = engine == "taichi" and parallel_mode != "process"
+    print(f"[AccelRenderer] 使用编码器: {codec_name}，合成引擎: {'taichi' if use_taichi else 'numpy'}")
     print(f"[AccelRenderer] 输出路径: {video_output_path}")
 
+    if bg_cache_mb is not None:
+        from utils.FrameCache import configure_frame_cache
+        configure_frame_cache(bg_cache_mb)
+
     t_all_start = time.perf_counter()
     total_clips = len(main_configs) + len(intro_configs or []) + len(ending_configs or [])
-    clip_index = [0]  # 使用列表以便在闭包中修改
-    vfile_prefix = 0
 
-    def _make_frame_callback():
-        """为当前片段创建帧级回调"""
-        idx = clip_index[0]
-        if progress_callback is None:
-            return None
-        def cb(frame, total_frames, clip_name):
-            progress_callback(idx, total_clips, frame, total_frames, clip_name)
-        return cb
-
-    def render_clip(config, prefix, clip_type="content", override_name=None):
-        nonlocal vfile_prefix
-        name = override_name or config.get('clip_title_name', 'clip')
-        name = remove_invalid_chars(name)
+    # 按 开场 → 主要 → 结尾 顺序分配文件前缀，保证 {prefix}_{name}.mp4 排序与串行渲染一致
+    fade_time = trans_time if auto_add_transition else 0
+    # 渲染清单：只重新渲染内容哈希变化的片段
+    from utils.RenderManifest import (RenderManifest, compute_clip_hash, compute_video_layer_hash,
+                                      intermediate_path)
+    os.makedirs(video_output_path, exist_ok=True)
+    manifest = RenderManifest(video_output_path)
+    jobs = []
+    ordered = [(c, "info", "INTRO") for c in (intro_configs or [])]
+    ordered += [(c, "content", None) for c in main_configs]
+    ordered += [(c, "info", "ENDING") for c in (ending_configs or [])]
+    for prefix, (config, clip_type, override_name) in enumerate(ordered):
+        name = remove_invalid_chars(override_name or config.get('clip_title_name', 'clip'))
         output_file = os.path.join(video_output_path, f"{prefix}_{name}.mp4")
+        clip_hash = compute_clip_hash(config, style_config, clip_type, resolution=video_res, fps=fps,
+                                      codec=codec, bitrate=video_bitrate, fade_in=fade_time, fade_out=fade_time)
+        if not manifest.needs_render(output_file, clip_hash, force_render):
+            print(f"[AccelRenderer] 跳过未变化的片段: {prefix}_{name}.mp4")
+            continue
+        jobs.append({
+            'clip_index': prefix,
+            'clip_type': clip_type,
+            'file_stem': f"{prefix}_{name}",
+            'game_type': game_type,
+            'config': config,
+            'style_config': style_config,
+            'resolution': video_res,
+            'output_file': output_file,
+            'fps': fps,
+            'bitrate': video_bitrate,
+            'codec': codec,
+            'fade_in': fade_time,
+            'fade_out': fade_time,
+            'use_taichi': use_taichi,
+            'pipe_pix_fmt': pipe_pix_fmt,
+            'bg_cache_mb': bg_cache_mb,
+            'decoder': decoder,
+            'batch_size': max(1, int(batch_size or 1)),
+            'clip_hash': clip_hash,
+            # 未烘焙转场的片段在转场窗口边界强制关键帧，供 transition island 流拷贝主体部分
+            'transition_keyframes': 0 if auto_add_transition else trans_time,
+        })
+        if keep_intermediate and clip_type == "content":
+            mezzanine_path = intermediate_path(video_output_path, f"{prefix}_{name}")
+            layer_hash = compute_video_layer_hash(config, style_config, resolution=video_res, fps=fps)
+            reblend = not force_render and manifest.is_current(mezzanine_path, layer_hash)
+            jobs[-1].update(mezzanine_path=mezzanine_path, layer_hash=layer_hash, reblend=reblend)
+            if reblend:
+                print(f"[AccelRenderer] 仅评论文字变化，使用中间文件重新叠加: {prefix}_{name}.mp4")
+
+    def record_job(job):
+        manifest.record(job['output_file'], job['clip_hash'])
+        if job.get('mezzanine_path') and not job['reblend'] and os.path.exists(job['mezzanine_path']):
+            manifest.record(job['mezzanine_path'], job['layer_hash'])
+
+    max_workers = max(1, min(int(max_workers or 1), len(jobs) or 1))
+    if max_workers > 1:
+        print(f"[AccelRenderer] 并行渲染: {max_workers} 个{'进程' if parallel_mode == 'process' else '线程'}，"
+              f"共 {len(jobs)} 个待渲染片段")
+        job_cache_mb = _worker_cache_budget_mb(bg_cache_mb, max_workers, parallel_mode)
+        for job in jobs:
+            job['bg_cache_mb'] = job_cache_mb
+        results = _run_clip_jobs_parallel(jobs, max_workers, parallel_mode, total_clips, progress_callback)
+        # 先记录所有成功的片段，失败后重新渲染时不必重复这些片段
+        for job in jobs:
+            result = results.get(job['clip_index'])
+            if result is not None and result['status'] != 'error':
+                record_job(job)
+        for job in jobs:
+            result = results.get(job['clip_index'])
+            if result is None:
+                raise RuntimeError(f"[AccelRenderer] 片段 {job['file_stem']} 未渲染（前序片段失败后已取消）")
+            if result['status'] == 'error':
+                raise RuntimeError(f"[AccelRenderer] 片段 {job['file_stem']} 渲染失败: {result['info']}")
+    else:
+        t_phase = time.perf_counter()
+        for job in jobs:
+            frame_cb = (_make_frame_cb(progress_callback, job['clip_index'], total_clips)
+                        if progress_callback is not None else None)
+            result = _render_clip_job(job, frame_callback=frame_cb)
+            print(f"[Timer] 片段 {job['file_stem']} 渲染耗时: {result['elapsed']:.2f}s")
+            if result['status'] == 'error':
+                raise RuntimeError(f"[AccelRenderer] 片段 {job['file_stem']} 渲染失败: {result['info']}")
+            record_job(job)
+        print(f"[Timer] === 片段渲染阶段耗时: {time.perf_counter() - t_phase:.2f}s ({len(jobs)} 个) ===")
 
-        if os.path.exists(output_file) and not force_render:
-            print(f"[AccelRenderer] 跳过已存在: {prefix}_{name}.mp4")
-            clip_index[0] += 1
-            return
+    t_all_elapsed = time.perf_counter() - t_all_start
+    print(f"[Timer] ====== 全部片段渲染总耗时: {t_all_elapsed:.2f}s (共 {total_clips} 个) ======")
 
-        # 确定淡入淡出时长
-        fade_in_time = trans_time if auto_add_transition else 0
-        fade_out_time = trans_time if auto_add_transition else 0
 
-        t_clip_start = time.perf_counter()
-        frame_cb = _make_frame_callback()
-        if clip_type == "content":
-            result = render_segment_accel(
-                game_type, config, style_config, video_res,
-                output_file, fps=fps, bitrate=video_bitrate, codec=codec,
-                progress_callback=frame_cb,
-                fade_in=fade_in_time, fade_out=fade_out_time
-            )
+# ============================================================================
+# 整片流式渲染：所有片段的帧写入同一个编码器，转场在合成阶段完成
+# ============================================================================
+
+class FullVideoStream:
+    """
+    整片流式写入：所有片段依次写入同一个 FFmpegWriter，不生成片段文件与临时文件。
+
+    相邻片段的转场（交叉淡化）在写入阶段完成：前一片段的最后 overlap 帧暂存在内存中，
+    与后一片段的前 overlap 帧按 cv2.addWeighted 混合后写出，等价于 xfade=fade。
+    管道格式为 yuv420p 时同样逐平面线性混合，与 FFmpeg xfade 在 YUV 空间混合一致。
+
+    begin_clip 返回自身，作为 render_segment_accel / render_info_segment_accel 的 frame_sink：
+    片段渲染函数调用 write_frame 写帧，调用 close 结束当前片段；整片结束时调用 finish。
+    """
+
+    def __init__(self, writer: FFmpegWriter):
+        self.writer = writer
+        self.input_pix_fmt = writer.input_pix_fmt
+        self._held = []
+        self._held_count = 0
+        self._blend_buf = np.empty(writer.frame_shape, dtype=np.uint8)
+        self._clip_frames = 0
+        self._overlap_out = 0
+        self._frame_idx = 0
+        self._incomplete = None
+        self.frames_written = 0
+
+    @property
+    def frame_shape(self) -> tuple:
+        return self.writer.frame_shape
+
+    def begin_clip(self, total_frames: int, overlap_out: int = 0) -> 'FullVideoStream':
+        """开始一个片段：overlap_out 为与下一片段交叉淡化的帧数（最后一个片段为 0）"""
+        self._check_complete()
+        overlap_in = self._held_count
+        if overlap_in + overlap_out > total_frames:
+            raise ValueError(f"片段帧数 {total_frames} 少于转场帧数 {overlap_in} + {overlap_out}")
+        while len(self._held) < overlap_out:
+            self._held.append(np.empty(self.writer.frame_shape, dtype=np.uint8))
+        self._clip_frames = total_frames
+        self._overlap_out = overlap_out
+        self._frame_idx = 0
+        return self
+
+    def write_frame(self, frame: np.ndarray):
+        if frame.shape != self.writer.frame_shape or frame.dtype != np.uint8:
+            # 信息片段写入 RGB 帧，由编码器的慢路径转换为管道格式
+            frame = self.writer._conform_frame(frame)
+        k = self._frame_idx
+        self._frame_idx += 1
+        overlap_in = self._held_count
+        if k < overlap_in:
+            # 交叉淡化：前一片段的权重从 1 线性降到 0
+            alpha = (k + 1) / (overlap_in + 1)
+            cv2.addWeighted(self._held[k], 1.0 - alpha, frame, alpha, 0, dst=self._blend_buf)
+            self._write(self._blend_buf)
+        elif k >= self._clip_frames - self._overlap_out:
+            np.copyto(self._held[k - (self._clip_frames - self._overlap_out)], frame)
         else:
-            result = render_info_segment_accel(
-                config, style_config, video_res,
-                output_file, fps=fps, bitrate=video_bitrate, codec=codec,
-                progress_callback=frame_cb,
-                fade_in=fade_in_time, fade_out=fade_out_time
-            )
-        t_clip_elapsed = time.perf_counter() - t_clip_start
-        print(f"[Timer] 片段 {prefix}_{name} 渲染耗时: {t_clip_elapsed:.2f}s")
-
-        if result['status'] == 'error':
-            raise RuntimeError(f"[AccelRenderer] 片段 {prefix}_{name} 渲染失败: {result['info']}")
-        clip_index[0] += 1
-
-    # 开场片段
-    t_phase = time.perf_counter()
-    if intro_configs:
-        for config in intro_configs:
-            render_clip(config, vfile_prefix, "info", "INTRO")
-            vfile_prefix += 1
-    if intro_configs:
-        print(f"[Timer] === 开场片段阶段耗时: {time.perf_counter() - t_phase:.2f}s ===")
-
-    # 主要片段
-    t_phase = time.perf_counter()
-    for config in main_configs:
-        render_clip(config, vfile_prefix, "content")
-        vfile_prefix += 1
-    print(f"[Timer] === 主要片段阶段耗时: {time.perf_counter() - t_phase:.2f}s ({len(main_configs)} 个) ===")
-
-    # 结尾片段
-    t_phase = time.perf_counter()
-    if ending_configs:
-        for config in ending_configs:
-            render_clip(config, vfile_prefix, "info", "ENDING")
-            vfile_prefix += 1
-    if ending_configs:
-        print(f"[Timer] === 结尾片段阶段耗时: {time.perf_counter() - t_phase:.2f}s ===")
+            self._write(frame)
 
-    t_all_elapsed = time.perf_counter() - t_all_start
-    print(f"[Timer] ====== 全部片段渲染总耗时: {t_all_elapsed:.2f}s (共 {vfile_prefix} 个) ======")
+    def _write(self, frame: np.ndarray):
+        self.writer.write_frame(frame)
+        self.frames_written += 1
+
+    def close(self):
+        """结束当前片段：暂存的尾部帧留给下一片段混合（片段渲染函数出错时也会调用，因此不抛出异常）"""
+        if self._frame_idx < self._clip_frames:
+            self._incomplete = (self._frame_idx, self._clip_frames)
+        self._held_count = self._overlap_out
+        self._overlap_out = 0
+
+    def _check_complete(self):
+        # 帧数不足会使之后的画面与音频时间轴错位
+        if self._incomplete is not None:
+            written, total = self._incomplete
+            raise RuntimeError(f"片段只写入了 {written}/{total} 帧")
+
+    def finish(self):
+        self._check_complete()
+        # 最后一个片段不应留下暂存帧；防御性地原样写出
+        for k in range(self._held_count):
+            self._write(self._held[k])
+        self._held_count = 0
+        self.writer.close()
+
+
+def _stream_overlap_frames(frame_counts: list, fps: int, trans_time: float) -> list:
+    """相邻片段的交叉淡化帧数，每个片段的首尾转场合计不超过片段本身的帧数"""
+    overlaps = []
+    for i in range(len(frame_counts) - 1):
+        n = int(round(trans_time * fps)) if trans_time > 0 else 0
+        overlaps.append(max(0, min(n, frame_counts[i] // 2, frame_counts[i + 1] // 2)))
+    return overlaps
+
+
+def _build_stream_audio_graph(audio_clips: list, total_duration: float) -> tuple:
+    """
+    构建整片音频滤镜图，返回 (FFmpeg 输入参数, filter_complex)。
+
+    audio_clips: [(音频路径或 None, 起点, 时长, 在成片中的起始时间, 增益 dB, 淡入秒数, 淡出秒数)]
+    每个片段裁剪、增益、淡入淡出（交叉淡化区间）后用 adelay 放到成片时间轴上，amix 混合。
+    增益已按各片段的响度测量值把片段调整到目标响度（见 LoudnessCache），混合后不再整体 loudnorm。
+    FFmpeg 输入从 1 开始编号（0 为视频管道）。
+    """
+    inputs = []
+    chains = []
+    labels = []
+    for audio_path, start, duration, offset, gain_db, fade_in, fade_out in audio_clips:
+        if not audio_path or not os.path.exists(audio_path):
+            continue
+        input_idx = len(labels) + 1
+        inputs += ['-ss', f"{start:.6f}", '-t', f"{duration:.6f}", '-i', audio_path]
+        filters = ["asetpts=PTS-STARTPTS"]
+        if abs(gain_db) > 0.5:
+            filters.append(f"volume={gain_db:.1f}dB")
+        if fade_in > 0:
+            filters.append(f"afade=t=in:d={fade_in:.6f}")
+        if fade_out > 0:
+            filters.append(f"afade=t=out:st={max(0.0, duration - fade_out):.6f}:d={fade_out:.6f}")
+        filters.append("aresample=48000,aformat=sample_fmts=fltp:channel_layouts=stereo")
+        delay_ms = int(round(offset * 1000))
+        if delay_ms > 0:
+            filters.append(f"adelay={delay_ms}:all=1")
+        label = f"a{len(labels)}"
+        chains.append(f"[{input_idx}:a]{','.join(filters)}[{label}]")
+        labels.append(label)
+
+    if labels:
+        mix = (f"{''.join(f'[{label}]' for label in labels)}"
+               f"amix=inputs={len(labels)}:normalize=0:dropout_transition=0,")
+    else:
+        inputs += ['-f', 'lavfi', '-i', 'anullsrc=channel_layout=stereo:sample_rate=48000']
+        mix = "[1:a]"
+    chains.append(f"{mix}aresample=48000,"
+                  f"apad,atrim=duration={total_duration:.6f},asetpts=N/SR/TB[aout]")
+    return inputs, ";".join(chains)
+
+
+def render_full_video_stream_accel(
+    game_type: str,
+    style_config: dict,
+    main_configs: list,
+    output_file: str,
+    video_res: tuple,
+    video_bitrate: str,
+    intro_configs: list = None,
+    ending_configs: list = None,
+    trans_time: float = 1,
+    fps: int = 30,
+    progress_callback=None,
+    pipe_pix_fmt: str = "rgb24",
+    bg_cache_mb: int = None,
+    decoder: str = "opencv",
+    engine: str = "taichi",
+    batch_size: int = 1
+) -> str:
+    """
+    直接生成完整视频：逐个渲染所有片段并把帧流式写入同一个 FFmpeg 编码器（FullVideoStream），
+    转场在写入阶段交叉淡化，全部片段的音频按各自的响度测量值调整增益后由同一个滤镜图混合。
+    整片只编码一次，不生成片段文件与拼接临时文件；代价是不能跳过未变化的片段，也不能并行渲染。
+
+    trans_time: 相邻片段的交叉淡化时长（秒），0 为直接拼接
+    progress_callback: (clip_index, total_clips, frame, total_frames, clip_name) -> None
+    其余参数含义见 render_all_clips_accel。返回 output_file。
+    """
+    codec, codec_name = detect_hw_encoder()
+    use_taichi = engine == "taichi"
+    print(f"[AccelRenderer] 整片流式渲染，编码器: {codec_name}，合成引擎: {'taichi' if use_taichi else 'numpy'}")
+    if bg_cache_mb is not None:
+        from utils.FrameCache import configure_frame_cache
+        configure_frame_cache(bg_cache_mb)
+
+    t_all_start = time.perf_counter()
+    ordered = [(c, "info", "INTRO") for c in (intro_configs or [])]
+    ordered += [(c, "content", None) for c in main_configs]
+    ordered += [(c, "info", "ENDING") for c in (ending_configs or [])]
+    if not ordered:
+        raise ValueError("没有需要渲染的片段")
+    total_clips = len(ordered)
+
+    frame_counts = [int(c.get('duration', 10 if clip_type == "content" else 5) * fps)
+                    for c, clip_type, _ in ordered]
+    overlaps = _stream_overlap_frames(frame_counts, fps, trans_time)
+    total_frames = sum(frame_counts) - sum(overlaps)
+
+    # 各片段的音频源；响度测量并发执行并缓存，之后逐片段计算增益
+    audio_sources = []
+    for i, (config, clip_type, _) in enumerate(ordered):
+        if clip_type == "content":
+            audio_sources.append((config.get('video'), config.get('start', 0), frame_counts[i] / fps))
+        else:
+            audio_sources.append((style_config['asset_paths'].get('intro_bgm'), 0, frame_counts[i] / fps))
+    from utils.LoudnessCache import prefetch_loudness
+    prefetch_loudness(audio_sources)
+
+    # 音频时间轴：每个片段的起点为此前所有片段帧数减去交叉淡化帧数
+    audio_clips = []
+    timeline_frame = 0
+    for i, (config, clip_type, override_name) in enumerate(ordered):
+        clip_name = override_name or config.get('clip_title_name', 'clip')
+        audio_path, audio_start, duration = audio_sources[i]
+        gain_db = _clip_volume_adjust_db(audio_path, audio_start, duration, clip_name)
+        fade_in = overlaps[i - 1] / fps if i > 0 else 0
+        fade_out = overlaps[i] / fps if i < len(overlaps) else 0
+        audio_clips.append((audio_path, audio_start, duration, timeline_frame / fps, gain_db, fade_in, fade_out))
+        timeline_frame += frame_counts[i] - (overlaps[i] if i < len(overlaps) else 0)
+    audio_inputs, audio_filter = _build_stream_audio_graph(audio_clips, total_frames / fps)
+
+    os.makedirs(os.path.dirname(os.path.abspath(output_file)), exist_ok=True)
+    partial_file = _partial_path(output_file)
+    writer = FFmpegWriter(
+        partial_file, video_res[0], video_res[1], fps=fps, codec=codec, bitrate=video_bitrate,
+        threaded=True, input_pix_fmt=pipe_pix_fmt,
+        audio_inputs=audio_inputs, audio_filter=audio_filter,
+    )
+    stream = FullVideoStream(writer)
+    try:
+        for i, (config, clip_type, override_name) in enumerate(ordered):
+            t_clip_start = time.perf_counter()
+            clip_name = override_name or config.get('clip_title_name', 'clip')
+            frame_cb = _make_frame_cb(progress_callback, i, total_clips) if progress_callback is not None else None
+            sink = stream.begin_clip(frame_counts[i], overlaps[i] if i < len(overlaps) else 0)
+            common = dict(fps=fps, bitrate=video_bitrate, codec=codec, progress_callback=frame_cb,
+                          use_taichi=use_taichi, pipe_pix_fmt=pipe_pix_fmt, frame_sink=sink)
+            if clip_type == "content":
+                result = render_segment_accel(game_type, config, style_config, video_res, partial_file,
+                                              decoder=decoder, batch_size=max(1, int(batch_size or 1)),
+                                              **common)
+            else:
+                result = render_info_segment_accel(config, style_config, video_res, partial_file, **common)
+            if result['status'] == 'error':
+                raise RuntimeError(f"[AccelRenderer] 片段 {clip_name} 渲染失败: {result['info']}")
+            print(f"[Timer] 片段 {i}_{clip_name} 渲染耗时: {time.perf_counter() - t_clip_start:.2f}s")
+        stream.finish()
+    except BaseException:
+        writer.close()
+        if os.path.exists(partial_file):
+            os.remove(partial_file)
+        raise
+
+    if writer.process.returncode != 0:
+        raise RuntimeError(f"[AccelRenderer] 整片编码失败，FFmpeg 返回码 {writer.process.returncode}")
+    os.replace(partial_file, output_file)
+    print(f"[Timer] ====== 整片流式渲染总耗时: {time.perf_counter() - t_all_start:.2f}s "
+          f"(共 {total_clips} 个片段，{stream.frames_written} 帧) ======")
+    return output_file
@@ -0,0 +1,389 @@
+"""
+CpuAccel.py - NumPy/OpenCV 合成模块
+
+提供与 TaichiAccel.FrameCompositor 相同接口的纯 CPU 合成器，以及两者共用的
+静态底板（plate）预合成工具：一个内容片段中只有谱面视频矩形逐帧变化，
+背景、成绩图、评论文字在片段内不变，可以一次性合成为 RGB 底板，
+逐帧只需处理视频矩形区域。
+
+NumPy 合成器在初始化时把叠加层转为 uint8 预乘颜色与 uint8 视频保留系数，
+逐帧混合只需 cv2.multiply + cv2.add 两次整数运算（背景暗化用 cv2.LUT 查表），
+没有 float32 中间数组，作为无 Taichi 环境下的独立渲染引擎（"numpy"）使用。
+
+叠加层在合成器构造时裁剪到非透明外接矩形（crop_to_content）：成绩图覆盖整幅画布
+但大部分透明，文字图也只占评论框，混合只在外接矩形内进行，其余区域直接使用底板/背景。
+
+另提供 RGB → yuv420p 转换（Yuv420pConverter），供 FFmpegWriter 直接以
+yuv420p 接收帧，省去 FFmpeg 内部的 swscale 转换并减半管道带宽。
+"""
+
+import numpy as np
+
+
+def _split_rgba_f32(image: np.ndarray):
+    """将 RGBA/RGB 图像拆分为 float32 RGB 与 [0,1] 蒙版"""
+    if image.ndim == 3 and image.shape[2] == 4:
+        return image[:, :, :3].astype(np.float32), image[:, :, 3].astype(np.float32) / 255.0
+    if image.ndim == 3 and image.shape[2] == 3:
+        return image.astype(np.float32), np.ones(image.shape[:2], dtype=np.float32)
+    raise ValueError(f"Unsupported image shape: {image.shape}")
+
+
+def _clip_rect(x: int, y: int, w: int, h: int, out_w: int, out_h: int):
+    """将 (x, y, w, h) 矩形裁剪到画布范围内，返回 (x1, y1, x2, y2)"""
+    return max(0, x), max(0, y), min(out_w, x + w), min(out_h, y + h)
+
+
+def content_bbox(image: np.ndarray):
+    """
+    RGBA 图像中 alpha > 0 像素的最小外接矩形 (x1, y1, x2, y2)，全透明时返回 None。
+    RGB 图像视为完全不透明，返回整幅。
+    """
+    h, w = image.shape[:2]
+    if image.ndim != 3 or image.shape[2] != 4:
+        return (0, 0, w, h)
+    alpha = image[:, :, 3]
+    rows = np.flatnonzero(alpha.any(axis=1))
+    if len(rows) == 0:
+        return None
+    cols = np.flatnonzero(alpha.any(axis=0))
+    return (int(cols[0]), int(rows[0]), int(cols[-1]) + 1, int(rows[-1]) + 1)
+
+
+def crop_to_content(image: np.ndarray, pos: tuple = (0, 0)):
+    """
+    将叠加层裁剪到非透明外接矩形，返回 (cropped, (x, y))，(x, y) 为裁剪后在画布上的位置。
+    全透明时返回 1x1 的透明像素（混合结果与不叠加相同），避免下游处理空数组。
+    """
+    ox, oy = int(pos[0]), int(pos[1])
+    bbox = content_bbox(image)
+    if bbox is None:
+        return np.zeros((1, 1, 4), dtype=image.dtype), (ox, oy)
+    x1, y1, x2, y2 = bbox
+    return image[y1:y2, x1:x2], (ox + x1, oy + y1)
+
+
+def union_rect(layers, output_size: tuple):
+    """
+    若干叠加层 [(image, (x, y)), ...] 在画布上覆盖范围的并集，裁剪到画布内，
+    返回 (x1, y1, x2, y2)；与画布无交集时返回空矩形 (0, 0, 0, 0)。
+    """
+    out_w, out_h = output_size
+    rects = []
+    for image, (ox, oy) in layers:
+        oh, ow = image.shape[:2]
+        x1, y1, x2, y2 = _clip_rect(int(ox), int(oy), ow, oh, out_w, out_h)
+        if x2 > x1 and y2 > y1:
+            rects.append((x1, y1, x2, y2))
+    if not rects:
+        return (0, 0, 0, 0)
+    return (min(r[0] for r in rects), min(r[1] for r in rects),
+            max(r[2] for r in rects), max(r[3] for r in rects))
+
+
+def _blend_into(dst: np.ndarray, overlay: np.ndarray, pos: tuple):
+    """将 RGBA 叠加层按 alpha 混合到 float32 画布 dst 上（原地）"""
+    out_h, out_w = dst.shape[:2]
+    ox, oy = int(pos[0]), int(pos[1])
+    oh, ow = overlay.shape[:2]
+    x1, y1, x2, y2 = _clip_rect(ox, oy, ow, oh, out_w, out_h)
+    if x2 <= x1 or y2 <= y1:
+        return
+    rgb, mask = _split_rgba_f32(overlay[y1 - oy:y2 - oy, x1 - ox:x2 - ox])
+    mask3 = mask[:, :, np.newaxis]
+    region = dst[y1:y2, x1:x2]
+    region *= (1.0 - mask3)
+    region += rgb * mask3
+
+
+def build_static_plate(bg: np.ndarray, score_image: np.ndarray, text_image: np.ndarray,
+                       text_pos: tuple, bg_brightness: float,
+                       output_size: tuple, score_pos: tuple = (0, 0)) -> np.ndarray:
+    """
+    预合成静态底板：bg (dimmed) → score → text，不含谱面视频。
+    与 _five_layer_fast_kernel 一致：float32 计算，最终截断为 uint8。
+    score_pos: 成绩图位置，成绩图已裁剪到非透明区域时不为 (0, 0)
+
+    Returns:
+        plate: (H, W, 3) uint8
+    """
+    out_w, out_h = output_size
+    plate = bg[:out_h, :out_w, :3].astype(np.float32) * np.float32(bg_brightness)
+    _blend_into(plate, score_image, score_pos)
+    _blend_into(plate, text_image, text_pos)
+    return np.clip(plate, 0, 255).astype(np.uint8)
+
+
+def build_video_overlay(score_image: np.ndarray, text_image: np.ndarray,
+                        video_pos: tuple, video_size: tuple, text_pos: tuple,
+                        output_size: tuple, score_pos: tuple = (0, 0)):
+    """
+    提取位于谱面视频矩形上方的叠加层，并将 score/text 两层融合为一层：
+
+        out = v * (1-sa)(1-ta) + [s*sa*(1-ta) + t*ta]
+            = v * inv + premul
+
+    Args:
+        video_size: (w, h) 视频帧尺寸；传入叠加层外接矩形时得到该矩形范围的融合层
+        score_pos: 成绩图位置
+    Returns:
+        (premul, inv, rect)
+        premul: (h, w, 3) float32 预乘颜色
+        inv: (h, w) float32 视频保留系数
+        rect: (x1, y1, x2, y2) 视频矩形在画布上的可见范围
+    """
+    out_w, out_h = output_size
+    vx, vy = int(video_pos[0]), int(video_pos[1])
+    vw, vh = int(video_size[0]), int(video_size[1])
+    x1, y1, x2, y2 = _clip_rect(vx, vy, vw, vh, out_w, out_h)
+    rh, rw = max(0, y2 - y1), max(0, x2 - x1)
+
+    premul = np.zeros((rh, rw, 3), dtype=np.float32)
+    inv = np.ones((rh, rw), dtype=np.float32)
+    for overlay, (ox, oy) in ((score_image, score_pos), (text_image, text_pos)):
+        ox, oy = int(ox), int(oy)
+        oh, ow = overlay.shape[:2]
+        ix1, iy1 = max(x1, int(ox)), max(y1, int(oy))
+        ix2, iy2 = min(x2, int(ox) + ow), min(y2, int(oy) + oh)
+        if ix2 <= ix1 or iy2 <= iy1:
+            continue
+        rgb, mask = _split_rgba_f32(overlay[iy1 - oy:iy2 - oy, ix1 - ox:ix2 - ox])
+        mask3 = mask[:, :, np.newaxis]
+        ry, rx = slice(iy1 - y1, iy2 - y1), slice(ix1 - x1, ix2 - x1)
+        # 后叠加的层同时衰减下方视频与已有叠加色
+        premul[ry, rx] = premul[ry, rx] * (1.0 - mask3) + rgb * mask3
+        inv[ry, rx] *= (1.0 - mask)
+    return premul, inv, (x1, y1, x2, y2)
+
+
+def quantize_overlay(premul: np.ndarray, inv: np.ndarray):
+    """
+    将 build_video_overlay 的 float32 结果量化为整数混合所需的 uint8 数组：
+    premul 四舍五入到 [0,255]，inv 放大为 0..255 并扩展为 3 通道，
+    之后 out = cv2.multiply(v, inv, scale=1/255) + premul（饱和加法）。
+    """
+    premul_u8 = np.clip(np.rint(premul), 0, 255).astype(np.uint8)
+    inv_u8 = np.clip(np.rint(inv * 255.0), 0, 255).astype(np.uint8)
+    return premul_u8, np.ascontiguousarray(np.repeat(inv_u8[:, :, np.newaxis], 3, axis=2))
+
+
+def brightness_lut(brightness: float) -> np.ndarray:
+    """亮度缩放查找表（与 np.clip(x * b).astype(uint8) 的截断结果一致）"""
+    lut = np.arange(256, dtype=np.float32) * np.float32(brightness)
+    return np.clip(lut, 0, 255).astype(np.uint8)
+
+
+def blend_premultiplied(src: np.ndarray, premul_u8: np.ndarray, inv_u8: np.ndarray,
+                        dst: np.ndarray) -> np.ndarray:
+    """dst = src * inv / 255 + premul，uint8 整数运算，dst 可以是输出缓冲区的切片视图"""
+    import cv2
+    cv2.multiply(src, inv_u8, dst=dst, scale=1.0 / 255.0)
+    cv2.add(dst, premul_u8, dst=dst)
+    return dst
+
+
+class NumpyFrameCompositor:
+    """
+    纯 CPU 帧合成器，接口与 TaichiAccel.FrameCompositor 一致。
+
+    静态背景时使用底板模式：构造时合成一次底板，逐帧只把视频矩形区域
+    (视频 * inv + premul) 写回输出缓冲区，每帧处理约 540x540 像素
+    而不是整幅 1920x1080。动态背景（update_bg）时每帧重建底板：
+    背景暗化查表，score/text 两层只在其外接矩形内用预先量化的 uint8 叠加层混合。
+    """
+
+    def __init__(
+        self,
+        bg: np.ndarray,
+        score_image: np.ndarray,
+        text_image: np.ndarray,
+        video_pos: tuple,
+        text_pos: tuple,
+        bg_brightness: float = 0.8,
+        output_size: tuple = (1920, 1080),
+    ):
+        self.out_w, self.out_h = output_size
+        self.video_pos = (int(video_pos[0]), int(video_pos[1]))
+        self.text_pos = (int(text_pos[0]), int(text_pos[1]))
+        self.bg_brightness = float(bg_brightness)
+        # 叠加层裁剪到非透明区域，后续混合只处理外接矩形
+        self.score_image, self.score_pos = crop_to_content(score_image)
+        self.text_image, self.text_pos = crop_to_content(text_image, self.text_pos)
+
+        self._plate = build_static_plate(bg, self.score_image, self.text_image, self.text_pos,
+                                         self.bg_brightness, output_size, self.score_pos)
+        self._out_buf = self._plate.copy()
+        self._overlay = None
+        self._overlay_size = None
+        # 与上一帧相比发生变化的区域，None 表示整帧（供 Yuv420pConverter 增量转换）
+        self.dirty_rect = None
+        self._full_dirty = True
+        # 淡入淡出帧写入独立缓冲区，_out_buf 始终保持原亮度的底板内容
+        self._fade_buf = None
+        self._last_faded = False
+        # 动态背景用的 uint8 叠加层（score/text 外接矩形的并集），首次 update_bg 时构建
+        self._plate_overlay = None
+        self._dim_lut = brightness_lut(self.bg_brightness)
+
+    def _ensure_plate_overlay(self):
+        if self._plate_overlay is None:
+            x1, y1, x2, y2 = union_rect(((self.score_image, self.score_pos),
+                                         (self.text_image, self.text_pos)), (self.out_w, self.out_h))
+            premul, inv, rect = build_video_overlay(
+                self.score_image, self.text_image, (x1, y1), (x2 - x1, y2 - y1),
+                self.text_pos, (self.out_w, self.out_h), self.score_pos)
+            self._plate_overlay = quantize_overlay(premul, inv) + (rect,)
+        return self._plate_overlay
+
+    def update_bg(self, bg: np.ndarray):
+        """动态背景：重建底板（整幅合成），并刷新输出缓冲区"""
+        import cv2
+        premul_u8, inv_u8, (x1, y1, x2, y2) = self._ensure_plate_overlay()
+        bg_rgb = np.ascontiguousarray(bg[:self.out_h, :self.out_w, :3])
+        cv2.LUT(bg_rgb, self._dim_lut, dst=self._plate)
+        if x2 > x1 and y2 > y1:
+            region = self._plate[y1:y2, x1:x2]
+            blend_premultiplied(region, premul_u8, inv_u8, region)
+        np.copyto(self._out_buf, self._plate)
+        self._full_dirty = True
+
+    def _ensure_overlay(self, vid_w: int, vid_h: int):
+        if self._overlay_size != (vid_w, vid_h):
+            premul, inv, rect = build_video_overlay(
+                self.score_image, self.text_image, self.video_pos, (vid_w, vid_h),
+                self.text_pos, (self.out_w, self.out_h), self.score_pos)
+            self._overlay = quantize_overlay(premul, inv) + (rect,)
+            self._overlay_size = (vid_w, vid_h)
+            # 视频尺寸变化时旧矩形区域需要还原为底板
+            np.copyto(self._out_buf, self._plate)
+            self._full_dirty = True
+        return self._overlay
+
+    def composite(self, video_frame: np.ndarray, brightness: float = 1.0) -> np.ndarray:
+        """
+        合成一帧。brightness 为整帧亮度（淡入淡出），用 cv2.convertScaleAbs
+        写入预分配缓冲区，不产生临时数组。
+        返回的 ndarray 是内部缓冲区的引用，下次调用会被覆盖。
+        """
+        import cv2
+        vid_h, vid_w = video_frame.shape[:2]
+        premul_u8, inv_u8, (x1, y1, x2, y2) = self._ensure_overlay(vid_w, vid_h)
+        faded = brightness != 1.0
+        # 淡入淡出帧及其后第一帧返回的缓冲区与上一帧整体不同
+        if self._full_dirty or faded or self._last_faded:
+            self.dirty_rect = None
+        else:
+            self.dirty_rect = (x1, y1, x2, y2)
+        self._full_dirty = False
+        self._last_faded = faded
+        if x2 > x1 and y2 > y1:
+            vx, vy = self.video_pos
+            video = video_frame[y1 - vy:y2 - vy, x1 - vx:x2 - vx, :3]
+            blend_premultiplied(video, premul_u8, inv_u8, self._out_buf[y1:y2, x1:x2])
+        if not faded:
+            return self._out_buf
+        if self._fade_buf is None:
+            self._fade_buf = np.empty_like(self._out_buf)
+        cv2.convertScaleAbs(self._out_buf, dst=self._fade_buf, alpha=float(brightness))
+        return self._fade_buf
+
+
+class NumpyInfoFrameCompositor:
+    """
+    开场/结尾信息片段的纯 CPU 合成器，接口与 TaichiAccel.InfoFrameCompositor 一致：
+
+        out = (bg * bg_dim * inv + premul) * brightness
+
+    text_bg（整幅）与 text 两层在构造时裁剪到非透明区域、融合并量化为 uint8，
+    逐帧只有一次查表暗化，整数混合只在两层外接矩形的并集内进行。
+    """
+
+    def __init__(self, text_bg_image: np.ndarray, text_image: np.ndarray, text_pos: tuple,
+                 bg_dim: float = 0.75, output_size: tuple = (1920, 1080)):
+        self.out_w, self.out_h = output_size
+        text_bg_image, text_bg_pos = crop_to_content(text_bg_image)
+        text_image, text_pos = crop_to_content(text_image, text_pos)
+        x1, y1, x2, y2 = union_rect(((text_bg_image, text_bg_pos), (text_image, text_pos)), output_size)
+        premul, inv, self._rect = build_video_overlay(
+            text_bg_image, text_image, (x1, y1), (x2 - x1, y2 - y1),
+            text_pos, output_size, text_bg_pos)
+        self._premul, self._inv = quantize_overlay(premul, inv)
+        self.bg_dim = float(bg_dim)
+        self._dim_lut = brightness_lut(self.bg_dim) if self.bg_dim != 1.0 else None
+        self._out_buf = np.empty((self.out_h, self.out_w, 3), dtype=np.uint8)
+
+    def composite(self, bg_frame: np.ndarray, brightness: float = 1.0) -> np.ndarray:
+        """
+        bg_frame: (H, W, 3) uint8，已缩放到输出尺寸
+        返回的 ndarray 是内部缓冲区的引用，下次调用会被覆盖。
+        """
+        import cv2
+        bg = bg_frame[:self.out_h, :self.out_w, :3]
+        if self._dim_lut is not None:
+            cv2.LUT(np.ascontiguousarray(bg), self._dim_lut, dst=self._out_buf)
+        else:
+            np.copyto(self._out_buf, bg)
+        x1, y1, x2, y2 = self._rect
+        if x2 > x1 and y2 > y1:
+            region = self._out_buf[y1:y2, x1:x2]
+            blend_premultiplied(region, self._premul, self._inv, region)
+        if brightness != 1.0:
+            cv2.convertScaleAbs(self._out_buf, dst=self._out_buf, alpha=float(brightness))
+        return self._out_buf
+
+
+def rgb_to_yuv420p(rgb: np.ndarray, out: np.ndarray = None) -> np.ndarray:
+    """
+    RGB → 平面 yuv420p (I420)，BT.601 limited range，与 FFmpeg 默认 swscale 转换一致。
+    返回 (H*3/2, W) uint8，宽高必须为偶数。
+    """
+    import cv2
+    return cv2.cvtColor(np.ascontiguousarray(rgb[:, :, :3]), cv2.COLOR_RGB2YUV_I420, dst=out)
+
+
+class Yuv420pConverter:
+    """
+    复用输出缓冲区的 RGB → yuv420p 转换器。
+
+    底板模式下连续帧只有视频矩形变化，传入 dirty_rect 时只转换该矩形
+    （外扩到偶数边界，保证 2x2 色度块完整），其余 Y/U/V 数据沿用上一帧。
+    """
+
+    def __init__(self, width: int, height: int):
+        if width % 2 or height % 2:
+            raise ValueError(f"yuv420p 要求宽高为偶数: {width}x{height}")
+        self.width, self.height = width, height
+        self._out = np.zeros((height * 3 // 2, width), dtype=np.uint8)
+        flat = self._out.reshape(-1)
+        y_size, c_size = width * height, width * height // 4
+        self._y = flat[:y_size].reshape(height, width)
+        self._u = flat[y_size:y_size + c_size].reshape(height // 2, width // 2)
+        self._v = flat[y_size + c_size:].reshape(height // 2, width // 2)
+        self._has_base = False
+
+    def convert(self, rgb: np.ndarray, dirty_rect: tuple = None) -> np.ndarray:
+        """
+        Args:
+            rgb: (H, W, 3) uint8
+            dirty_rect: (x1, y1, x2, y2)，表示与上一次传入的帧相比只有该区域变化；
+                None 时整帧转换
+        Returns:
+            内部 (H*3/2, W) uint8 缓冲区的引用，下次调用会被覆盖
+        """
+        if dirty_rect is None or not self._has_base:
+            rgb_to_yuv420p(rgb, self._out)
+            self._has_base = True
+            return self._out
+
+        x1, y1, x2, y2 = dirty_rect
+        x1, y1 = x1 & ~1, y1 & ~1
+        x2, y2 = min(self.width, (x2 + 1) & ~1), min(self.height, (y2 + 1) & ~1)
+        if x2 <= x1 or y2 <= y1:
+            return self._out
+        rh, rw = y2 - y1, x2 - x1
+        sub = rgb_to_yuv420p(rgb[y1:y2, x1:x2])
+        self._y[y1:y2, x1:x2] = sub[:rh]
+        chroma = sub[rh:].reshape(2, rh // 2, rw // 2)
+        self._u[y1 // 2:y2 // 2, x1 // 2:x2 // 2] = chroma[0]
+        self._v[y1 // 2:y2 // 2, x1 // 2:x2 // 2] = chroma[1]
+        return self._out
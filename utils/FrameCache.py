@@ -0,0 +1,184 @@
+"""
+FrameCache.py - 背景视频解码帧缓存
+
+开场/结尾的 intro_video_bg 与内容片段的 content_bg_video 都是较短的循环素材，
+在所有片段间共享。逐片段、逐循环重新解码并缩放到输出分辨率是重复劳动，
+这里在进程内按 (路径, 分辨率, 亮度) 缓存解码、缩放（及预暗化）后的全部帧，
+之后的片段直接按时间取帧。
+
+缓存有总内存预算，超出时按 LRU 淘汰；单个素材超出预算时不缓存，
+调用方回退到流式解码（VideoFrameReader）。
+"""
+
+import os
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+import cv2
+import numpy as np
+
+_DEFAULT_BUDGET_MB = 1024
+
+
+class CachedLoopVideo:
+    """
+    已解码并缩放到输出分辨率的循环背景视频，接口与 VideoFrameReader 的
+    get_frame / duration / close 一致，返回的帧只读且为输出尺寸。
+    """
+
+    def __init__(self, frames: np.ndarray, fps: float):
+        self.frames = frames
+        self.fps = fps
+        self.frame_count = len(frames)
+        self.duration = self.frame_count / fps if fps > 0 else 0
+
+    @property
+    def nbytes(self) -> int:
+        return self.frames.nbytes
+
+    def get_frame(self, time_sec: float) -> Optional[np.ndarray]:
+        if self.frame_count == 0:
+            return None
+        # 与 VideoFrameReader._time_to_index 相同的时间→帧号映射
+        frame_idx = int(time_sec * self.fps + 1e-6)
+        return self.frames[max(0, min(frame_idx, self.frame_count - 1))]
+
+    def close(self):
+        pass
+
+
+class DecodedFrameCache:
+    """进程内共享的 LRU 解码帧缓存（线程安全）"""
+
+    def __init__(self, budget_mb: int = _DEFAULT_BUDGET_MB):
+        self.budget_bytes = int(budget_mb) * 1024 * 1024
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        # 每个 key 一把构建锁：并行渲染的多个片段同时请求同一素材时只解码一次
+        self._build_locks = {}
+        self._too_large = set()
+
+    @property
+    def used_bytes(self) -> int:
+        return sum(entry.nbytes for entry in self._entries.values())
+
+    def set_budget(self, budget_mb: int):
+        with self._lock:
+            self.budget_bytes = int(budget_mb) * 1024 * 1024
+            self._too_large.clear()
+            self._evict(0)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._too_large.clear()
+
+    def _evict(self, incoming_bytes: int):
+        while self._entries and self.used_bytes + incoming_bytes > self.budget_bytes:
+            key, _ = self._entries.popitem(last=False)
+            print(f"[FrameCache] 淘汰: {os.path.basename(key[0])} {key[2]}x{key[3]}")
+
+    @staticmethod
+    def _make_key(video_path: str, resolution: tuple, brightness: float):
+        path = os.path.abspath(video_path)
+        # mtime 参与 key：素材被替换后不会命中旧缓存
+        return (path, os.path.getmtime(path), int(resolution[0]), int(resolution[1]), round(float(brightness), 4))
+
+    def get(self, video_path: str, resolution: tuple, brightness: float = 1.0) -> Optional[CachedLoopVideo]:
+        """
+        获取缓存的循环视频；未缓存时解码全部帧并加入缓存。
+        素材解码后超出预算（或无法打开）时返回 None，调用方应回退到流式解码。
+        """
+        if not video_path or not os.path.exists(video_path):
+            return None
+        key = self._make_key(video_path, resolution, brightness)
+        with self._lock:
+            if key in self._too_large:
+                return None
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                return entry
+            build_lock = self._build_locks.setdefault(key, threading.Lock())
+
+        with build_lock:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None:
+                    self._entries.move_to_end(key)
+                    return entry
+                if key in self._too_large:
+                    return None
+            entry = self._decode(video_path, resolution, brightness)
+            with self._lock:
+                self._build_locks.pop(key, None)
+                if entry is None:
+                    self._too_large.add(key)
+                    return None
+                self._evict(entry.nbytes)
+                self._entries[key] = entry
+            print(f"[FrameCache] 已缓存: {os.path.basename(video_path)} "
+                  f"{entry.frame_count} 帧 {entry.nbytes / 1024 / 1024:.0f}MB "
+                  f"(占用 {self.used_bytes / 1024 / 1024:.0f}/{self.budget_bytes / 1024 / 1024:.0f}MB)")
+            return entry
+
+    def _decode(self, video_path: str, resolution: tuple, brightness: float) -> Optional[CachedLoopVideo]:
+        cap = cv2.VideoCapture(video_path)
+        if not cap.isOpened():
+            return None
+        try:
+            fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+            frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+            out_w, out_h = int(resolution[0]), int(resolution[1])
+            frame_bytes = out_w * out_h * 3
+            # 帧数元数据可能偏小，实际解码时仍逐帧检查预算
+            if frame_count <= 0 or frame_count * frame_bytes > self.budget_bytes:
+                print(f"[FrameCache] {os.path.basename(video_path)} 超出缓存预算，使用流式解码")
+                return None
+
+            frames = np.empty((frame_count, out_h, out_w, 3), dtype=np.uint8)
+            n = 0
+            while True:
+                ret, frame = cap.read()
+                if not ret:
+                    break
+                if n >= len(frames):
+                    if (n + 1) * frame_bytes > self.budget_bytes:
+                        print(f"[FrameCache] {os.path.basename(video_path)} 超出缓存预算，使用流式解码")
+                        return None
+                    frames = np.concatenate([frames, np.empty_like(frames[:max(1, n // 4)])])
+                dst = frames[n]
+                cv2.resize(frame, (out_w, out_h), dst=dst)
+                cv2.cvtColor(dst, cv2.COLOR_BGR2RGB, dst=dst)
+                if brightness != 1.0:
+                    cv2.convertScaleAbs(dst, dst=dst, alpha=float(brightness))
+                n += 1
+            if n == 0:
+                return None
+            frames = frames[:n]
+            frames.flags.writeable = False
+            return CachedLoopVideo(frames, fps)
+        finally:
+            cap.release()
+
+
+_cache = DecodedFrameCache()
+
+
+def get_frame_cache() -> DecodedFrameCache:
+    """进程级共享的解码帧缓存"""
+    return _cache
+
+
+def configure_frame_cache(budget_mb: int):
+    """设置缓存内存预算（MB），<= 0 时禁用缓存"""
+    _cache.set_budget(max(0, int(budget_mb)))
+
+
+def get_cached_loop_video(video_path: str, resolution: tuple,
+                          brightness: float = 1.0) -> Optional[CachedLoopVideo]:
+    """获取缓存的循环背景视频，不可缓存时返回 None"""
+    if _cache.budget_bytes <= 0:
+        return None
+    return _cache.get(video_path, resolution, brightness)
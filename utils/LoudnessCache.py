@@ -0,0 +1,111 @@
+"""
+LoudnessCache.py - 音频片段响度测量与缓存
+
+每个音频源片段 (文件, 起点, 时长) 只用 FFmpeg ebur128 测量一次 EBU R128 积分响度与真峰值，
+结果按 (文件名, 大小, mtime) 缓存在源文件所在目录的 .loudness_cache.json 中（见 ProbeCache）。
+片段增益由测量值解析计算：把每个片段调整到目标响度，同时保证真峰值不超过上限，
+拼接后的完整视频整体响度即为目标响度，不再需要对成片音频单独执行一次 loudnorm 重编码。
+"""
+
+import os
+import re
+import subprocess
+import threading
+
+from utils.ProbeCache import directory_cache, get_ffmpeg_binary
+
+CACHE_FILENAME = ".loudness_cache.json"
+
+TARGET_LUFS = -20.0
+TRUE_PEAK_LIMIT = -1.5
+# 对应 CPU 路径原有的增益限制 [0.1, 3.0]
+MIN_GAIN_DB = -20.0
+MAX_GAIN_DB = 9.5
+
+_INTEGRATED_RE = re.compile(r'I:\s*(-?[\d.]+|-inf)\s*LUFS')
+_PEAK_RE = re.compile(r'Peak:\s*(-?[\d.]+|-inf)\s*dBFS')
+# 同一文件的多个片段可能被并发测量，合并写入缓存条目时加锁
+_update_lock = threading.Lock()
+
+
+def _parse_db(value: str) -> float:
+    return -70.0 if value == '-inf' else float(value)
+
+
+def _measure(path: str, start: float, duration: float):
+    """ebur128 测量片段的积分响度 (LUFS) 与真峰值 (dBFS)，无音频或测量失败返回 None"""
+    cmd = [get_ffmpeg_binary('ffmpeg'), '-hide_banner', '-nostats', '-loglevel', 'info']
+    if start > 0:
+        cmd += ['-ss', f"{start:.3f}"]
+    if duration:
+        cmd += ['-t', f"{duration:.3f}"]
+    cmd += ['-i', path, '-vn', '-af', 'ebur128=peak=true', '-f', 'null', '-']
+    try:
+        result = subprocess.run(cmd, capture_output=True, text=True, errors='replace', timeout=120)
+    except (OSError, subprocess.SubprocessError) as e:
+        print(f"[LoudnessCache] Warning: 响度测量失败: {e}")
+        return None
+    # 滤镜结束时输出的汇总在 stderr 最后
+    integrated = _INTEGRATED_RE.findall(result.stderr)
+    peak = _PEAK_RE.findall(result.stderr)
+    if not integrated:
+        return None
+    return {"integrated": _parse_db(integrated[-1]), "true_peak": _parse_db(peak[-1]) if peak else 0.0}
+
+
+def _segment_key(start: float, duration: float) -> str:
+    start_key = f"{max(0.0, float(start or 0)):.3f}"
+    return f"{start_key}:{float(duration):.3f}" if duration else f"{start_key}:full"
+
+
+def measure_loudness(path: str, start: float = 0, duration: float = None):
+    """
+    读取音频片段的响度（带缓存）：{"integrated": LUFS, "true_peak": dBFS}。
+    文件不存在、没有音频流或测量失败时返回 None。
+    """
+    if not path or not os.path.exists(path):
+        return None
+    path = os.path.abspath(path)
+    stat = os.stat(path)
+    directory, name = os.path.split(path)
+    cache = directory_cache(directory, CACHE_FILENAME)
+    key = _segment_key(start, duration)
+    entry = cache.get(name, stat)
+    if entry and key in entry["segments"]:
+        return entry["segments"][key]
+    measured = _measure(path, start or 0, duration)
+    if measured is None:
+        return None
+    with _update_lock:
+        entry = cache.get(name, stat) or {"segments": {}}
+        cache.put(name, stat, dict(entry, segments=dict(entry["segments"], **{key: measured})))
+    cache.save()
+    return measured
+
+
+def loudness_gain_db(path: str, start: float = 0, duration: float = None, clip_name: str = None,
+                     target_lufs: float = TARGET_LUFS) -> float:
+    """
+    把音频片段调整到 target_lufs 所需的增益 (dB)：限制在 [MIN_GAIN_DB, MAX_GAIN_DB]，
+    且调整后的真峰值不超过 TRUE_PEAK_LIMIT。无法测量时返回 0。
+    """
+    loudness = measure_loudness(path, start, duration)
+    if loudness is None:
+        return 0.0
+    gain_db = target_lufs - loudness["integrated"]
+    gain_db = min(gain_db, TRUE_PEAK_LIMIT - loudness["true_peak"])
+    gain_db = max(MIN_GAIN_DB, min(MAX_GAIN_DB, gain_db))
+    if clip_name and abs(gain_db) > 0.5:
+        print(f"[LoudnessCache] 音频均衡: {clip_name} 响度={loudness['integrated']:.1f} LUFS, "
+              f"峰值={loudness['true_peak']:.1f} dBFS, 调整={gain_db:+.1f}dB")
+    return gain_db
+
+
+def prefetch_loudness(segments: list, max_workers: int = None):
+    """并发测量多个音频片段 [(路径, 起点, 时长)]，结果写入缓存"""
+    from concurrent.futures import ThreadPoolExecutor
+
+    if max_workers is None:
+        max_workers = min(8, os.cpu_count() or 1)
+    with ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="Loudness") as executor:
+        list(executor.map(lambda seg: measure_loudness(*seg), segments))
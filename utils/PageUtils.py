@@ -7,7 +7,6 @@ import requests
 import yaml
 import subprocess
 import platform
-from moviepy import VideoFileClip
 from utils.DataUtils import download_metadata, load_metadata
 from db_utils.DatabaseManager import DatabaseManager
 import streamlit as st
@@ -167,13 +166,13 @@ def get_db_manager() -> "DatabaseManager":
 
 
 def get_video_duration(video_path):
-    """Returns the duration of a video file in seconds"""
-    try:
-        with VideoFileClip(video_path) as clip:
-            return clip.duration
-    except Exception as e:
-        print(f"Error getting video duration: {e}")
+    """Returns the duration of a video file in seconds (cached ffprobe metadata, see ProbeCache)"""
+    from utils.ProbeCache import get_duration
+    duration = get_duration(video_path)
+    if duration <= 0:
+        print(f"Error getting video duration: {video_path}")
         return -1
+    return duration
 
 
 def open_file_explorer(path):
@@ -0,0 +1,232 @@
+"""
+ProbeCache.py - 视频元数据（ffprobe）缓存
+
+时长、帧率、分辨率、编码信息与关键帧时间点按 (文件名, 大小, mtime) 缓存在视频所在目录的
+.probe_cache.json 中，并在进程内保留一份：跨页面、跨 Streamlit 重跑以及重复拼接时
+不再为同一个文件重复启动 ffprobe。文件被替换或修改后大小/mtime 变化，缓存自动失效。
+
+关键帧索引需要解复用整个文件，只在调用方需要时（with_keyframes=True）才读取并补充到缓存。
+ffprobe 每次只能读取一个输入，probe_media_batch 对同一批文件中未命中缓存的部分并发探测，
+每个目录只写回一次缓存文件。目录不可写时只使用进程内缓存。
+"""
+
+import json
+import os
+import shutil
+import subprocess
+import threading
+
+CACHE_FILENAME = ".probe_cache.json"
+_CACHE_VERSION = 1
+
+_STREAM_ENTRIES = ("index,codec_type,codec_name,profile,width,height,pix_fmt,"
+                   "avg_frame_rate,r_frame_rate,nb_frames,duration,extradata_hash")
+
+
+def get_ffmpeg_binary(tool_name: str = 'ffmpeg') -> str:
+    """解析 FFmpeg 工具路径，优先使用运行目录中的打包二进制。"""
+    executable = f"{tool_name}.exe" if os.name == 'nt' else tool_name
+    local_path = os.path.join(os.getcwd(), executable)
+    if os.path.exists(local_path):
+        return local_path
+
+    resolved = shutil.which(tool_name)
+    if resolved:
+        return resolved
+
+    raise FileNotFoundError(f"未找到 {executable}")
+
+
+def _parse_rate(rate: str) -> float:
+    try:
+        num, den = rate.split('/')
+        return float(num) / float(den) if float(den) else 0.0
+    except (ValueError, AttributeError):
+        return 0.0
+
+
+def _run_ffprobe(args: list, timeout: int = 120):
+    cmd = [get_ffmpeg_binary('ffprobe'), '-v', 'error'] + args
+    try:
+        result = subprocess.run(cmd, capture_output=True, text=True, timeout=timeout)
+        if result.returncode != 0:
+            return None
+        return json.loads(result.stdout or '{}')
+    except (OSError, ValueError, subprocess.SubprocessError):
+        return None
+
+
+def _probe_info(path: str):
+    """读取格式时长与首个视频流/音频流的信息，读取失败返回 None"""
+    data = _run_ffprobe(['-show_data_hash', 'MD5',
+                         '-show_entries', f'format=duration:stream={_STREAM_ENTRIES}',
+                         '-of', 'json', path], timeout=30)
+    if data is None:
+        return None
+    streams = data.get('streams') or []
+    video = next((s for s in streams if s.get('codec_type') == 'video'), None)
+    audio = next((s for s in streams if s.get('codec_type') == 'audio'), None)
+    try:
+        duration = float(data.get('format', {}).get('duration') or 0)
+    except ValueError:
+        duration = 0.0
+    info = {"duration": duration, "audio_codec": audio.get('codec_name') if audio else None}
+    if video is not None:
+        fps = _parse_rate(video.get('avg_frame_rate')) or _parse_rate(video.get('r_frame_rate')) or 30.0
+        nb_frames = video.get('nb_frames')
+        try:
+            stream_duration = float(video.get('duration') or 0)
+        except ValueError:
+            stream_duration = 0.0
+        info.update({
+            "video_codec": video.get('codec_name'),
+            "profile": video.get('profile'),
+            "width": int(video.get('width') or 0),
+            "height": int(video.get('height') or 0),
+            "pix_fmt": video.get('pix_fmt'),
+            "extradata_hash": video.get('extradata_hash'),
+            "fps": fps,
+            "stream_duration": stream_duration,
+            "frame_count": int(nb_frames) if nb_frames and str(nb_frames).isdigit() else int(duration * fps),
+        })
+    return info
+
+
+def _probe_keyframes(path: str):
+    """读取首个视频流的关键帧时间点（只解复用，不解码），读取失败返回 None"""
+    data = _run_ffprobe(['-select_streams', 'v:0', '-show_entries', 'packet=pts_time,flags',
+                         '-of', 'json', path])
+    if data is None:
+        return None
+    return sorted(float(pkt['pts_time']) for pkt in data.get('packets', [])
+                  if 'K' in pkt.get('flags', '') and pkt.get('pts_time') not in (None, 'N/A'))
+
+
+class _DirectoryCache:
+    """单个目录的缓存文件（线程安全），也用于 LoudnessCache 的响度缓存"""
+
+    def __init__(self, directory: str, filename: str = CACHE_FILENAME):
+        self.path = os.path.join(directory, filename)
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._dirty = False
+        self._writable = True
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                if data.get("version") == _CACHE_VERSION:
+                    self._entries = dict(data.get("files", {}))
+            except (OSError, ValueError) as e:
+                print(f"[ProbeCache] 缓存读取失败，将重新探测: {e}")
+
+    def get(self, name: str, stat) -> dict:
+        with self._lock:
+            entry = self._entries.get(name)
+        if entry and entry.get("size") == stat.st_size and entry.get("mtime_ns") == stat.st_mtime_ns:
+            return entry
+        return None
+
+    def put(self, name: str, stat, entry: dict):
+        entry.update(size=stat.st_size, mtime_ns=stat.st_mtime_ns)
+        with self._lock:
+            self._entries[name] = entry
+            self._dirty = True
+
+    def save(self):
+        with self._lock:
+            if not self._dirty or not self._writable:
+                return
+            # 只保留仍然存在的文件，避免临时文件的记录无限累积
+            directory = os.path.dirname(self.path)
+            files = {name: entry for name, entry in self._entries.items()
+                     if os.path.exists(os.path.join(directory, name))}
+            tmp_path = self.path + ".tmp"
+            try:
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    json.dump({"version": _CACHE_VERSION, "files": files}, f, ensure_ascii=False)
+                os.replace(tmp_path, self.path)
+                self._dirty = False
+            except OSError as e:
+                self._writable = False
+                print(f"[ProbeCache] 缓存无法写入 {self.path}，仅使用内存缓存: {e}")
+
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def directory_cache(directory: str, filename: str = CACHE_FILENAME) -> _DirectoryCache:
+    """返回目录中指定缓存文件的进程内单例（首次访问时从磁盘读取），供 ProbeCache 与 LoudnessCache 共用"""
+    with _caches_lock:
+        cache = _caches.get((directory, filename))
+        if cache is None:
+            cache = _caches[(directory, filename)] = _DirectoryCache(directory, filename)
+        return cache
+
+
+def _lookup(path: str, with_keyframes: bool, save: bool):
+    """返回 (entry 或 None, 目录缓存)；未命中或缺少关键帧索引时探测并写入缓存"""
+    path = os.path.abspath(path)
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None, None
+    directory, name = os.path.split(path)
+    cache = directory_cache(directory)
+    entry = cache.get(name, stat)
+    if entry is None:
+        info = _probe_info(path)
+        if info is None:
+            return None, cache
+        entry = {"info": info}
+        cache.put(name, stat, entry)
+    if with_keyframes and "keyframes" not in entry:
+        keyframes = _probe_keyframes(path)
+        if keyframes is None:
+            return None, cache
+        entry = dict(entry, keyframes=keyframes)
+        cache.put(name, stat, entry)
+    if save:
+        cache.save()
+    return entry, cache
+
+
+def _as_result(entry: dict, with_keyframes: bool):
+    if entry is None:
+        return None
+    result = dict(entry["info"])
+    if with_keyframes:
+        result["keyframes"] = list(entry["keyframes"])
+    return result
+
+
+def probe_media(path: str, with_keyframes: bool = False):
+    """
+    读取视频元数据（带缓存），读取失败返回 None。
+
+    返回 dict: duration（容器时长）、audio_codec，有视频流时另含 video_codec / profile / width /
+    height / pix_fmt / extradata_hash / fps / stream_duration / frame_count；
+    with_keyframes=True 时含 keyframes（视频流关键帧时间点，升序）。
+    """
+    entry, _ = _lookup(path, with_keyframes, save=True)
+    return _as_result(entry, with_keyframes)
+
+
+def probe_media_batch(paths: list, with_keyframes: bool = False, max_workers: int = None) -> list:
+    """批量读取多个文件的元数据，与 paths 一一对应；未命中缓存的文件并发探测"""
+    from concurrent.futures import ThreadPoolExecutor
+
+    if max_workers is None:
+        max_workers = min(8, os.cpu_count() or 1)
+    with ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="Probe") as executor:
+        lookups = list(executor.map(lambda p: _lookup(p, with_keyframes, save=False), paths))
+    for cache in {id(cache): cache for _, cache in lookups if cache is not None}.values():
+        cache.save()
+    return [_as_result(entry, with_keyframes) for entry, _ in lookups]
+
+
+def get_duration(path: str) -> float:
+    """容器时长（秒），读取失败返回 0.0"""
+    info = probe_media(path)
+    return info["duration"] if info else 0.0
@@ -0,0 +1,159 @@
+"""
+RenderManifest.py - 视频片段渲染清单
+
+片段输出目录下的 .render_manifest.json 记录每个片段文件对应的内容哈希。
+哈希覆盖片段配置、渲染用到的样式配置子集、配置中引用的素材文件（大小与 mtime）
+以及分辨率/帧率/编码参数，渲染前与清单比对，只重新渲染哈希变化的片段：
+在 50 个片段的视频中修改一条评论只会重新渲染对应的一个片段。
+
+清单中没有记录的已存在文件（旧版本生成或手动放入）沿用“同名即跳过”的规则，
+并记录当前哈希，之后的修改可以被检测到。force_render 时仍全部重新渲染。
+
+可选的中间文件（.intermediate/ 下不含评论文字的视频层）以 compute_video_layer_hash
+单独记录：只有评论文字变化时视频层哈希不变，可以在中间文件上重新叠加文字。
+"""
+
+import hashlib
+import json
+import os
+import threading
+
+MANIFEST_FILENAME = ".render_manifest.json"
+INTERMEDIATE_DIRNAME = ".intermediate"
+_MANIFEST_VERSION = 1
+# 正在渲染（或渲染失败）的片段，不与任何哈希相等
+_PENDING = ""
+
+# 各类片段渲染时读取的样式配置字段
+_STYLE_KEYS = {
+    "content": ("asset_paths", "options", "content_text_style"),
+    "info": ("asset_paths", "options", "intro_text_style"),
+    # 不含评论文字的视频层
+    "video_layer": ("asset_paths", "options"),
+}
+# 只影响评论文字层的片段配置字段
+_TEXT_CONFIG_KEYS = ("text",)
+
+
+def _file_signature(path: str):
+    """素材文件以 (大小, mtime) 参与哈希，替换素材后片段会被重新渲染"""
+    stat = os.stat(path)
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def _collect_assets(value, assets: dict):
+    """递归收集配置值中指向已存在文件的路径"""
+    if isinstance(value, dict):
+        for item in value.values():
+            _collect_assets(item, assets)
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            _collect_assets(item, assets)
+    elif isinstance(value, str) and value and os.path.isfile(value):
+        path = os.path.abspath(value)
+        if path not in assets:
+            assets[path] = _file_signature(path)
+
+
+def compute_clip_hash(clip_config: dict, style_config: dict, clip_type: str = "content",
+                      **render_params) -> str:
+    """
+    计算片段的内容哈希。
+
+    clip_type: "content"（谱面片段）或 "info"（开场/结尾），决定参与哈希的样式字段
+    render_params: 影响输出的渲染参数，如 resolution / fps / codec / bitrate / fade_in / fade_out
+    """
+    style_keys = _STYLE_KEYS.get(clip_type, tuple(style_config or {}))
+    style_subset = {key: (style_config or {}).get(key) for key in style_keys}
+    assets = {}
+    _collect_assets(clip_config, assets)
+    _collect_assets(style_subset, assets)
+    payload = {
+        "clip_type": clip_type,
+        "config": clip_config,
+        "style": style_subset,
+        "assets": assets,
+        "render": render_params,
+    }
+    encoded = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def compute_video_layer_hash(clip_config: dict, style_config: dict, **render_params) -> str:
+    """
+    内容片段不含评论文字的视频层哈希：不包含评论文字与文字样式。
+    render_params 只应包含影响视频层的参数（分辨率、帧率），淡入淡出在叠加文字时处理。
+    """
+    layer_config = {key: value for key, value in clip_config.items() if key not in _TEXT_CONFIG_KEYS}
+    return compute_clip_hash(layer_config, style_config, "video_layer", **render_params)
+
+
+def intermediate_path(output_dir: str, file_stem: str) -> str:
+    """片段中间文件路径：{output_dir}/.intermediate/{file_stem}.mp4"""
+    return os.path.join(output_dir, INTERMEDIATE_DIRNAME, f"{file_stem}.mp4")
+
+
+class RenderManifest:
+    """片段输出目录的渲染清单（线程安全，每次记录后立即写回磁盘）"""
+
+    def __init__(self, output_dir: str):
+        self.output_dir = output_dir
+        self.path = os.path.join(output_dir, MANIFEST_FILENAME)
+        self._lock = threading.Lock()
+        self._clips = {}
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"[RenderManifest] 清单读取失败，将按文件存在性判断: {e}")
+            return
+        if data.get("version") == _MANIFEST_VERSION:
+            self._clips = dict(data.get("clips", {}))
+
+    def save(self):
+        with self._lock:
+            data = {"version": _MANIFEST_VERSION, "clips": dict(self._clips)}
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, self.path)
+
+    def _key(self, output_file: str) -> str:
+        # 相对输出目录的路径：片段为文件名，中间文件为 .intermediate/<文件名>
+        return os.path.relpath(os.path.abspath(output_file), os.path.abspath(self.output_dir)).replace(os.sep, "/")
+
+    def needs_render(self, output_file: str, clip_hash: str, force_render: bool = False) -> bool:
+        """
+        判断片段是否需要（重新）渲染：文件不存在、force_render、或清单中的哈希与当前不同。
+        清单中没有记录的已存在文件视为最新，并记录当前哈希。
+
+        需要渲染时记录改为“未完成”，渲染中断留下的不完整文件在下次仍会重新渲染；
+        渲染成功后调用 record 写入新哈希。
+        """
+        with self._lock:
+            recorded = self._clips.get(self._key(output_file))
+        if not force_render and os.path.exists(output_file):
+            if recorded is None:
+                self.record(output_file, clip_hash)
+                return False
+            if recorded == clip_hash:
+                return False
+        self.record(output_file, _PENDING)
+        return True
+
+    def is_current(self, output_file: str, clip_hash: str) -> bool:
+        """文件存在且清单记录的哈希与 clip_hash 相同（不修改清单）"""
+        with self._lock:
+            recorded = self._clips.get(self._key(output_file))
+        return recorded == clip_hash and os.path.exists(output_file)
+
+    def record(self, output_file: str, clip_hash: str):
+        """片段渲染成功后记录其哈希"""
+        with self._lock:
+            self._clips[self._key(output_file)] = clip_hash
+        self.save()
@@ -9,6 +9,7 @@ import numpy as np
 import traceback
 import threading
 import queue as _queue_module
+from concurrent.futures import Future
 
 try:
     import taichi as ti
@@ -30,6 +31,9 @@ class _TaichiWorkerThread(threading.Thread):
     导致 CUDA_ERROR_INVALID_CONTEXT。此线程在进程生命周期内持有 CUDA 上下文，
     所有 Taichi 内核调用通过它分发，确保线程亲和性。
     线程引用存储在 ti 模块上，跨 Streamlit reimport 存活。
+
+    任务按提交顺序逐个执行：submit 阻塞等待结果，submit_async 立即返回 Future，
+    调用方可以在 kernel 执行期间准备下一帧。
     """
     daemon = True
 
@@ -43,27 +47,25 @@ class _TaichiWorkerThread(threading.Thread):
                 task = self._task_queue.get()
                 if task is None:
                     break
-                func, args, kwargs, holder, done_event = task
+                func, args, kwargs, future = task
+                if not future.set_running_or_notify_cancel():
+                    continue
                 try:
-                    holder['value'] = func(*args, **kwargs)
-                    holder['error'] = None
+                    future.set_result(func(*args, **kwargs))
                 except Exception as e:
-                    holder['value'] = None
-                    holder['error'] = e
-                finally:
-                    done_event.set()
+                    future.set_exception(e)
             except Exception:
                 continue
 
+    def submit_async(self, func, *args, **kwargs) -> Future:
+        """提交任务到此线程，立即返回 concurrent.futures.Future。线程安全。"""
+        future = Future()
+        self._task_queue.put((func, args, kwargs, future))
+        return future
+
     def submit(self, func, *args, **kwargs):
         """提交任务到此线程并等待结果。线程安全。"""
-        done = threading.Event()
-        holder = {}
-        self._task_queue.put((func, args, kwargs, holder, done))
-        done.wait()
-        if holder.get('error') is not None:
-            raise holder['error']
-        return holder.get('value')
+        return self.submit_async(func, *args, **kwargs).result()
 
 
 def _get_worker():
@@ -86,6 +88,22 @@ def _submit_to_worker(func, *args, **kwargs):
     return func(*args, **kwargs)
 
 
+def _submit_to_worker_async(func, *args, **kwargs) -> Future:
+    """
+    非阻塞地将函数提交到 Taichi 工作线程，返回 Future。
+    工作线程不可用（或是 reimport 前创建、不支持异步提交的旧线程）时同步执行，返回已完成的 Future。
+    """
+    worker = _get_worker()
+    if worker is not None and hasattr(worker, 'submit_async'):
+        return worker.submit_async(func, *args, **kwargs)
+    future = Future()
+    try:
+        future.set_result(_submit_to_worker(func, *args, **kwargs))
+    except Exception as e:
+        future.set_exception(e)
+    return future
+
+
 def init_taichi(arch=None):
     """
     初始化 Taichi 运行时，自动选择最佳 GPU 后端。
@@ -188,30 +206,51 @@ if TAICHI_AVAILABLE:
     # Taichi 自动将其映射为 GPU thread，保证逐像素并行。
     # 蒙版(mask)作为独立 2D ndarray 传入，避免 kernel 内部动态
     # shape 分支，确保 warp 内所有线程走同一条指令路径。
+    #
+    # 叠加层使用定点预乘表示（见 _premultiply_rgba）：
+    #   premul: uint16，颜色 * alpha，8.8 定点（255.0 → 65280）
+    #   inv:    uint8，视频/下层保留系数 (1 - alpha) * 255
+    # 像素值在 kernel 内以 i32 的 8.8 定点数累积，混合为
+    #   x = x * inv / 255 + premul
+    # 亮度系数以 Q16 定点传入（_to_q16）。最终截断为 uint8，
+    # 与 float32 路径的结果相差不超过 1。
     # ------------------------------------------------------------------
 
+    @ti.func
+    def _blend_fx(x, premul, inv):
+        """8.8 定点像素值与预乘叠加层混合（四舍五入到 1/256）"""
+        return (x * ti.cast(inv, ti.i32) + 127) // 255 + ti.cast(premul, ti.i32)
+
+    @ti.func
+    def _scale_fx(x, q16):
+        """8.8 定点像素值乘以 Q16 系数，拆分高低字节避免 i32 溢出"""
+        return ((x >> 8) * q16 + (((x & 255) * q16) >> 8)) >> 8
+
+    @ti.func
+    def _fx_to_u8(x):
+        return ti.cast(ti.min(ti.max(x >> 8, 0), 255), ti.u8)
+
     @ti.kernel
     def _alpha_composite_kernel(
-        base: ti.types.ndarray(dtype=ti.f32, ndim=3),
-        overlay_rgb: ti.types.ndarray(dtype=ti.f32, ndim=3),
-        mask: ti.types.ndarray(dtype=ti.f32, ndim=2),
-        out: ti.types.ndarray(dtype=ti.f32, ndim=3),
+        base: ti.types.ndarray(dtype=ti.u8, ndim=3),
+        premul: ti.types.ndarray(dtype=ti.u16, ndim=3),
+        inv: ti.types.ndarray(dtype=ti.u8, ndim=2),
+        out: ti.types.ndarray(dtype=ti.u8, ndim=3),
         ox: ti.i32, oy: ti.i32,
         overlay_h: ti.i32, overlay_w: ti.i32,
-        base_h: ti.i32, base_w: ti.i32
+        base_h: ti.i32, base_w: ti.i32,
+        brightness_q16: ti.i32
     ):
-        """逐像素并行 alpha 混合：mask 为独立 2D 蒙版 [0,1]"""
+        """逐像素并行 alpha 混合：叠加层为定点预乘 (premul, inv)，结果乘以整帧亮度"""
         for i, j in ti.ndrange(base_h, base_w):
             si = i - oy
             sj = j - ox
-            if 0 <= si < overlay_h and 0 <= sj < overlay_w:
-                a = mask[si, sj]
-                inv_a = 1.0 - a
-                for c in ti.static(range(3)):
-                    out[i, j, c] = base[i, j, c] * inv_a + overlay_rgb[si, sj, c] * a
-            else:
-                for c in ti.static(range(3)):
-                    out[i, j, c] = base[i, j, c]
+            inside = 0 <= si < overlay_h and 0 <= sj < overlay_w
+            for c in ti.static(range(3)):
+                x = ti.cast(base[i, j, c], ti.i32) << 8
+                if inside:
+                    x = _blend_fx(x, premul[si, sj, c], inv[si, sj])
+                out[i, j, c] = _fx_to_u8(_scale_fx(x, brightness_q16))
 
     @ti.kernel
     def _multiply_brightness_kernel(
@@ -361,56 +400,142 @@ if TAICHI_AVAILABLE:
 
     @ti.kernel
     def _five_layer_fast_kernel(
-        bg: ti.types.ndarray(dtype=ti.f32, ndim=3),
+        bg_u8: ti.types.ndarray(dtype=ti.u8, ndim=3),
         video_u8: ti.types.ndarray(dtype=ti.u8, ndim=3),
-        score_rgb: ti.types.ndarray(dtype=ti.f32, ndim=3),
-        score_mask: ti.types.ndarray(dtype=ti.f32, ndim=2),
-        text_rgb: ti.types.ndarray(dtype=ti.f32, ndim=3),
-        text_mask: ti.types.ndarray(dtype=ti.f32, ndim=2),
+        score_premul: ti.types.ndarray(dtype=ti.u16, ndim=3),
+        score_inv: ti.types.ndarray(dtype=ti.u8, ndim=2),
+        text_premul: ti.types.ndarray(dtype=ti.u16, ndim=3),
+        text_inv: ti.types.ndarray(dtype=ti.u8, ndim=2),
         out: ti.types.ndarray(dtype=ti.u8, ndim=3),
-        bg_brightness: ti.f32,
+        bg_brightness_q16: ti.i32,
         vid_x: ti.i32, vid_y: ti.i32,
         vid_h: ti.i32, vid_w: ti.i32,
+        score_x: ti.i32, score_y: ti.i32,
         score_h: ti.i32, score_w: ti.i32,
         text_x: ti.i32, text_y: ti.i32,
         text_h: ti.i32, text_w: ti.i32,
-        out_h: ti.i32, out_w: ti.i32
+        out_h: ti.i32, out_w: ti.i32,
+        brightness_q16: ti.i32
     ):
         """
-        零拷贝快速路径：video 输入为 uint8，输出直接写 uint8，
-        跳过 Python 端 float32 转换和 np.clip，减少内存带宽开销。
+        零拷贝快速路径：所有输入与输出均为整数类型，背景 uint8，
+        score/text 为定点预乘层（uint16 premul + uint8 inv），每像素读取
+        3 + 7 + 7 字节而不是 float32 的 12 + 16 + 16 字节。
+        score/text 已裁剪到非透明外接矩形，矩形外的像素只有背景/视频，不读取叠加层。
+        brightness 为整帧亮度（淡入淡出，Q16），在写回前乘入，不产生额外的帧拷贝。
         """
         for i, j in ti.ndrange(out_h, out_w):
-            r = bg[i, j, 0] * bg_brightness
-            g = bg[i, j, 1] * bg_brightness
-            b = bg[i, j, 2] * bg_brightness
-
             vi = i - vid_y
             vj = j - vid_x
-            if 0 <= vi < vid_h and 0 <= vj < vid_w:
-                r = ti.cast(video_u8[vi, vj, 0], ti.f32)
-                g = ti.cast(video_u8[vi, vj, 1], ti.f32)
-                b = ti.cast(video_u8[vi, vj, 2], ti.f32)
-
-            if i < score_h and j < score_w:
-                sa = score_mask[i, j]
-                inv_sa = 1.0 - sa
-                r = r * inv_sa + score_rgb[i, j, 0] * sa
-                g = g * inv_sa + score_rgb[i, j, 1] * sa
-                b = b * inv_sa + score_rgb[i, j, 2] * sa
-
+            in_video = 0 <= vi < vid_h and 0 <= vj < vid_w
+            si = i - score_y
+            sj = j - score_x
+            in_score = 0 <= si < score_h and 0 <= sj < score_w
             ti_i = i - text_y
             tj_j = j - text_x
-            if 0 <= ti_i < text_h and 0 <= tj_j < text_w:
-                ta = text_mask[ti_i, tj_j]
-                inv_ta = 1.0 - ta
-                r = r * inv_ta + text_rgb[ti_i, tj_j, 0] * ta
-                g = g * inv_ta + text_rgb[ti_i, tj_j, 1] * ta
-                b = b * inv_ta + text_rgb[ti_i, tj_j, 2] * ta
+            in_text = 0 <= ti_i < text_h and 0 <= tj_j < text_w
+            for c in ti.static(range(3)):
+                x = _scale_fx(ti.cast(bg_u8[i, j, c], ti.i32) << 8, bg_brightness_q16)
+                if in_video:
+                    x = ti.cast(video_u8[vi, vj, c], ti.i32) << 8
+                if in_score:
+                    x = _blend_fx(x, score_premul[si, sj, c], score_inv[si, sj])
+                if in_text:
+                    x = _blend_fx(x, text_premul[ti_i, tj_j, c], text_inv[ti_i, tj_j])
+                out[i, j, c] = _fx_to_u8(_scale_fx(x, brightness_q16))
 
-            out[i, j, 0] = ti.cast(ti.min(ti.max(r, 0.0), 255.0), ti.u8)
-            out[i, j, 1] = ti.cast(ti.min(ti.max(g, 0.0), 255.0), ti.u8)
-            out[i, j, 2] = ti.cast(ti.min(ti.max(b, 0.0), 255.0), ti.u8)
+    @ti.kernel
+    def _video_region_kernel(
+        video_u8: ti.types.ndarray(dtype=ti.u8, ndim=3),
+        over_premul: ti.types.ndarray(dtype=ti.u16, ndim=3),
+        over_inv: ti.types.ndarray(dtype=ti.u8, ndim=2),
+        out: ti.types.ndarray(dtype=ti.u8, ndim=3),
+        src_y: ti.i32, src_x: ti.i32,
+        h: ti.i32, w: ti.i32
+    ):
+        """
+        底板模式：只合成视频矩形区域。
+        score/text 在视频上方的部分已预融合为 (premul, inv)，
+        out = video * inv + premul，输出为区域大小的 uint8 缓冲区。
+        """
+        for i, j in ti.ndrange(h, w):
+            for c in ti.static(range(3)):
+                x = _blend_fx(ti.cast(video_u8[i + src_y, j + src_x, c], ti.i32) << 8,
+                              over_premul[i, j, c], over_inv[i, j])
+                out[i, j, c] = _fx_to_u8(x)
+
+    @ti.kernel
+    def _video_region_batch_kernel(
+        videos_u8: ti.types.ndarray(dtype=ti.u8, ndim=4),
+        over_premul: ti.types.ndarray(dtype=ti.u16, ndim=3),
+        over_inv: ti.types.ndarray(dtype=ti.u8, ndim=2),
+        out: ti.types.ndarray(dtype=ti.u8, ndim=4),
+        src_y: ti.i32, src_x: ti.i32,
+        k: ti.i32, h: ti.i32, w: ti.i32
+    ):
+        """
+        _video_region_kernel 的批量版本：videos_u8 为 (K, vh, vw, 3) 的帧堆叠，
+        一次 kernel 调用合成 K 帧的视频矩形区域，输出 (K, h, w, 3)。
+        每个像素的叠加层只读取一次，供 K 帧共用。
+        """
+        for i, j in ti.ndrange(h, w):
+            inv = over_inv[i, j]
+            for c in ti.static(range(3)):
+                premul = over_premul[i, j, c]
+                for f in range(k):
+                    x = _blend_fx(ti.cast(videos_u8[f, i + src_y, j + src_x, c], ti.i32) << 8, premul, inv)
+                    out[f, i, j, c] = _fx_to_u8(x)
+
+    @ti.kernel
+    def _plate_fade_kernel(
+        plate: ti.types.ndarray(dtype=ti.u8, ndim=3),
+        video_u8: ti.types.ndarray(dtype=ti.u8, ndim=3),
+        over_premul: ti.types.ndarray(dtype=ti.u16, ndim=3),
+        over_inv: ti.types.ndarray(dtype=ti.u8, ndim=2),
+        out: ti.types.ndarray(dtype=ti.u8, ndim=3),
+        x1: ti.i32, y1: ti.i32, x2: ti.i32, y2: ti.i32,
+        src_y: ti.i32, src_x: ti.i32,
+        out_h: ti.i32, out_w: ti.i32,
+        brightness_q16: ti.i32
+    ):
+        """
+        底板模式的淡入淡出帧：整帧输出 = (视频矩形内 video*inv+premul，其余为底板) * brightness。
+        视频区域与底板先按 uint8 截断，再乘亮度，与非淡入淡出帧的结果保持一致。
+        """
+        for i, j in ti.ndrange(out_h, out_w):
+            in_region = y1 <= i < y2 and x1 <= j < x2
+            ri = i - y1
+            rj = j - x1
+            for c in ti.static(range(3)):
+                x = ti.cast(plate[i, j, c], ti.i32) << 8
+                if in_region:
+                    x = _blend_fx(ti.cast(video_u8[ri + src_y, rj + src_x, c], ti.i32) << 8,
+                                  over_premul[ri, rj, c], over_inv[ri, rj])
+                    x = ti.min(x >> 8, 255) << 8
+                out[i, j, c] = _fx_to_u8(_scale_fx(x, brightness_q16))
+
+    @ti.kernel
+    def _info_composite_kernel(
+        bg_u8: ti.types.ndarray(dtype=ti.u8, ndim=3),
+        over_premul: ti.types.ndarray(dtype=ti.u16, ndim=3),
+        over_inv: ti.types.ndarray(dtype=ti.u8, ndim=2),
+        out: ti.types.ndarray(dtype=ti.u8, ndim=3),
+        bg_dim_q16: ti.i32, brightness_q16: ti.i32,
+        x1: ti.i32, y1: ti.i32, x2: ti.i32, y2: ti.i32,
+        h: ti.i32, w: ti.i32
+    ):
+        """
+        信息片段单次合成：out = (bg * bg_dim * inv + premul) * brightness。
+        text_bg 与 text 两层已预融合为 (premul, inv)，只覆盖两层外接矩形的并集
+        (x1, y1, x2, y2)，矩形外 out = bg * bg_dim * brightness。
+        """
+        for i, j in ti.ndrange(h, w):
+            in_overlay = y1 <= i < y2 and x1 <= j < x2
+            for c in ti.static(range(3)):
+                x = _scale_fx(ti.cast(bg_u8[i, j, c], ti.i32) << 8, bg_dim_q16)
+                if in_overlay:
+                    x = _blend_fx(x, over_premul[i - y1, j - x1, c], over_inv[i - y1, j - x1])
+                out[i, j, c] = _fx_to_u8(_scale_fx(x, brightness_q16))
 
 
 # ============================================================================
@@ -437,8 +562,39 @@ def _split_rgba(image: np.ndarray):
     return rgb, mask
 
 
+def _premultiply_rgba(image: np.ndarray):
+    """
+    将 RGBA 图像转换为定点预乘表示：
+    premul (H,W,3) uint16 = round(rgb * alpha / 255 * 256)，inv (H,W) uint8 = 255 - alpha。
+    每像素 7 字节，float32 RGB + mask 为 16 字节。RGB 输入视为完全不透明。
+    """
+    if image.ndim == 3 and image.shape[2] == 4:
+        alpha = image[:, :, 3].astype(np.uint32)
+        premul = image[:, :, :3].astype(np.uint32) * alpha[:, :, np.newaxis] * 256
+        premul = ((premul + 127) // 255).astype(np.uint16)
+        inv = (255 - alpha).astype(np.uint8)
+    elif image.ndim == 3 and image.shape[2] == 3:
+        premul = image.astype(np.uint16) << 8
+        inv = np.zeros(image.shape[:2], dtype=np.uint8)
+    else:
+        raise ValueError(f"Unsupported image shape: {image.shape}")
+    return premul, inv
+
+
+def _quantize_overlay(premul: np.ndarray, inv: np.ndarray):
+    """将 CpuAccel.build_video_overlay 的 float32 融合叠加层转换为 kernel 使用的定点表示"""
+    premul_fx = np.clip(np.rint(premul * 256.0), 0, 65280).astype(np.uint16)
+    inv_fx = np.clip(np.rint(inv * 255.0), 0, 255).astype(np.uint8)
+    return premul_fx, inv_fx
+
+
+def _to_q16(factor: float) -> int:
+    """亮度等系数转换为 Q16 定点整数"""
+    return int(round(max(0.0, float(factor)) * 65536))
+
+
 def alpha_composite(base: np.ndarray, overlay: np.ndarray,
-                    position: tuple = (0, 0)) -> np.ndarray:
+                    position: tuple = (0, 0), brightness: float = 1.0) -> np.ndarray:
     """
     GPU 加速的 alpha 混合。蒙版自动从 RGBA 第4通道拆分。
     
@@ -446,6 +602,7 @@ def alpha_composite(base: np.ndarray, overlay: np.ndarray,
         base: 底图 (H, W, 3|4) uint8
         overlay: 叠加图 (H, W, 3|4) uint8, 支持 RGBA alpha 通道
         position: (x, y) 叠加位置
+        brightness: 混合结果的整帧亮度系数（淡入淡出）
     Returns:
         合成结果 (H, W, 3) uint8
     """
@@ -456,12 +613,13 @@ def alpha_composite(base: np.ndarray, overlay: np.ndarray,
     oh, ow = overlay.shape[:2]
     ox, oy = int(position[0]), int(position[1])
 
-    base_f = base[:, :, :3].astype(np.float32)
-    overlay_rgb, mask = _split_rgba(overlay)
-    out = np.zeros((h, w, 3), dtype=np.float32)
+    base_u8 = np.ascontiguousarray(base[:, :, :3])
+    premul, inv = _premultiply_rgba(overlay)
+    out = np.zeros((h, w, 3), dtype=np.uint8)
 
-    _submit_to_worker(_alpha_composite_kernel, base_f, overlay_rgb, mask, out, ox, oy, oh, ow, h, w)
-    return np.clip(out, 0, 255).astype(np.uint8)
+    _submit_to_worker(_alpha_composite_kernel, base_u8, premul, inv, out, ox, oy, oh, ow, h, w,
+                      _to_q16(brightness))
+    return out
 
 
 def multiply_brightness(image: np.ndarray, factor: float) -> np.ndarray:
@@ -583,14 +741,57 @@ def composite_five_layers(
     return np.clip(out, 0, 255).astype(np.uint8)
 
 
+_TI_DTYPES = {
+    np.dtype(np.float32): 'f32',
+    np.dtype(np.uint8): 'u8',
+    np.dtype(np.uint16): 'u16',
+    np.dtype(np.int32): 'i32',
+}
+
+
+def _do_upload_ndarray(array: np.ndarray):
+    """创建 Taichi ndarray 并拷贝数据 —— 在工作线程上执行"""
+    nd = ti.ndarray(dtype=getattr(ti, _TI_DTYPES[array.dtype]), shape=array.shape)
+    nd.from_numpy(array)
+    return nd
+
+
+def _do_update_ndarray(nd, array: np.ndarray):
+    nd.from_numpy(array)
+
+
+def to_device(array: np.ndarray):
+    """
+    将 NumPy 数组一次性上传为常驻设备内存的 Taichi ndarray。
+
+    NumPy 数组作为 kernel 参数时，CUDA/Vulkan 后端每次调用都会做一次
+    host→device（以及 device→host 回写）拷贝；静态层上传为 ti.ndarray 后
+    在整个片段内只传输一次。
+    """
+    if not is_available():
+        raise RuntimeError("Taichi 未初始化")
+    return _submit_to_worker(_do_upload_ndarray, np.ascontiguousarray(array))
+
+
 class FrameCompositor:
     """
     高性能帧合成器：预计算静态层，复用缓冲区。
 
     一个视频片段内 score_image / text_image / bg(静态背景) 不会逐帧变化，
-    因此在构造时一次性完成 RGBA 拆分和 float32 转换，帧循环里只传入
-    变化的 video_frame (uint8)，由 _five_layer_fast_kernel 在 GPU 内部
-    做 u8→f32 转换，避免 Python 端每帧 ~20MB 的内存拷贝。
+    因此在构造时一次性完成 RGBA → 定点预乘层（uint16 premul + uint8 inv）的转换，
+    帧循环里只传入变化的 video_frame (uint8)，_five_layer_fast_kernel 全程整数运算，
+    避免 Python 端每帧 ~20MB 的内存拷贝。
+
+    device_resident=True（默认）时静态层在构造时上传为 Taichi ndarray，
+    常驻设备内存，每帧只有 video_frame 和输出缓冲区经过 host↔device 总线。
+
+    static_plate=True 时启用底板模式：除视频矩形外的所有内容一次性预合成为
+    RGB 底板，视频上方的 score/text 区域预融合为一层，逐帧只在 GPU 上合成
+    视频矩形区域并写回底板副本（1080p maimai 约 540x540 而非 1920x1080）。
+    调用 update_bg（动态背景）后自动退回整帧合成。
+
+    composite_async 为非阻塞版本：结果写入 async_buffers 块输出缓冲区组成的缓冲池，
+    调用方在 kernel 执行期间可以处理上一帧，用完后 release 归还缓冲区。
     """
 
     def __init__(
@@ -602,6 +803,9 @@ class FrameCompositor:
         text_pos: tuple,
         bg_brightness: float = 0.8,
         output_size: tuple = (1920, 1080),
+        device_resident: bool = True,
+        static_plate: bool = False,
+        async_buffers: int = 3,
     ):
         if not is_available():
             raise RuntimeError("Taichi 未初始化")
@@ -610,44 +814,420 @@ class FrameCompositor:
         self.vid_x, self.vid_y = int(video_pos[0]), int(video_pos[1])
         self.text_x, self.text_y = int(text_pos[0]), int(text_pos[1])
         self.bg_brightness = float(bg_brightness)
-
-        # 静态层预计算（一次性）
-        self.bg_f = bg[:, :, :3].astype(np.float32)
-        self.score_rgb, self.score_mask = _split_rgba(score_image)
-        self.text_rgb, self.text_mask = _split_rgba(text_image)
-        self.score_h, self.score_w = self.score_rgb.shape[:2]
-        self.text_h, self.text_w = self.text_rgb.shape[:2]
+        self.device_resident = device_resident
+
+        # 静态层预计算（一次性）：叠加层先裁剪到非透明外接矩形，
+        # 成绩图通常覆盖整幅画布但大部分透明
+        from utils.CpuAccel import crop_to_content
+        score_image, (self.score_x, self.score_y) = crop_to_content(score_image)
+        text_image, (self.text_x, self.text_y) = crop_to_content(text_image, (self.text_x, self.text_y))
+        self._score_image = score_image
+        self._text_image = text_image
+        self.bg_u8 = np.ascontiguousarray(bg[:, :, :3])
+        self.score_premul, self.score_inv = _premultiply_rgba(score_image)
+        self.text_premul, self.text_inv = _premultiply_rgba(text_image)
+        self.score_h, self.score_w = self.score_premul.shape[:2]
+        self.text_h, self.text_w = self.text_premul.shape[:2]
+        self._layers_uploaded = False
 
         # 输出缓冲区复用
         self._out_buf = np.zeros((self.out_h, self.out_w, 3), dtype=np.uint8)
 
+        # 底板模式：底板直接作为输出缓冲区的初始内容，逐帧只覆盖视频矩形
+        self._plate = None
+        self._overlay = None
+        self._overlay_size = None
+        # 与上一帧相比发生变化的区域，None 表示整帧（供 yuv420p 增量转换）
+        self.dirty_rect = None
+        self._full_dirty = True
+        # 底板的设备端副本（仅淡入淡出帧需要）；上一帧是否为淡入淡出帧
+        self._plate_arg = None
+        self._plate_faded = False
+        # composite_batch 的缓冲区，首次批量调用时分配
+        self._batch_out = None
+        self._batch_videos = None
+        self._batch_regions = None
+        self._batch_stale = []
+        self.batch_dirty_rects = []
+        # composite_async 的输出缓冲池：每个槽位包含整帧输出、视频区域缓冲区与“内容不是底板”标记
+        self._async_buffers = max(1, int(async_buffers))
+        self._async_free = None
+        self._async_slots = {}
+        self._last_future = None
+        # 叠加层（视频矩形）每次重建时递增，缓冲池中按旧矩形写入的槽位需要恢复底板
+        self._overlay_generation = 0
+        if static_plate:
+            from utils.CpuAccel import build_static_plate
+            self._plate = build_static_plate(bg, score_image, text_image, (self.text_x, self.text_y),
+                                             self.bg_brightness, output_size, (self.score_x, self.score_y))
+            np.copyto(self._out_buf, self._plate)
+        else:
+            self._upload_layers()
+
+    def _upload_layers(self):
+        """整帧合成所需的静态层：上传到设备（一次性），帧循环中直接引用设备端 ndarray"""
+        if self._layers_uploaded:
+            return
+        if self.device_resident:
+            self._bg_arg = to_device(self.bg_u8)
+            self._score_premul_arg = to_device(self.score_premul)
+            self._score_inv_arg = to_device(self.score_inv)
+            self._text_premul_arg = to_device(self.text_premul)
+            self._text_inv_arg = to_device(self.text_inv)
+        else:
+            self._bg_arg = self.bg_u8
+            self._score_premul_arg = self.score_premul
+            self._score_inv_arg = self.score_inv
+            self._text_premul_arg = self.text_premul
+            self._text_inv_arg = self.text_inv
+        self._layers_uploaded = True
+
+    @property
+    def uses_plate(self) -> bool:
+        return self._plate is not None
+
     def update_bg(self, bg: np.ndarray):
         """动态背景（视频背景）时更新 bg，复用缓冲区避免每帧分配"""
+        # 背景逐帧变化时底板失效，退回整帧合成
+        self._plate = None
+        self._overlay = None
+        if not self.device_resident and self._last_future is not None:
+            # 未常驻设备时 kernel 直接读取 bg_u8，覆盖前等待已提交的异步合成完成
+            self._last_future.result()
         src = bg[:, :, :3]
-        if self.bg_f.shape[:2] == src.shape[:2]:
-            np.copyto(self.bg_f, src, casting='unsafe')
+        if self.bg_u8.shape[:2] != src.shape[:2]:
+            self.bg_u8 = np.ascontiguousarray(src)
+            if self._layers_uploaded:
+                self._bg_arg = to_device(self.bg_u8) if self.device_resident else self.bg_u8
         else:
-            self.bg_f = src.astype(np.float32)
+            np.copyto(self.bg_u8, src)
+            if self._layers_uploaded and self.device_resident:
+                # 动态背景每帧都会变化，只能逐帧上传，但复用同一块设备内存
+                _submit_to_worker(_do_update_ndarray, self._bg_arg, self.bg_u8)
+        self._upload_layers()
+
+    def per_frame_transfer_bytes(self, video_shape: tuple) -> int:
+        """
+        估算每帧经过 host↔device 总线的字节数（NumPy 参数按单向拷贝计）。
+        用于对比常驻设备内存前后的传输量。
+        """
+        vid_h, vid_w = video_shape[:2]
+        if self.uses_plate:
+            return vid_h * vid_w * 3 * 2
+        total = vid_h * vid_w * 3 + self._out_buf.nbytes
+        if not self.device_resident:
+            total += (self.bg_u8.nbytes + self.score_premul.nbytes + self.score_inv.nbytes
+                      + self.text_premul.nbytes + self.text_inv.nbytes)
+        return total
+
+    def _ensure_overlay(self, vid_w: int, vid_h: int):
+        """按视频尺寸准备视频矩形上方的预融合叠加层（尺寸不变时只做一次）"""
+        if self._overlay_size == (vid_w, vid_h) and self._overlay is not None:
+            return self._overlay
+        from utils.CpuAccel import build_video_overlay
+        premul, inv, rect = build_video_overlay(
+            self._score_image, self._text_image, (self.vid_x, self.vid_y), (vid_w, vid_h),
+            (self.text_x, self.text_y), (self.out_w, self.out_h), (self.score_x, self.score_y))
+        x1, y1, x2, y2 = rect
+        region_buf = np.zeros((max(0, y2 - y1), max(0, x2 - x1), 3), dtype=np.uint8)
+        premul, inv = _quantize_overlay(premul, inv)
+        if self.device_resident:
+            premul, inv = to_device(premul), to_device(inv)
+        # 视频尺寸变化时旧矩形区域需要还原为底板
+        np.copyto(self._out_buf, self._plate)
+        self._full_dirty = True
+        self._overlay = (premul, inv, rect, region_buf)
+        self._overlay_generation += 1
+        self._overlay_size = (vid_w, vid_h)
+        return self._overlay
+
+    def _composite_plate(self, video_u8: np.ndarray, brightness: float) -> np.ndarray:
+        vid_h, vid_w = video_u8.shape[:2]
+        premul, inv, (x1, y1, x2, y2), region_buf = self._ensure_overlay(vid_w, vid_h)
+        if brightness != 1.0 or self._plate_faded:
+            # 淡入淡出帧（及其后恢复原亮度的第一帧）需要整帧重写：
+            # 底板与视频区域在同一个 kernel 中合成并乘以亮度
+            if self._plate_arg is None:
+                self._plate_arg = to_device(self._plate) if self.device_resident else self._plate
+            _submit_to_worker(
+                _plate_fade_kernel,
+                self._plate_arg, video_u8, premul, inv, self._out_buf,
+                x1, y1, x2, y2,
+                y1 - self.vid_y, x1 - self.vid_x,
+                self.out_h, self.out_w,
+                _to_q16(brightness),
+            )
+            self._plate_faded = brightness != 1.0
+            self._full_dirty = False
+            self.dirty_rect = None
+            return self._out_buf
+
+        self.dirty_rect = None if self._full_dirty else (x1, y1, x2, y2)
+        self._full_dirty = False
+        if x2 <= x1 or y2 <= y1:
+            return self._out_buf
+        _submit_to_worker(
+            _video_region_kernel,
+            video_u8, premul, inv, region_buf,
+            y1 - self.vid_y, x1 - self.vid_x,
+            y2 - y1, x2 - x1,
+        )
+        self._out_buf[y1:y2, x1:x2] = region_buf
+        return self._out_buf
+
+    def _ensure_batch_buffers(self, k: int, vid_h: int, vid_w: int, rect: tuple):
+        """批量合成的输出帧堆叠 (K, H, W, 3)、视频帧堆叠与区域缓冲区，K 或视频尺寸变化时重新分配"""
+        x1, y1, x2, y2 = rect
+        # 逐帧回退路径只分配了 _batch_out，视频帧堆叠可能尚未分配
+        if (self._batch_out is None or self._batch_videos is None or len(self._batch_out) != k
+                or self._batch_videos.shape[1:3] != (vid_h, vid_w)):
+            self._batch_out = np.empty((k, self.out_h, self.out_w, 3), dtype=np.uint8)
+            self._batch_videos = np.empty((k, vid_h, vid_w, 3), dtype=np.uint8)
+            self._batch_regions = np.empty((k, max(0, y2 - y1), max(0, x2 - x1), 3), dtype=np.uint8)
+            # 槽位内容与底板不一致（新分配或上次写入了淡入淡出帧），使用前需整帧恢复
+            self._batch_stale = [True] * k
+
+    def composite_batch(self, video_frames: list, brightness: list = None, bgs: list = None) -> np.ndarray:
+        """
+        批量合成 K 帧，底板模式下一次工作线程提交、一次 kernel 调用完成所有
+        原亮度帧的视频矩形区域，摊薄逐帧的队列/Event 同步与 kernel 启动开销。
+
+        淡入淡出帧、整帧合成模式以及动态背景（bgs 不为 None，逐帧 update_bg）
+        退回逐帧 composite，结果与逐帧调用完全一致。
+
+        Args:
+            video_frames: K 个 uint8 RGB 视频帧（尺寸相同）
+            brightness: K 个整帧亮度，None 时全部为 1.0
+            bgs: K 个动态背景帧，None 表示背景不变
+        Returns:
+            (K, H, W, 3) uint8 帧堆叠，是内部缓冲区的引用，下次调用会被覆盖。
+            self.batch_dirty_rects[n] 为第 n 帧相对于前一帧（跨批次连续）的变化区域。
+        """
+        k = len(video_frames)
+        brightness = list(brightness) if brightness is not None else [1.0] * k
+        vid_h, vid_w = video_frames[0].shape[:2]
+        same_size = all(f.shape[:2] == (vid_h, vid_w) for f in video_frames)
+        self.batch_dirty_rects = []
+
+        if bgs is not None or not self.uses_plate or not same_size:
+            if self._batch_out is None or len(self._batch_out) != k:
+                self._batch_out = np.empty((k, self.out_h, self.out_w, 3), dtype=np.uint8)
+                self._batch_stale = [True] * k
+            for n, frame in enumerate(video_frames):
+                if bgs is not None and bgs[n] is not None:
+                    self.update_bg(bgs[n])
+                np.copyto(self._batch_out[n], self.composite(frame, brightness[n]))
+                self._batch_stale[n] = True
+                self.batch_dirty_rects.append(self.dirty_rect)
+            return self._batch_out
+
+        premul, inv, rect, _ = self._ensure_overlay(vid_w, vid_h)
+        x1, y1, x2, y2 = rect
+        self._ensure_batch_buffers(k, vid_h, vid_w, rect)
+        for n, frame in enumerate(video_frames):
+            self._batch_videos[n] = frame[:, :, :3]
+        if x2 > x1 and y2 > y1 and any(b == 1.0 for b in brightness):
+            _submit_to_worker(
+                _video_region_batch_kernel,
+                self._batch_videos, premul, inv, self._batch_regions,
+                y1 - self.vid_y, x1 - self.vid_x,
+                k, y2 - y1, x2 - x1,
+            )
+
+        # 上一帧（可能来自上一批或逐帧调用）是否为原亮度的底板帧
+        prev_plain = not self._full_dirty and not self._plate_faded
+        for n in range(k):
+            out = self._batch_out[n]
+            if brightness[n] != 1.0:
+                np.copyto(out, self._composite_plate(self._batch_videos[n], brightness[n]))
+                self._batch_stale[n] = True
+                self.batch_dirty_rects.append(None)
+                prev_plain = False
+                continue
+            if self._batch_stale[n]:
+                np.copyto(out, self._plate)
+                self._batch_stale[n] = False
+            if x2 > x1 and y2 > y1:
+                out[y1:y2, x1:x2] = self._batch_regions[n]
+            self.batch_dirty_rects.append(rect if prev_plain else None)
+            prev_plain = True
+        # 下一次逐帧调用需要知道输出序列的上一帧不是原亮度底板帧
+        self._full_dirty = not prev_plain
+        return self._batch_out
+
+    def _acquire_slot(self) -> dict:
+        if self._async_free is None:
+            self._async_free = _queue_module.Queue()
+            for _ in range(self._async_buffers):
+                slot = {'out': np.zeros((self.out_h, self.out_w, 3), dtype=np.uint8),
+                        'region': None, 'stale': True}
+                self._async_slots[id(slot['out'])] = slot
+                self._async_free.put(slot)
+        return self._async_free.get()
+
+    def release(self, frame: np.ndarray):
+        """归还 composite_async 返回的输出缓冲区"""
+        self._async_free.put(self._async_slots[id(frame)])
+
+    def composite_async(self, video_frame: np.ndarray, brightness: float = 1.0) -> Future:
+        """
+        非阻塞合成一帧，立即返回 Future，结果为 (frame, dirty_rect)：
+        frame 为输出缓冲池中的一块，使用完后必须调用 release(frame) 归还；
+        dirty_rect 为相对于上一次提交的帧的变化区域（None 表示整帧）。
 
-    def composite(self, video_frame: np.ndarray) -> np.ndarray:
+        缓冲池耗尽时本调用阻塞，直到有缓冲区被归还。kernel 仍在 Taichi 工作线程上
+        按提交顺序执行，video_frame 在 Future 完成前不得修改。
+        结果与 composite 逐帧调用一致。
+        """
+        vid_h, vid_w = video_frame.shape[:2]
+        video_u8 = np.ascontiguousarray(video_frame[:, :, :3])
+        brightness = float(brightness)
+        slot = self._acquire_slot()
+        out = slot['out']
+
+        if not self.uses_plate:
+            slot['stale'] = True
+            self._full_dirty = True
+            self._last_future = _submit_to_worker_async(
+                self._run_async_task, _five_layer_fast_kernel, out, None,
+                self._bg_arg, video_u8,
+                self._score_premul_arg, self._score_inv_arg,
+                self._text_premul_arg, self._text_inv_arg,
+                out,
+                _to_q16(self.bg_brightness),
+                self.vid_x, self.vid_y, vid_h, vid_w,
+                self.score_x, self.score_y, self.score_h, self.score_w,
+                self.text_x, self.text_y, self.text_h, self.text_w,
+                self.out_h, self.out_w,
+                _to_q16(brightness),
+            )
+            return self._last_future
+
+        premul, inv, rect, _ = self._ensure_overlay(vid_w, vid_h)
+        x1, y1, x2, y2 = rect
+        # 上一帧（可能来自逐帧或批量调用）是否为原亮度的底板帧
+        prev_plain = not self._full_dirty and not self._plate_faded
+        if brightness != 1.0:
+            if self._plate_arg is None:
+                self._plate_arg = to_device(self._plate) if self.device_resident else self._plate
+            slot['stale'] = True
+            self._full_dirty = True
+            self._last_future = _submit_to_worker_async(
+                self._run_async_task, _plate_fade_kernel, out, None,
+                self._plate_arg, video_u8, premul, inv, out,
+                x1, y1, x2, y2,
+                y1 - self.vid_y, x1 - self.vid_x,
+                self.out_h, self.out_w,
+                _to_q16(brightness),
+            )
+            return self._last_future
+
+        region_shape = (max(0, y2 - y1), max(0, x2 - x1), 3)
+        if slot['region'] is None or slot['region'].shape != region_shape:
+            slot['region'] = np.zeros(region_shape, dtype=np.uint8)
+        restore_plate = slot['stale'] or slot.get('generation') != self._overlay_generation
+        slot['stale'] = False
+        slot['generation'] = self._overlay_generation
+        self._full_dirty = False
+        plate = self._plate
+
+        def region_task():
+            if restore_plate:
+                np.copyto(out, plate)
+            if x2 > x1 and y2 > y1:
+                _video_region_kernel(video_u8, premul, inv, slot['region'],
+                                     y1 - self.vid_y, x1 - self.vid_x, y2 - y1, x2 - x1)
+                out[y1:y2, x1:x2] = slot['region']
+            return out, (rect if prev_plain else None)
+
+        self._last_future = _submit_to_worker_async(region_task)
+        return self._last_future
+
+    @staticmethod
+    def _run_async_task(kernel, out, dirty_rect, *args):
+        """在工作线程上执行整帧 kernel，返回 (frame, dirty_rect)"""
+        kernel(*args)
+        return out, dirty_rect
+
+    def composite(self, video_frame: np.ndarray, brightness: float = 1.0) -> np.ndarray:
         """
         合成一帧。video_frame 为 uint8 RGB，直接传入 GPU kernel。
+        brightness 为整帧亮度（淡入淡出），在合成 kernel 内乘入。
         返回的 ndarray 是内部缓冲区的引用，下次调用会被覆盖。
         如果需要保留，请调用方自行 .copy()。
         """
         vid_h, vid_w = video_frame.shape[:2]
         video_u8 = np.ascontiguousarray(video_frame[:, :, :3])
+        if self.uses_plate:
+            return self._composite_plate(video_u8, brightness)
 
+        self.dirty_rect = None
         _submit_to_worker(
             _five_layer_fast_kernel,
-            self.bg_f, video_u8,
-            self.score_rgb, self.score_mask,
-            self.text_rgb, self.text_mask,
+            self._bg_arg, video_u8,
+            self._score_premul_arg, self._score_inv_arg,
+            self._text_premul_arg, self._text_inv_arg,
             self._out_buf,
-            self.bg_brightness,
+            _to_q16(self.bg_brightness),
             self.vid_x, self.vid_y, vid_h, vid_w,
-            self.score_h, self.score_w,
+            self.score_x, self.score_y, self.score_h, self.score_w,
             self.text_x, self.text_y, self.text_h, self.text_w,
             self.out_h, self.out_w,
+            _to_q16(brightness),
+        )
+        return self._out_buf
+
+
+class InfoFrameCompositor:
+    """
+    开场/结尾信息片段的帧合成器：背景视频帧 (dimmed) → text_bg → text。
+
+    text_bg 与 text 在片段内不变，构造时裁剪到非透明区域并一次性预融合为
+    覆盖两层外接矩形的 (premul, inv)，上传到设备，逐帧只传入背景帧，
+    暗化、两层叠加与淡入淡出亮度在一次 kernel 调用中完成。
+    """
+
+    def __init__(
+        self,
+        text_bg_image: np.ndarray,
+        text_image: np.ndarray,
+        text_pos: tuple,
+        bg_dim: float = 0.75,
+        output_size: tuple = (1920, 1080),
+        device_resident: bool = True,
+    ):
+        if not is_available():
+            raise RuntimeError("Taichi 未初始化")
+        from utils.CpuAccel import build_video_overlay, crop_to_content, union_rect
+
+        self.out_w, self.out_h = output_size
+        self.bg_dim = float(bg_dim)
+        # 以两层外接矩形的并集作为“视频矩形”，得到只覆盖该范围的融合叠加层
+        text_bg_image, text_bg_pos = crop_to_content(text_bg_image)
+        text_image, text_pos = crop_to_content(text_image, text_pos)
+        x1, y1, x2, y2 = union_rect(((text_bg_image, text_bg_pos), (text_image, text_pos)), output_size)
+        premul, inv, self._rect = build_video_overlay(
+            text_bg_image, text_image, (x1, y1), (x2 - x1, y2 - y1), text_pos, output_size, text_bg_pos)
+        if self._rect[2] <= self._rect[0] or self._rect[3] <= self._rect[1]:
+            # 叠加层全部位于画布外：保留 1x1 占位数组，kernel 不会读取
+            premul, inv = np.zeros((1, 1, 3), np.float32), np.ones((1, 1), np.float32)
+        premul, inv = _quantize_overlay(premul, inv)
+        if device_resident:
+            premul, inv = to_device(premul), to_device(inv)
+        self._premul, self._inv = premul, inv
+        self._out_buf = np.zeros((self.out_h, self.out_w, 3), dtype=np.uint8)
+
+    def composite(self, bg_frame: np.ndarray, brightness: float = 1.0) -> np.ndarray:
+        """
+        合成一帧。bg_frame 为输出尺寸的 uint8 RGB 背景帧。
+        返回的 ndarray 是内部缓冲区的引用，下次调用会被覆盖。
+        """
+        bg_u8 = np.ascontiguousarray(bg_frame[:, :, :3])
+        _submit_to_worker(
+            _info_composite_kernel,
+            bg_u8, self._premul, self._inv, self._out_buf,
+            _to_q16(self.bg_dim), _to_q16(brightness),
+            *self._rect,
+            self.out_h, self.out_w,
         )
         return self._out_buf
@@ -1,5 +1,7 @@
 import os
 import time
+import collections
+import functools
 import numpy as np
 import subprocess
 import traceback
@@ -136,10 +138,26 @@ def save_jacket_background_image(img_data: Image.Image, save_path: str):
 
 
 
-def normalize_audio_volume(clip, target_dbfs=-20):
-    """均衡化音频响度到指定的分贝值"""
+def _clip_audio_source(clip_config: dict, style_config: dict, clip_type: str = "content"):
+    """片段音频的来源 (文件, 起点, 时长)：谱面片段为谱面视频的音频，开场/结尾为 intro_bgm"""
+    if clip_type == "content":
+        return clip_config.get('video'), clip_config.get('start', 0), clip_config.get('duration')
+    return style_config['asset_paths'].get('intro_bgm'), 0, clip_config.get('duration')
+
+
+def normalize_audio_volume(clip, target_dbfs=-20, source: tuple = None):
+    """均衡化音频响度到指定的分贝值
+
+    source: 片段音频的来源 (文件, 起点, 时长)，提供时按 EBU R128 响度测量（带缓存，见 LoudnessCache）
+        计算增益，否则通过 MoviePy 采样估算 RMS
+    """
     if clip.audio is None:
         return clip
+
+    if source is not None and source[0] and os.path.exists(source[0]):
+        from utils.LoudnessCache import loudness_gain_db
+        gain_db = loudness_gain_db(*source, target_lufs=target_dbfs)
+        return clip.with_volume_scaled(10 ** (gain_db / 20)) if gain_db else clip
     
     try:
         # 获取音频数据
@@ -643,7 +661,7 @@ def create_full_video(game_type: str, style_config: dict, resolution: tuple,
         for idx, clip_config in enumerate(intro_configs):
             print(f"开场片段 {idx + 1}: 配置键 = {list(clip_config.keys())}")
             clip = create_info_segment(clip_config, style_config, resolution)
-            clip = normalize_audio_volume(clip)
+            clip = normalize_audio_volume(clip, source=_clip_audio_source(clip_config, style_config, "info"))
             add_clip_with_transition(clips, clip, 
                                     set_start=True, 
                                     trans_time=trans_time)
@@ -663,13 +681,13 @@ def create_full_video(game_type: str, style_config: dict, resolution: tuple,
             clip_config['end'] = full_clip_duration
 
             clip = create_video_segment(game_type, clip_config, style_config, resolution)  
-            clip = normalize_audio_volume(clip)
+            clip = normalize_audio_volume(clip, source=_clip_audio_source(clip_config, style_config))
 
             combined_start_time = clips[-1].end - trans_time
             ending_clips.append(clip)     
         else:
             clip = create_video_segment(game_type, clip_config, style_config, resolution)  
-            clip = normalize_audio_volume(clip)
+            clip = normalize_audio_volume(clip, source=_clip_audio_source(clip_config, style_config))
 
             add_clip_with_transition(clips, clip, 
                                     set_start=True, 
@@ -679,7 +697,7 @@ def create_full_video(game_type: str, style_config: dict, resolution: tuple,
     if ending_configs:
         for clip_config in ending_configs:
             clip = create_info_segment(clip_config, style_config, resolution)
-            clip = normalize_audio_volume(clip)
+            clip = normalize_audio_volume(clip, source=_clip_audio_source(clip_config, style_config, "info"))
             if full_last_clip:
                 ending_clips.append(clip)
             else:
@@ -729,7 +747,7 @@ def combine_full_video_from_existing_clips(video_clips: list, resolution, trans_
 
     for video_clip in video_clips:
         clip = VideoFileClip(video_clip)
-        clip = normalize_audio_volume(clip)
+        clip = normalize_audio_volume(clip, source=(video_clip, 0, None))
         if len(clips) == 0:
             clips.append(clip)
         else:
@@ -817,54 +835,111 @@ def get_combined_ending_clip(ending_clips, combined_start_time, trans_time):
     return combined_clip
 
 
+def _read_accel_render_config(render_workers: int = None, parallel_mode: str = None) -> dict:
+    """ 读取 GPU 路线的渲染配置：多片段并行（RENDER_WORKERS / RENDER_PARALLEL_MODE）
+        、管道像素格式（RENDER_PIPE_PIX_FMT）、背景视频帧缓存预算（BG_FRAME_CACHE_MB）
+        、谱面视频解码方式（VIDEO_DECODER）、Taichi 批量合成帧数（RENDER_BATCH_SIZE）
+        与是否保留不含评论文字的中间文件（RENDER_KEEP_INTERMEDIATE）
+    """
+    from utils.PageUtils import read_global_config
+    config = read_global_config()
+    if render_workers is None:
+        render_workers = config.get('RENDER_WORKERS', 1)
+    if parallel_mode is None:
+        parallel_mode = config.get('RENDER_PARALLEL_MODE', 'thread')
+    if parallel_mode not in ('thread', 'process'):
+        print(f"[VideoUtils] 未知的并行模式 {parallel_mode}，使用 thread")
+        parallel_mode = 'thread'
+    decoder = config.get('VIDEO_DECODER', 'opencv')
+    if decoder not in ('opencv', 'ffmpeg', 'ffmpeg_hw'):
+        decoder = 'opencv'
+    pipe_pix_fmt = config.get('RENDER_PIPE_PIX_FMT', 'rgb24')
+    if pipe_pix_fmt not in ('rgb24', 'yuv420p'):
+        pipe_pix_fmt = 'rgb24'
+    return {"max_workers": max(1, int(render_workers or 1)), "parallel_mode": parallel_mode,
+            "pipe_pix_fmt": pipe_pix_fmt, "bg_cache_mb": int(config.get('BG_FRAME_CACHE_MB', 1024)),
+            "decoder": decoder, "batch_size": max(1, int(config.get('RENDER_BATCH_SIZE', 4))),
+            "keep_intermediate": bool(config.get('RENDER_KEEP_INTERMEDIATE', False))}
+
+
+def _resolve_accel_engine(use_gpu_accel):
+    """ 解析 USE_GPU_ACCEL（"moviepy" / "numpy" / "taichi"，兼容旧版布尔值），
+        返回加速管线使用的合成引擎；MoviePy 路线返回 None。
+        选择 taichi 但 Taichi 未安装或初始化失败时回退到 numpy 引擎，而不是 MoviePy。
+    """
+    from utils.AccelRenderer import resolve_render_engine
+    engine = resolve_render_engine(use_gpu_accel)
+    if engine == "moviepy":
+        return None
+    if engine == "taichi":
+        try:
+            from utils.TaichiAccel import init_taichi, is_available
+            init_taichi()
+            if is_available():
+                return "taichi"
+            print("[VideoUtils] Taichi 初始化失败，回退到 NumPy CPU 合成")
+        except ImportError:
+            print("[VideoUtils] Taichi 未安装，回退到 NumPy CPU 合成")
+    return "numpy"
+
+
 def render_all_video_clips(game_type: str, style_config: dict, main_configs: list,
                            video_output_path: str, video_res: tuple, video_bitrate: str,
                            video_fps: int = 60,
                            intro_configs: list = None, ending_configs: list = None,
                            auto_add_transition=True, trans_time=1, force_render=False,
-                           use_gpu_accel: bool = None, progress_callback=None):
+                           use_gpu_accel: Union[bool, str] = None, progress_callback=None,
+                           render_workers: int = None, parallel_mode: str = None):
     """ 渲染所有视频片段，并按照clip_title_name输出到指定路径文件。
-        当 use_gpu_accel=True 时使用 Taichi GPU + FFmpeg 硬件编码加速。
+        use_gpu_accel: 渲染引擎，"taichi"（Taichi GPU + FFmpeg 硬件编码）、"numpy"（同一加速管线，
+        NumPy/OpenCV CPU 合成）或 "moviepy"；True/False 等价于 "taichi"/"moviepy"。
         当 use_gpu_accel=None 时从 global_config 读取配置。
+        render_workers / parallel_mode: GPU 路线的并行片段数与并行方式，None 时从 global_config 读取。
     """
     # 检查是否启用 GPU 加速
     if use_gpu_accel is None:
         from utils.PageUtils import read_global_config
         use_gpu_accel = read_global_config().get('USE_GPU_ACCEL', False)
 
-    if use_gpu_accel:
+    accel_engine = _resolve_accel_engine(use_gpu_accel)
+    if accel_engine:
         try:
-            from utils.TaichiAccel import init_taichi, is_available
-            init_taichi()
-            if is_available():
-                from utils.AccelRenderer import render_all_clips_accel
-                print("=" * 60)
+            from utils.AccelRenderer import render_all_clips_accel
+            print("=" * 60)
+            if accel_engine == "taichi":
                 print("🚀 使用 GPU 加速渲染模式 (Taichi + FFmpeg 硬件编码)")
-                print("=" * 60)
-                render_all_clips_accel(
-                    game_type=game_type,
-                    style_config=style_config,
-                    main_configs=main_configs,
-                    video_output_path=video_output_path,
-                    video_res=video_res,
-                    video_bitrate=video_bitrate,
-                    intro_configs=intro_configs,
-                    ending_configs=ending_configs,
-                    auto_add_transition=auto_add_transition,
-                    trans_time=trans_time,
-                    force_render=force_render,
-                    fps=video_fps,
-                    progress_callback=progress_callback
-                )
-                return
             else:
-                print("[VideoUtils] Taichi 初始化失败，回退到 CPU 渲染")
+                print("🚀 使用 CPU 加速渲染模式 (NumPy + FFmpeg 硬件编码)")
+            print("=" * 60)
+            render_all_clips_accel(
+                game_type=game_type,
+                style_config=style_config,
+                main_configs=main_configs,
+                video_output_path=video_output_path,
+                video_res=video_res,
+                video_bitrate=video_bitrate,
+                intro_configs=intro_configs,
+                ending_configs=ending_configs,
+                auto_add_transition=auto_add_transition,
+                trans_time=trans_time,
+                force_render=force_render,
+                fps=video_fps,
+                progress_callback=progress_callback,
+                engine=accel_engine,
+                **_read_accel_render_config(render_workers, parallel_mode)
+            )
+            return
         except ImportError:
-            print("[VideoUtils] Taichi 未安装，回退到 CPU 渲染")
+            print("[VideoUtils] 加速渲染依赖缺失，回退到 MoviePy 渲染")
 
     vfile_prefix = 0
+    # 渲染清单：只重新渲染内容哈希变化的片段
+    from utils.RenderManifest import RenderManifest, compute_clip_hash
+    os.makedirs(video_output_path, exist_ok=True)
+    manifest = RenderManifest(video_output_path)
 
-    def modify_and_rend_clip(clip, config, prefix, auto_add_transition, trans_time, override_clip_name=None):
+    def modify_and_rend_clip(clip, config, prefix, auto_add_transition, trans_time, override_clip_name=None,
+                             clip_type="content"):
         if override_clip_name:
             clip_title_name = override_clip_name
         else:
@@ -872,14 +947,18 @@ def render_all_video_clips(game_type: str, style_config: dict, main_configs: lis
         clip_title_name = remove_invalid_chars(clip_title_name)  # clip_title_name作为输出文件名的一部分，需要进行清洗，去除不合法字符
         output_file = os.path.join(video_output_path, f"{prefix}_{clip_title_name}.mp4")
 
-        # 检查文件是否已经存在
-        if os.path.exists(output_file) and not force_render:
-            print(f"视频文件{output_file}已存在，跳过渲染。如果需要强制覆盖已存在的文件，请设置勾选force_render")
+        # 检查文件是否已经存在且内容未变化
+        clip_hash = compute_clip_hash(config, style_config, clip_type, resolution=video_res, fps=video_fps,
+                                      codec="libx264", bitrate=video_bitrate,
+                                      fade_in=trans_time if auto_add_transition else 0,
+                                      fade_out=trans_time if auto_add_transition else 0)
+        if not manifest.needs_render(output_file, clip_hash, force_render):
+            print(f"视频文件{output_file}已存在且内容未变化，跳过渲染。如果需要强制覆盖已存在的文件，请设置勾选force_render")
             clip.close()
             del clip
             return
         
-        clip = normalize_audio_volume(clip)
+        clip = normalize_audio_volume(clip, source=_clip_audio_source(config, style_config, clip_type))
         # 如果启用了自动添加转场效果，则在头尾加入淡入淡出
         if auto_add_transition:
             clip = clip.with_effects([
@@ -892,6 +971,7 @@ def render_all_video_clips(game_type: str, style_config: dict, main_configs: lis
         print(f"正在合成视频片段: {prefix}_{clip_title_name}.mp4")
         clip.write_videofile(output_file, fps=video_fps, threads=4, preset='ultrafast', bitrate=video_bitrate)
         clip.close()
+        manifest.record(output_file, clip_hash)
         # 强制垃圾回收
         del clip
 
@@ -899,7 +979,8 @@ def render_all_video_clips(game_type: str, style_config: dict, main_configs: lis
     if intro_configs:
         for clip_config in intro_configs:
             clip = create_info_segment(clip_config, style_config, video_res)
-            modify_and_rend_clip(clip, clip_config, vfile_prefix, auto_add_transition, trans_time, override_clip_name="INTRO")
+            modify_and_rend_clip(clip, clip_config, vfile_prefix, auto_add_transition, trans_time, override_clip_name="INTRO",
+                                 clip_type="info")
             vfile_prefix += 1
 
     for clip_config in main_configs:
@@ -911,7 +992,8 @@ def render_all_video_clips(game_type: str, style_config: dict, main_configs: lis
     if ending_configs:
         for clip_config in ending_configs:
             clip = create_info_segment(clip_config, style_config, video_res)
-            modify_and_rend_clip(clip, clip_config, vfile_prefix, auto_add_transition, trans_time, override_clip_name="ENDING")
+            modify_and_rend_clip(clip, clip_config, vfile_prefix, auto_add_transition, trans_time, override_clip_name="ENDING",
+                                 clip_type="info")
             vfile_prefix += 1
 
 
@@ -948,89 +1030,117 @@ def render_complete_full_video(
         video_res: tuple = (1920, 1080), video_bitrate: str = "4000k",
         video_fps: int = 60,
         video_trans_enable: bool = True, video_trans_time: float = 1.0, full_last_clip: bool = False,
-        use_gpu_accel: bool = None, use_baked_fade: bool = None, progress_callback=None,
-        force_render: bool = False):
+        use_gpu_accel: Union[bool, str] = None, use_baked_fade: bool = None, progress_callback=None,
+        force_render: bool = False, render_workers: int = None, parallel_mode: str = None,
+        direct_full_video: bool = None):
     """ 根据完整配置合成完整视频，并保存到指定路径的文件。
-        当 use_gpu_accel=True 时，先用 GPU 加速渲染所有片段，再用 FFmpeg 拼接。
+        当 use_gpu_accel 为 "taichi" / "numpy"（或 True）时，先用加速管线渲染所有片段，再用 FFmpeg 拼接；
+        取值含义见 render_all_video_clips。
         use_baked_fade: 已废弃，仅为兼容旧调用保留。GPU 路线默认使用低内存 transition island + concat。
-        force_render: 是否覆盖已存在的 GPU 渲染片段，默认保留并跳过同名片段。
+        force_render: 是否覆盖已存在的 GPU 渲染片段，默认只重新渲染内容变化的片段（见 RenderManifest）。
+        render_workers / parallel_mode: GPU 路线的并行片段数与并行方式，None 时从 global_config 读取。
+        direct_full_video: GPU 路线直接流式生成完整视频（单次编码，不生成片段文件），
+            None 时从 global_config 读取 RENDER_DIRECT_FULL_VIDEO。
     """
     # 检查是否启用 GPU 加速
     if use_gpu_accel is None:
         from utils.PageUtils import read_global_config
         use_gpu_accel = read_global_config().get('USE_GPU_ACCEL', False)
 
-    if use_gpu_accel:
+    accel_engine = _resolve_accel_engine(use_gpu_accel)
+    if accel_engine:
         try:
-            from utils.TaichiAccel import init_taichi, is_available
-            init_taichi()
-            if is_available():
-                from utils.AccelRenderer import render_all_clips_accel, detect_hw_encoder
-                print("=" * 60)
-                print("🚀 使用 GPU 加速完整视频生成模式")
-                print("=" * 60)
-                t_total_start = time.perf_counter()
-
-                # 检测硬件编码器
-                hw_codec, hw_codec_name = detect_hw_encoder()
-
-                # 第一步：渲染未烘焙转场的标准片段。转场由后续 FFmpeg island 管线完成。
-                t_step = time.perf_counter()
-                render_all_clips_accel(
+            from utils.AccelRenderer import render_all_clips_accel, detect_hw_encoder
+            print("=" * 60)
+            print(f"🚀 使用加速完整视频生成模式 (合成引擎: {accel_engine})")
+            print("=" * 60)
+            t_total_start = time.perf_counter()
+
+            if direct_full_video is None:
+                from utils.PageUtils import read_global_config
+                direct_full_video = bool(read_global_config().get('RENDER_DIRECT_FULL_VIDEO', False))
+            if direct_full_video:
+                # 整片流式渲染：转场在合成阶段完成，音频在同一次编码中混合并统一响度
+                from utils.AccelRenderer import render_full_video_stream_accel
+                render_config = _read_accel_render_config(render_workers, parallel_mode)
+                final_path = os.path.join(video_output_path, f"{username}_FULL_VIDEO.mp4")
+                render_full_video_stream_accel(
                     game_type=game_type,
                     style_config=style_config,
                     main_configs=main_configs,
-                    video_output_path=video_output_path,
+                    output_file=final_path,
                     video_res=video_res,
                     video_bitrate=video_bitrate,
                     intro_configs=intro_configs,
                     ending_configs=ending_configs,
-                    auto_add_transition=False,
-                    trans_time=video_trans_time,
-                    force_render=force_render,
+                    trans_time=video_trans_time if video_trans_enable else 0,
                     fps=video_fps,
-                    progress_callback=progress_callback
+                    progress_callback=progress_callback,
+                    engine=accel_engine,
+                    **{key: render_config[key] for key in ("pipe_pix_fmt", "bg_cache_mb", "decoder", "batch_size")}
                 )
-                print(f"[Timer] 步骤1 - 渲染所有片段耗时: {time.perf_counter() - t_step:.2f}s")
-
-                # 第二步：低内存拼接
-                t_step = time.perf_counter()
-                if video_trans_enable:
-                    print(f"[GPU] 转场模式: transition island xfade + concat + {hw_codec_name}")
-                    output_file = combine_full_video_xfade_islands(
-                        video_output_path,
-                        trans_time=video_trans_time,
-                        codec=hw_codec,
-                        bitrate=video_bitrate,
-                        video_fps=video_fps
-                    )
-                    print(f"[Timer] 步骤2 - 视频拼接(transition island)耗时: {time.perf_counter() - t_step:.2f}s")
-                else:
-                    print("[GPU] 无转场模式: 直接流拷贝拼接")
-                    output_file = combine_full_video_direct(
-                        video_output_path,
-                        auto_add_transition=False,
-                        trans_time=video_trans_time,
-                        video_fps=video_fps
-                    )
-                    print(f"[Timer] 步骤2 - 视频拼接(流拷贝)耗时: {time.perf_counter() - t_step:.2f}s")
-
-                # 第三步：音频均衡化 + 重命名
-                t_step = time.perf_counter()
-                final_path = os.path.join(video_output_path, f"{username}_FULL_VIDEO.mp4")
-                _normalize_video_audio(output_file, final_path)
-                print(f"[Timer] 步骤3 - 音频均衡化耗时: {time.perf_counter() - t_step:.2f}s")
-
-                t_total = time.perf_counter() - t_total_start
-                print(f"[Timer] ============================================")
-                print(f"[Timer] 完整视频生成总耗时: {t_total:.2f}s")
-                print(f"[Timer] ============================================")
+                print(f"[Timer] 完整视频生成总耗时: {time.perf_counter() - t_total_start:.2f}s")
                 print(f"[AccelRenderer] ✓ 完整视频生成完成: {final_path}")
-                return {"status": "success", "info": f"GPU加速合成完整视频成功"}
+                return {"status": "success", "info": "GPU加速合成完整视频成功"}
+
+            # 检测硬件编码器
+            hw_codec, hw_codec_name = detect_hw_encoder()
+
+            # 第一步：渲染未烘焙转场的标准片段。转场由后续 FFmpeg island 管线完成。
+            t_step = time.perf_counter()
+            render_all_clips_accel(
+                game_type=game_type,
+                style_config=style_config,
+                main_configs=main_configs,
+                video_output_path=video_output_path,
+                video_res=video_res,
+                video_bitrate=video_bitrate,
+                intro_configs=intro_configs,
+                ending_configs=ending_configs,
+                auto_add_transition=False,
+                trans_time=video_trans_time,
+                force_render=force_render,
+                fps=video_fps,
+                progress_callback=progress_callback,
+                engine=accel_engine,
+                **_read_accel_render_config(render_workers, parallel_mode)
+            )
+            print(f"[Timer] 步骤1 - 渲染所有片段耗时: {time.perf_counter() - t_step:.2f}s")
+
+            # 第二步：低内存拼接
+            t_step = time.perf_counter()
+            if video_trans_enable:
+                print(f"[GPU] 转场模式: transition island xfade + concat + {hw_codec_name}")
+                output_file = combine_full_video_xfade_islands(
+                    video_output_path,
+                    trans_time=video_trans_time,
+                    codec=hw_codec,
+                    bitrate=video_bitrate,
+                    video_fps=video_fps
+                )
+                print(f"[Timer] 步骤2 - 视频拼接(transition island)耗时: {time.perf_counter() - t_step:.2f}s")
             else:
-                print("[VideoUtils] Taichi 初始化失败，回退到 CPU 渲染")
+                print("[GPU] 无转场模式: 直接流拷贝拼接")
+                output_file = combine_full_video_direct(
+                    video_output_path,
+                    auto_add_transition=False,
+                    trans_time=video_trans_time,
+                    video_fps=video_fps
+                )
+                print(f"[Timer] 步骤2 - 视频拼接(流拷贝)耗时: {time.perf_counter() - t_step:.2f}s")
+
+            # 第三步：重命名。各片段渲染时已按响度测量值调整到目标响度，不再对成片音频重新编码
+            final_path = os.path.join(video_output_path, f"{username}_FULL_VIDEO.mp4")
+            os.replace(output_file, final_path)
+
+            t_total = time.perf_counter() - t_total_start
+            print(f"[Timer] ============================================")
+            print(f"[Timer] 完整视频生成总耗时: {t_total:.2f}s")
+            print(f"[Timer] ============================================")
+            print(f"[AccelRenderer] ✓ 完整视频生成完成: {final_path}")
+            return {"status": "success", "info": f"GPU加速合成完整视频成功"}
         except ImportError:
-            print("[VideoUtils] Taichi 未安装，回退到 CPU 渲染")
+            print("[VideoUtils] 加速渲染依赖缺失，回退到 MoviePy 渲染")
 
     # CPU 渲染回退路径
     print(f"正在合成完整视频...")
@@ -1158,44 +1268,10 @@ def combine_full_video_direct(video_clip_path, auto_add_transition=False, trans_
     return output_path
 
 
-def _normalize_video_audio(input_path: str, output_path: str):
-    """对完整视频进行音频均衡化（单次 FFmpeg loudnorm，与 CPU 路径的 RMS 归一化效果近似）"""
-    if os.path.exists(output_path):
-        os.remove(output_path)
-    try:
-        t_norm = time.perf_counter()
-        cmd = [
-            get_ffmpeg_binary('ffmpeg'), '-y', '-hide_banner', '-loglevel', 'warning',
-            '-i', input_path,
-            '-c:v', 'copy',
-            '-af', 'loudnorm=I=-20:TP=-1.5:LRA=11,aresample=48000:first_pts=0,asetpts=N/SR/TB',
-            '-c:a', 'aac', '-b:a', '192k',
-            '-ar', '48000',
-            output_path
-        ]
-        subprocess.run(cmd, check=True)
-        if os.path.exists(input_path) and input_path != output_path:
-            os.remove(input_path)
-        print(f"[AccelRenderer] ✓ 音频均衡化完成 (耗时 {time.perf_counter() - t_norm:.2f}s)")
-    except Exception as e:
-        print(f"[AccelRenderer] Warning: 音频均衡化失败 ({e})，直接使用原始文件")
-        if not os.path.exists(output_path):
-            os.rename(input_path, output_path)
-
-
 def _get_video_duration(filepath: str) -> float:
-    """使用 ffprobe 获取视频时长"""
-    cmd = [
-        get_ffmpeg_binary('ffprobe'), '-v', 'error',
-        '-show_entries', 'format=duration',
-        '-of', 'default=noprint_wrappers=1:nokey=1',
-        filepath
-    ]
-    result = subprocess.run(cmd, capture_output=True, text=True)
-    try:
-        return float(result.stdout.strip())
-    except ValueError:
-        return 0.0
+    """获取视频时长（ffprobe 结果按文件大小/mtime 缓存，见 ProbeCache）"""
+    from utils.ProbeCache import get_duration
+    return get_duration(filepath)
 
 
 def _format_seconds(value: float) -> str:
@@ -1227,9 +1303,13 @@ def _get_encoder_args_with_fallback(codec: str, bitrate: str, force_software: bo
 
 
 def _run_ffmpeg_encode_with_fallback(cmd_prefix: list, output_path: str,
-                                     codec: str, bitrate: str, stage: str):
+                                     codec: str, bitrate: str, stage: str,
+                                     primary_args: list = None):
+    """primary_args: 首选编码参数（默认按 codec/bitrate 生成），失败时回退 libx264"""
     attempts = []
-    if codec and codec != 'libx264':
+    if primary_args:
+        attempts.append((codec or 'libx264', primary_args))
+    elif codec and codec != 'libx264':
         attempts.append((codec, _get_encoder_args_with_fallback(codec, bitrate)))
     attempts.append(('libx264', _get_libx264_encoder_args()))
 
@@ -1262,7 +1342,7 @@ def _run_ffmpeg_encode_with_fallback(cmd_prefix: list, output_path: str,
 
 def _render_xfade_body_segment(input_path: str, start: float, duration: float,
                                output_path: str, codec: str, bitrate: str,
-                               video_fps: int, stage: str):
+                               video_fps: int, stage: str, primary_args: list = None):
     filter_complex = (
         f"[0:v]trim=start={_format_seconds(start)}:duration={_format_seconds(duration)},"
         f"setpts=PTS-STARTPTS,fps={video_fps},format=yuv420p,settb=AVTB[v];"
@@ -1276,13 +1356,13 @@ def _render_xfade_body_segment(input_path: str, start: float, duration: float,
         '-filter_complex', filter_complex,
         '-map', '[v]', '-map', '[a]'
     ]
-    _run_ffmpeg_encode_with_fallback(cmd_prefix, output_path, codec, bitrate, stage)
+    _run_ffmpeg_encode_with_fallback(cmd_prefix, output_path, codec, bitrate, stage, primary_args)
 
 
 def _render_xfade_transition_segment(left_path: str, right_path: str,
                                      left_start: float, duration: float,
                                      output_path: str, codec: str, bitrate: str,
-                                     video_fps: int, stage: str):
+                                     video_fps: int, stage: str, primary_args: list = None):
     duration_s = _format_seconds(duration)
     filter_complex = (
         f"[0:v]trim=start={_format_seconds(left_start)}:duration={duration_s},"
@@ -1306,7 +1386,71 @@ def _render_xfade_transition_segment(left_path: str, right_path: str,
         '-filter_complex', filter_complex,
         '-map', '[vout]', '-map', '[aout]'
     ]
-    _run_ffmpeg_encode_with_fallback(cmd_prefix, output_path, codec, bitrate, stage)
+    _run_ffmpeg_encode_with_fallback(cmd_prefix, output_path, codec, bitrate, stage, primary_args)
+
+
+# 主体片段流拷贝时的音频处理，与重编码路径的音频滤镜一致
+_ISLAND_AUDIO_FILTER = ("aresample=48000:async=1:first_pts=0,"
+                        "asetpts=N/SR/TB,aformat=sample_fmts=fltp:channel_layouts=stereo")
+
+
+def _copy_xfade_body_segment(input_path: str, start: float, duration: float,
+                             output_path: str, video_fps: int, stage: str):
+    """
+    主体片段起止点均为关键帧时，视频直接流拷贝，只重编码音频。
+    start 必须是关键帧的时间戳：输入端 -ss 在流拷贝时从不晚于 start 的关键帧开始。
+    流拷贝时 -t 按解码顺序截断会多带出 B 帧，视频改用帧数截断，音频在滤镜中截断。
+    """
+    frame_count = max(1, int(round(duration * video_fps)))
+    cmd = [
+        get_ffmpeg_binary('ffmpeg'), '-y', '-hide_banner', '-loglevel', 'warning',
+        '-ss', _format_seconds(start), '-i', input_path,
+        '-map', '0:v:0', '-map', '0:a:0',
+        '-c:v', 'copy', '-frames:v', str(frame_count),
+        '-af', f"atrim=duration={_format_seconds(duration)},{_ISLAND_AUDIO_FILTER}",
+        '-c:a', 'aac', '-b:a', '192k', '-ar', '48000',
+        output_path
+    ]
+    _run_subprocess_checked(cmd, stage)
+
+
+def _island_probe_result(info: dict):
+    """ProbeCache 元数据 → 编码签名、视频流时长与关键帧时间点；没有视频流时返回 None"""
+    if info is None or not info.get("video_codec"):
+        return None
+    return {
+        # 签名包含 extradata (SPS/PPS) 的哈希：签名相同的片段才能在 concat 时直接拼接码流
+        "signature": tuple(info.get(key) for key in
+                           ('video_codec', 'profile', 'width', 'height', 'pix_fmt', 'extradata_hash')),
+        "duration": info.get("stream_duration") or 0.0,
+        "keyframes": info.get("keyframes", []),
+    }
+
+
+def _probe_island_video(filepath: str, with_keyframes: bool = True):
+    """读取视频流的编码签名、时长与关键帧时间点（只解复用，不解码），读取失败返回 None"""
+    from utils.ProbeCache import probe_media
+    return _island_probe_result(probe_media(filepath, with_keyframes=with_keyframes))
+
+
+def _probe_island_videos(file_paths: list) -> list:
+    """批量读取片段的编码签名与关键帧（带缓存，未命中的片段并发探测）"""
+    from utils.ProbeCache import probe_media_batch
+    return [_island_probe_result(info) for info in probe_media_batch(file_paths, with_keyframes=True)]
+
+
+def _keyframe_at_cut(keyframes: list, time_sec: float, video_fps: int):
+    """
+    trim 滤镜在 time_sec 处切分时保留的第一帧（时间戳 >= time_sec 的第一帧）为关键帧时返回其时间戳，
+    否则返回 None。
+    """
+    import bisect
+    import math
+    frame_time = math.ceil(time_sec * video_fps - 1e-6) / video_fps
+    idx = bisect.bisect_left(keyframes, frame_time - 1e-3)
+    if idx < len(keyframes) and keyframes[idx] <= frame_time + 1e-3:
+        return keyframes[idx]
+    return None
 
 
 def _concat_island_segments(segment_paths: list, list_file: str, output_path: str,
@@ -1341,12 +1485,76 @@ def _concat_island_segments(segment_paths: list, list_file: str, output_path: st
     _run_subprocess_checked(reencode_cmd, "transition island 最终 concat 重编码")
 
 
+# 消费级显卡同时可用的硬件编码会话数有限（NVENC 旧驱动为 3 路）
+_HW_ENCODER_SESSIONS = 3
+
+
+def _island_worker_count(codec: str, task_count: int, max_workers: int = None) -> int:
+    """
+    island 临时片段的并行数：显式指定时使用 max_workers；硬件编码受编码会话数限制；
+    libx264 每个进程本身是多线程的，并行数取核心数的一半。
+    """
+    if max_workers is None:
+        cpu_count = os.cpu_count() or 1
+        if codec and codec != 'libx264':
+            max_workers = min(cpu_count, _HW_ENCODER_SESSIONS)
+        else:
+            max_workers = max(1, cpu_count // 2)
+    return max(1, min(int(max_workers), task_count))
+
+
+# island 临时片段任务：输出路径、阶段名（用于日志与错误汇总）、生成函数、是否重编码（否则为流拷贝）
+_IslandTask = collections.namedtuple("_IslandTask", ["path", "stage", "run", "encoded"], defaults=[True])
+
+
+def _run_island_task(task: _IslandTask):
+    """执行单个临时片段任务，返回异常（成功时为 None）而不是抛出"""
+    try:
+        task.run()
+        return None
+    except Exception as e:
+        return e
+
+
+def _run_island_tasks(tasks: list, max_workers: int):
+    """
+    并行执行 island 临时片段任务 [_IslandTask]。
+    单个片段失败不会中断其余片段，全部结束后汇总失败的片段一并抛出。
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    if max_workers <= 1:
+        results = [_run_island_task(task) for task in tasks]
+    else:
+        print(f"[Island] 并行生成 {len(tasks)} 个临时片段: {max_workers} 个线程")
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="Island") as executor:
+            results = list(executor.map(_run_island_task, tasks))
+
+    failures = [(task.stage, error) for task, error in zip(tasks, results) if error is not None]
+    if failures:
+        for stage, error in failures:
+            print(f"[Island] {stage} 生成失败: {error}")
+        details = "; ".join(f"{stage}: {error}" for stage, error in failures)
+        raise RuntimeError(f"{len(failures)}/{len(tasks)} 个临时片段生成失败: {details}")
+
+
+class _IslandCopyMismatch(Exception):
+    """流拷贝模式下重编码片段的编码签名与原片段不一致"""
+
+
 def combine_full_video_xfade_islands(video_clip_path: str, trans_time: float = 1,
                                      codec: str = None, bitrate: str = "5000k",
                                      video_fps: int = 60,
-                                     temp_dir_name: str = "xfade_islands_tmp"):
+                                     temp_dir_name: str = "xfade_islands_tmp",
+                                     max_workers: int = None):
     """低内存 xfade 拼接：每次只处理相邻两个片段的转场窗口，再 concat。
 
+    各主体/转场临时片段互不依赖，由线程池并行生成（max_workers 为 None 时按核心数或
+    硬件编码会话数决定），拼接顺序与片段顺序一致。
+
+    片段编码参数一致、且主体部分的起止点落在关键帧上时（加速渲染在转场窗口边界强制关键帧），
+    主体部分直接流拷贝，只重编码转场窗口；否则主体部分也重编码。
+
     此函数服务于 GPU 渲染路线，内部仅调用 FFmpeg/FFprobe，不依赖 MoviePy。
     """
     print("[Info] --------------------开始 transition island 低内存拼接-------------------")
@@ -1363,14 +1571,24 @@ def combine_full_video_xfade_islands(video_clip_path: str, trans_time: float = 1
                                          trans_time=trans_time, video_fps=video_fps)
 
     file_paths = [os.path.join(video_clip_path, f) for f in sorted_files]
-    durations = []
-    for fp in file_paths:
-        duration = _get_video_duration(fp)
-        if duration <= 0:
-            raise ValueError(f"无法获取视频时长: {fp}")
-        durations.append(duration)
-
     frame_epsilon = 1 / max(video_fps, 1)
+
+    # 片段编码签名一致时尝试流拷贝主体部分（片段渲染时已在转场窗口边界强制关键帧），
+    # 此时以视频流时长为准，保证切点与关键帧对齐
+    probes = _probe_island_videos(file_paths)
+    smart_copy = (all(p is not None and p["duration"] > 0 for p in probes)
+                  and len({p["signature"] for p in probes}) == 1)
+    if smart_copy:
+        durations = [p["duration"] for p in probes]
+    else:
+        durations = []
+        for fp in file_paths:
+            # 元数据已在 _probe_island_videos 中缓存
+            duration = _get_video_duration(fp)
+            if duration <= 0:
+                raise ValueError(f"无法获取视频时长: {fp}")
+            durations.append(duration)
+
     transition_times = []
     for i in range(len(file_paths) - 1):
         max_duration = min(
@@ -1382,14 +1600,34 @@ def combine_full_video_xfade_islands(video_clip_path: str, trans_time: float = 1
 
     output_path = os.path.join(video_clip_path, "final_output.mp4")
     temp_dir = os.path.join(video_clip_path, temp_dir_name)
-    if os.path.exists(temp_dir):
-        shutil.rmtree(temp_dir)
-    os.makedirs(temp_dir, exist_ok=True)
-
-    generated_segments = []
-    success = False
-    try:
-        segment_index = 0
+    workers = _island_worker_count(codec, 2 * len(file_paths) - 1, max_workers)
+
+    def body_copy_range(i, body_start, body_end):
+        """主体部分的切分帧均为关键帧时返回流拷贝的 (起点, 终点) 时间戳，否则返回 None"""
+        keyframes = probes[i]["keyframes"]
+        copy_start = _keyframe_at_cut(keyframes, body_start, video_fps)
+        if body_end >= durations[i] - frame_epsilon / 2:
+            copy_end = durations[i]
+        else:
+            copy_end = _keyframe_at_cut(keyframes, body_end, video_fps)
+        if copy_start is None or copy_end is None:
+            return None
+        return copy_start, copy_end
+
+    def build_segments(copy_bodies: bool) -> list:
+        """
+        生成全部临时片段；copy_bodies 时重编码部分使用与片段相同的编码参数。
+        各临时片段互不依赖，先按拼接顺序规划，再并行生成。
+        """
+        if os.path.exists(temp_dir):
+            shutil.rmtree(temp_dir)
+        os.makedirs(temp_dir, exist_ok=True)
+        primary_args = None
+        if copy_bodies:
+            from utils.AccelRenderer import get_ffmpeg_encoder_args
+            primary_args = get_ffmpeg_encoder_args(codec or 'libx264', bitrate)
+        # 任务顺序即最终 concat 顺序
+        tasks = []
         for i, file_path in enumerate(file_paths):
             left_transition = transition_times[i - 1] if i > 0 else 0.0
             right_transition = transition_times[i] if i < len(transition_times) else 0.0
@@ -1398,46 +1636,67 @@ def combine_full_video_xfade_islands(video_clip_path: str, trans_time: float = 1
             body_duration = body_end - body_start
 
             if body_duration > frame_epsilon:
-                body_path = os.path.join(temp_dir, f"{segment_index:04d}_body_{i:04d}.mp4")
-                print(f"[Island] 生成主体片段 {i + 1}/{len(file_paths)}: "
-                      f"start={body_start:.3f}, duration={body_duration:.3f}")
-                _render_xfade_body_segment(
-                    file_path,
-                    body_start,
-                    body_duration,
-                    body_path,
-                    codec,
-                    bitrate,
-                    video_fps,
-                    f"主体片段 {i + 1}"
-                )
-                generated_segments.append(body_path)
-                segment_index += 1
+                body_path = os.path.join(temp_dir, f"{len(tasks):04d}_body_{i:04d}.mp4")
+                copy_range = body_copy_range(i, body_start, body_end) if copy_bodies else None
+                if copy_range:
+                    copy_start, copy_end = copy_range
+                    stage = f"主体片段 {i + 1} 流拷贝"
+                    print(f"[Island] 流拷贝主体片段 {i + 1}/{len(file_paths)}: "
+                          f"start={copy_start:.3f}, duration={copy_end - copy_start:.3f}")
+                    tasks.append(_IslandTask(body_path, stage, functools.partial(
+                        _copy_xfade_body_segment, file_path, copy_start, copy_end - copy_start,
+                        body_path, video_fps, stage), encoded=False))
+                else:
+                    stage = f"主体片段 {i + 1}"
+                    print(f"[Island] 生成主体片段 {i + 1}/{len(file_paths)}: "
+                          f"start={body_start:.3f}, duration={body_duration:.3f}")
+                    tasks.append(_IslandTask(body_path, stage, functools.partial(
+                        _render_xfade_body_segment, file_path, body_start, body_duration, body_path,
+                        codec, bitrate, video_fps, stage, primary_args)))
             else:
                 print(f"[Island] 跳过过短主体片段 {i + 1}: duration={body_duration:.3f}")
 
             if i < len(file_paths) - 1:
                 transition_duration = transition_times[i]
                 if transition_duration > frame_epsilon:
-                    transition_path = os.path.join(temp_dir, f"{segment_index:04d}_transition_{i:04d}_{i + 1:04d}.mp4")
+                    transition_path = os.path.join(temp_dir, f"{len(tasks):04d}_transition_{i:04d}_{i + 1:04d}.mp4")
                     left_start = durations[i] - transition_duration
+                    stage = f"转场 {i + 1}->{i + 2}"
                     print(f"[Island] 生成转场 {i + 1}->{i + 2}: duration={transition_duration:.3f}")
-                    _render_xfade_transition_segment(
-                        file_path,
-                        file_paths[i + 1],
-                        left_start,
-                        transition_duration,
-                        transition_path,
-                        codec,
-                        bitrate,
-                        video_fps,
-                        f"转场 {i + 1}->{i + 2}"
-                    )
-                    generated_segments.append(transition_path)
-                    segment_index += 1
+                    tasks.append(_IslandTask(transition_path, stage, functools.partial(
+                        _render_xfade_transition_segment, file_path, file_paths[i + 1], left_start,
+                        transition_duration, transition_path, codec, bitrate, video_fps, stage,
+                        primary_args)))
                 else:
                     print(f"[Island] 片段 {i + 1}->{i + 2} 太短，退化为无转场拼接")
 
+        _run_island_tasks(tasks, workers)
+
+        if copy_bodies:
+            # 重编码部分的码流参数必须与流拷贝的主体完全一致，否则拼接后的码流无法正确解码
+            signature = probes[0]["signature"]
+            for task in tasks:
+                if not task.encoded:
+                    continue
+                probe = _probe_island_video(task.path, with_keyframes=False)
+                if probe is None or probe["signature"] != signature:
+                    raise _IslandCopyMismatch(os.path.basename(task.path))
+            copied = sum(1 for task in tasks if not task.encoded)
+            print(f"[Island] 流拷贝主体片段 {copied}/{len(file_paths)} 个")
+        return [task.path for task in tasks]
+
+    generated_segments = []
+    success = False
+    try:
+        if smart_copy:
+            try:
+                generated_segments = build_segments(copy_bodies=True)
+            except _IslandCopyMismatch as e:
+                print(f"[Island] 重编码片段 {e} 的编码参数与原片段不一致，改为全部重编码")
+                smart_copy = False
+        if not smart_copy:
+            generated_segments = build_segments(copy_bodies=False)
+
         if not generated_segments:
             raise RuntimeError("transition island 未生成任何有效临时片段")
 
@@ -1454,27 +1713,9 @@ def combine_full_video_xfade_islands(video_clip_path: str, trans_time: float = 1
             shutil.rmtree(temp_dir)
 
 
-def _combine_with_xfade(video_clip_path: str, sorted_files: list,
-                         output_path: str, trans_time: float,
-                         codec: str = None, bitrate: str = "5000k",
-                         video_fps: int = 60):
-    """使用 FFmpeg xfade 滤镜拼接视频片段（带淡入淡出转场）
-    
-    Args:
-        codec: 硬件编码器名称（如 'h264_nvenc'），为 None 时使用 libx264 软编码
-        bitrate: 硬件编码使用的目标码率
-    """
-    print(f"[Info] 使用 xfade 转场拼接 ({trans_time}s)")
-    file_paths = [os.path.join(video_clip_path, f) for f in sorted_files]
-
-    # 获取每个片段的时长
-    durations = []
-    for fp in file_paths:
-        d = _get_video_duration(fp)
-        if d <= 0:
-            raise ValueError(f"无法获取视频时长: {fp}")
-        durations.append(d)
-
+def _xfade_chain_cmd(file_paths: list, durations: list, output_path: str, trans_time: float,
+                     encoder_args: list, audio_args: list, video_fps: int) -> list:
+    """构建把 file_paths 依次 xfade + acrossfade 拼接为 output_path 的 FFmpeg 命令"""
     n = len(file_paths)
 
     # 构建 FFmpeg 输入参数
@@ -1534,6 +1775,90 @@ def _combine_with_xfade(video_clip_path: str, sorted_files: list,
     filter_complex = ";".join(filter_parts)
     cmd += ['-filter_complex', filter_complex]
     cmd += ['-map', '[vout]', '-map', '[aout]']
+    cmd += encoder_args
+    cmd += audio_args
+    cmd += [output_path]
+    return cmd
+
+
+# 合并树中间层：视觉无损 x264 + PCM 音频（mkv），多层重编码不累积画质损失与 AAC 编码延迟
+_XFADE_TREE_VIDEO_ARGS = ['-c:v', 'libx264', '-preset', 'ultrafast', '-crf', '10', '-pix_fmt', 'yuv420p']
+_XFADE_TREE_AUDIO_ARGS = ['-c:a', 'pcm_s16le']
+
+
+def _combine_with_xfade_tree(file_paths: list, durations: list, output_path: str, trans_time: float,
+                             encoder_args: list, video_fps: int, temp_dir: str,
+                             max_workers: int = None):
+    """
+    平衡二叉合并树：每一层把相邻的两个片段 xfade 合并为一个中间文件（最后剩余的单个片段直接进入下一层），
+    直到只剩两个片段时以最终编码参数输出。每个 FFmpeg 进程只打开两个输入，滤镜链深度为 1，
+    共 O(log N) 层；同一层的合并互不依赖，并行执行。
+    """
+    if os.path.exists(temp_dir):
+        shutil.rmtree(temp_dir)
+    os.makedirs(temp_dir, exist_ok=True)
+    try:
+        level = 0
+        nodes = list(zip(file_paths, durations))
+        while len(nodes) > 2:
+            level += 1
+            tasks = []
+            next_nodes = []
+            for k in range(0, len(nodes) - 1, 2):
+                (left, left_duration), (right, right_duration) = nodes[k], nodes[k + 1]
+                merged = os.path.join(temp_dir, f"level{level:02d}_{k // 2:04d}.mkv")
+                cmd = _xfade_chain_cmd([left, right], [left_duration, right_duration], merged, trans_time,
+                                       _XFADE_TREE_VIDEO_ARGS, _XFADE_TREE_AUDIO_ARGS, video_fps)
+                stage = f"合并树第 {level} 层 #{k // 2 + 1}"
+                tasks.append(_IslandTask(merged, stage, functools.partial(_run_subprocess_checked, cmd, stage)))
+                next_nodes.append((merged, None))
+            if len(nodes) % 2:
+                next_nodes.append(nodes[-1])
+            print(f"[Info] xfade 合并树第 {level} 层: {len(nodes)} → {len(next_nodes)} 个片段")
+            _run_island_tasks(tasks, _island_worker_count('libx264', len(tasks), max_workers))
+            # 以实际输出的时长计算下一层的 offset
+            nodes = []
+            for path, duration in next_nodes:
+                if duration is None:
+                    duration = _get_video_duration(path)
+                    if duration <= 0:
+                        raise ValueError(f"无法获取视频时长: {path}")
+                nodes.append((path, duration))
+
+        cmd = _xfade_chain_cmd([path for path, _ in nodes], [duration for _, duration in nodes], output_path,
+                               trans_time, encoder_args, ['-c:a', 'aac', '-b:a', '192k'], video_fps)
+        _run_subprocess_checked(cmd, "合并树最终输出")
+    finally:
+        # 失败时同样清理中间文件，避免 xfade_tree_tmp 残留
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+def _combine_with_xfade(video_clip_path: str, sorted_files: list,
+                         output_path: str, trans_time: float,
+                         codec: str = None, bitrate: str = "5000k",
+                         video_fps: int = 60, merge_tree: bool = True,
+                         max_workers: int = None):
+    """使用 FFmpeg xfade 滤镜拼接视频片段（带淡入淡出转场）
+    
+    Args:
+        codec: 硬件编码器名称（如 'h264_nvenc'），为 None 时使用 libx264 软编码
+        bitrate: 硬件编码使用的目标码率
+        merge_tree: True 时使用平衡二叉合并树（见 _combine_with_xfade_tree），每个进程只打开两个输入；
+            False 时所有片段在同一个滤镜图中串联，解码器数量与内存随片段数增长
+        max_workers: 合并树同一层的并行合并数，None 时按核心数决定
+    """
+    print(f"[Info] 使用 xfade 转场拼接 ({trans_time}s)")
+    file_paths = [os.path.join(video_clip_path, f) for f in sorted_files]
+
+    # 获取每个片段的时长（带缓存，未命中的片段并发探测）
+    from utils.ProbeCache import probe_media_batch
+    durations = []
+    for fp, info in zip(file_paths, probe_media_batch(file_paths)):
+        d = info["duration"] if info else 0.0
+        if d <= 0:
+            raise ValueError(f"无法获取视频时长: {fp}")
+        durations.append(d)
+
     # 使用硬件编码器（如 NVENC）或回退到 libx264 软编码
     if codec and codec != 'libx264':
         try:
@@ -1545,11 +1870,14 @@ def _combine_with_xfade(video_clip_path: str, sorted_files: list,
             print("[Info] xfade 硬件编码器不可用，回退到 libx264")
     else:
         encoder_args = ['-c:v', 'libx264', '-preset', 'fast', '-crf', '18']
-    cmd += encoder_args
-    cmd += ['-c:a', 'aac', '-b:a', '192k']
-    cmd += [output_path]
 
-    subprocess.run(cmd, check=True)
+    if merge_tree and len(file_paths) > 2:
+        _combine_with_xfade_tree(file_paths, durations, output_path, trans_time, encoder_args, video_fps,
+                                 os.path.join(video_clip_path, "xfade_tree_tmp"), max_workers)
+    else:
+        cmd = _xfade_chain_cmd(file_paths, durations, output_path, trans_time, encoder_args,
+                               ['-c:a', 'aac', '-b:a', '192k'], video_fps)
+        subprocess.run(cmd, check=True)
     print("视频拼接完成（含转场效果）")
     return output_path
 
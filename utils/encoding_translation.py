@@ -1,5 +1,4 @@
 import subprocess
-import json
 from pathlib import Path
 
 def get_video_codec(file_path: str) -> str:
@@ -12,26 +11,12 @@ def get_video_codec(file_path: str) -> str:
     Returns:
         str: 视频编码格式，如果获取失败则返回空字符串
     """
-    try:
-        cmd = [
-            'ffprobe',
-            '-v', 'error',  # 只显示错误信息
-            '-select_streams', 'v:0',
-            '-show_entries', 'stream=codec_name',
-            '-of', 'json',
-            str(file_path)
-        ]
-        result = subprocess.run(
-            cmd,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True
-        )
-        data = json.loads(result.stdout)
-        return data['streams'][0]['codec_name']
-    except Exception as e:
-        print(f"获取视频编码信息失败: {str(e)}")
+    from utils.ProbeCache import probe_media
+    info = probe_media(str(file_path))
+    if not info or not info.get('video_codec'):
+        print(f"获取视频编码信息失败: {file_path}")
         return ""
+    return info['video_codec']
 
 def needs_conversion(file_path: Path) -> bool:
     """
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Test script for crop-then-resize in AccelRenderer.
+
+Resizing only the cropped source window must match resizing the whole frame
+and cropping afterwards within 1 LSB: OpenCV's fixed-point interpolation
+coefficients for a few rows/columns round differently once the source offset changes.
+"""
+
+import os
+import sys
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+OUTPUT_RESOLUTION = (1920, 1080)
+MAX_DIFF = 1
+
+
+class _SourceGeometry:
+    """compute_video_crop_and_size only reads width / height"""
+
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+
+
+def _import_renderer():
+    try:
+        from utils import AccelRenderer
+    except ImportError as e:
+        print(f"AccelRenderer dependencies are not installed ({e}), skipping")
+        return None
+    return AccelRenderer
+
+
+def _resize_then_crop(frame, target_size, crop_rect):
+    """Original order in the render loop: resize the whole frame, then slice"""
+    resized = cv2.resize(frame, target_size)
+    if crop_rect:
+        x1, y1, x2, y2 = crop_rect
+        resized = resized[max(0, y1):min(resized.shape[0], y2), max(0, x1):min(resized.shape[1], x2)]
+    return resized
+
+
+def _check_sources(renderer, game_type, sources):
+    rng = np.random.default_rng(0)
+    worst, mismatched = 0, 0
+    for src_w, src_h in sources:
+        frame = rng.integers(0, 256, (src_h, src_w, 3), dtype=np.uint8)
+        target_size, crop_rect, _ = renderer.compute_video_crop_and_size(
+            game_type, _SourceGeometry(src_w, src_h), OUTPUT_RESOLUTION)
+        plan = renderer.plan_crop_resize((src_w, src_h), target_size, crop_rect)
+        actual = renderer.apply_crop_resize(frame, plan)
+        expected = _resize_then_crop(frame, target_size, crop_rect)
+        assert actual.shape == expected.shape, f"{src_w}x{src_h}: shape {actual.shape} != {expected.shape}"
+        diff = int(np.abs(actual.astype(np.int16) - expected.astype(np.int16)).max())
+        assert diff <= MAX_DIFF, f"{game_type} {src_w}x{src_h}: max diff {diff} > {MAX_DIFF}"
+        worst = max(worst, diff)
+        mismatched += diff > 0
+    print(f"  {game_type}: {len(sources)} sources, {mismatched} off by 1 LSB, max diff {worst}")
+
+
+def test_portrait_sources():
+    """Portrait sources (maimai vertical crop), where a few rows differ by 1 LSB"""
+    renderer = _import_renderer()
+    if renderer is None:
+        return
+    print("Testing crop-then-resize on portrait sources...")
+    sources = [(w, h) for w in range(360, 1081, 80) for h in range(w + 60, 2 * w + 1, 60)]
+    _check_sources(renderer, "maimai", sources)
+
+
+def test_landscape_sources():
+    """Landscape sources for both crop modes"""
+    renderer = _import_renderer()
+    if renderer is None:
+        return
+    print("Testing crop-then-resize on landscape sources...")
+    sources = [(1280, 720), (1920, 1080), (2560, 1440), (1440, 1080), (2560, 1080), (854, 480)]
+    _check_sources(renderer, "maimai", sources)
+    _check_sources(renderer, "chunithm", sources)
+
+
+if __name__ == "__main__":
+    test_portrait_sources()
+    test_landscape_sources()
+    print("All crop resize tests passed")
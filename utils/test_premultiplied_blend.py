@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Test script for the fixed-point premultiplied blending in TaichiAccel.
+
+The integer kernels must match the float32 compositing path within 1 LSB.
+"""
+
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils import TaichiAccel  # noqa: E402
+from utils.CpuAccel import build_static_plate, build_video_overlay  # noqa: E402
+
+OUT_W, OUT_H = 640, 360
+VIDEO_POS, VIDEO_SIZE = (40, 30), (300, 220)
+TEXT_POS = (200, 180)
+BG_BRIGHTNESS = 0.8
+MAX_DIFF = 1
+
+
+def _random_rgba(rng, h, w):
+    """RGBA with fully transparent, fully opaque and partial alpha regions"""
+    image = rng.integers(0, 256, (h, w, 4), dtype=np.uint8)
+    alpha = image[:, :, 3]
+    alpha[:, : w // 3] = 0
+    alpha[:, w // 3: w // 2] = 255
+    return image
+
+
+def _make_layers(seed=0):
+    rng = np.random.default_rng(seed)
+    bg = rng.integers(0, 256, (OUT_H, OUT_W, 3), dtype=np.uint8)
+    video = rng.integers(0, 256, (VIDEO_SIZE[1], VIDEO_SIZE[0], 3), dtype=np.uint8)
+    score = _random_rgba(rng, OUT_H, OUT_W)
+    text = _random_rgba(rng, 150, 400)
+    return bg, video, score, text
+
+
+def _blend_f32(dst, overlay, pos):
+    oh, ow = overlay.shape[:2]
+    x, y = pos
+    x2, y2 = min(dst.shape[1], x + ow), min(dst.shape[0], y + oh)
+    mask = overlay[:y2 - y, :x2 - x, 3:].astype(np.float32) / 255.0
+    region = dst[y:y2, x:x2]
+    region[:] = region * (1.0 - mask) + overlay[:y2 - y, :x2 - x, :3].astype(np.float32) * mask
+
+
+def _reference_five_layer(bg, video, score, text, brightness):
+    """float32 reference of _five_layer_fast_kernel"""
+    out = bg.astype(np.float32) * np.float32(BG_BRIGHTNESS)
+    vx, vy = VIDEO_POS
+    out[vy:vy + video.shape[0], vx:vx + video.shape[1]] = video
+    _blend_f32(out, score, (0, 0))
+    _blend_f32(out, text, TEXT_POS)
+    return np.clip(out * np.float32(brightness), 0, 255).astype(np.uint8)
+
+
+def _max_diff(a, b):
+    return int(np.abs(a.astype(np.int16) - b.astype(np.int16)).max())
+
+
+def _check(name, actual, expected):
+    diff = _max_diff(actual, expected)
+    print(f"  {name}: max diff {diff}")
+    assert diff <= MAX_DIFF, f"{name}: max diff {diff} > {MAX_DIFF}"
+
+
+def _ensure_taichi():
+    if not TaichiAccel.TAICHI_AVAILABLE:
+        print("Taichi is not installed, skipping")
+        return False
+    # CPU backend: available everywhere, and the integer kernels give identical results on every backend
+    TaichiAccel.init_taichi(arch=TaichiAccel.ti.cpu)
+    return TaichiAccel.is_available()
+
+
+def test_five_layer_full_frame():
+    """Full-frame compositing (dynamic background path)"""
+    if not _ensure_taichi():
+        return
+    print("Testing full-frame five layer blend...")
+    bg, video, score, text = _make_layers(1)
+    compositor = TaichiAccel.FrameCompositor(bg, score, text, VIDEO_POS, TEXT_POS,
+                                             BG_BRIGHTNESS, (OUT_W, OUT_H))
+    for brightness in (1.0, 0.37, 0.0):
+        expected = _reference_five_layer(bg, video, score, text, brightness)
+        _check(f"brightness={brightness}", compositor.composite(video, brightness), expected)
+
+    float_kernel = TaichiAccel.composite_five_layers(bg, video, score, text, VIDEO_POS, TEXT_POS,
+                                                      BG_BRIGHTNESS, (OUT_W, OUT_H))
+    _check("vs float kernel", compositor.composite(video), float_kernel)
+
+
+def test_static_plate():
+    """Static plate mode, including fade frames"""
+    if not _ensure_taichi():
+        return
+    print("Testing static plate blend...")
+    bg, video, score, text = _make_layers(2)
+    compositor = TaichiAccel.FrameCompositor(bg, score, text, VIDEO_POS, TEXT_POS,
+                                             BG_BRIGHTNESS, (OUT_W, OUT_H), static_plate=True)
+    plate = build_static_plate(bg, score, text, TEXT_POS, BG_BRIGHTNESS, (OUT_W, OUT_H))
+    premul, inv, (x1, y1, x2, y2) = build_video_overlay(score, text, VIDEO_POS, VIDEO_SIZE,
+                                                        TEXT_POS, (OUT_W, OUT_H))
+    vx, vy = VIDEO_POS
+    region = video[y1 - vy:y2 - vy, x1 - vx:x2 - vx].astype(np.float32) * inv[:, :, np.newaxis] + premul
+    expected = plate.copy()
+    expected[y1:y2, x1:x2] = np.clip(region, 0, 255).astype(np.uint8)
+
+    for brightness in (1.0, 0.5, 0.83, 1.0):
+        faded = np.clip(expected.astype(np.float32) * np.float32(brightness), 0, 255).astype(np.uint8)
+        _check(f"brightness={brightness}", compositor.composite(video, brightness), faded)
+
+
+def test_batch_mixed_then_uniform():
+    """A mixed-size batch (per-frame fallback) followed by a uniform batch on the plate path"""
+    if not _ensure_taichi():
+        return
+    print("Testing mixed-size batch followed by uniform batch...")
+    bg, video, score, text = _make_layers(4)
+    small = video[: VIDEO_SIZE[1] // 2, : VIDEO_SIZE[0] // 2].copy()
+    compositor = TaichiAccel.FrameCompositor(bg, score, text, VIDEO_POS, TEXT_POS,
+                                             BG_BRIGHTNESS, (OUT_W, OUT_H), static_plate=True)
+    reference = TaichiAccel.FrameCompositor(bg, score, text, VIDEO_POS, TEXT_POS,
+                                            BG_BRIGHTNESS, (OUT_W, OUT_H), static_plate=True)
+    mixed = compositor.composite_batch([video, small, video, video])
+    _check("mixed batch", mixed[1], reference.composite(small))
+    uniform = compositor.composite_batch([video] * 4)
+    expected = reference.composite(video)
+    for n in range(4):
+        _check(f"uniform batch frame {n}", uniform[n], expected)
+
+
+def test_info_and_alpha_composite():
+    """Info segment compositor and the standalone alpha_composite"""
+    if not _ensure_taichi():
+        return
+    print("Testing info compositor and alpha_composite...")
+    bg, _, text_bg, text = _make_layers(3)
+    compositor = TaichiAccel.InfoFrameCompositor(text_bg, text, TEXT_POS, bg_dim=0.75,
+                                                 output_size=(OUT_W, OUT_H))
+    for brightness in (1.0, 0.61):
+        out = bg.astype(np.float32) * np.float32(0.75)
+        _blend_f32(out, text_bg, (0, 0))
+        _blend_f32(out, text, TEXT_POS)
+        expected = np.clip(out * np.float32(brightness), 0, 255).astype(np.uint8)
+        _check(f"info brightness={brightness}", compositor.composite(bg, brightness), expected)
+
+    out = bg.astype(np.float32)
+    _blend_f32(out, text, TEXT_POS)
+    expected = np.clip(out * np.float32(0.9), 0, 255).astype(np.uint8)
+    _check("alpha_composite", TaichiAccel.alpha_composite(bg, text, TEXT_POS, brightness=0.9), expected)
+
+
+if __name__ == "__main__":
+    test_five_layer_full_frame()
+    test_static_plate()
+    test_batch_mixed_then_uniform()
+    test_info_and_alpha_composite()
+    print("All premultiplied blend tests passed")
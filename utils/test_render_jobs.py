@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Test script for the job descriptions built by render_all_clips_accel.
+
+Process workers each hold their own background frame cache, so the configured
+budget must be split across them instead of being given to every worker in full.
+"""
+
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+BG_CACHE_MB = 1024
+CLIP_COUNT = 3
+
+
+def _import_renderer():
+    try:
+        from utils import AccelRenderer
+    except ImportError as e:
+        print(f"AccelRenderer dependencies are not installed ({e}), skipping")
+        return None
+    return AccelRenderer
+
+
+def _collect_jobs(renderer, max_workers, parallel_mode):
+    """Run render_all_clips_accel with rendering replaced by a recorder, return the submitted jobs"""
+    submitted = []
+
+    def run_parallel(jobs, workers, mode, total_clips, progress_callback=None):
+        submitted.extend(jobs)
+        return {job['clip_index']: {"status": "success", "info": "", "elapsed": 0.0} for job in jobs}
+
+    from utils.FrameCache import configure_frame_cache, get_frame_cache
+
+    original = renderer.detect_hw_encoder, renderer._run_clip_jobs_parallel
+    original_budget_mb = get_frame_cache().budget_bytes // (1024 * 1024)
+    renderer.detect_hw_encoder = lambda: ("libx264", "libx264")
+    renderer._run_clip_jobs_parallel = run_parallel
+    try:
+        with tempfile.TemporaryDirectory() as output_dir:
+            configs = [{"clip_title_name": f"clip{n}"} for n in range(CLIP_COUNT)]
+            renderer.render_all_clips_accel("maimai", {}, configs, output_dir, (1920, 1080), "5000k",
+                                            max_workers=max_workers, parallel_mode=parallel_mode,
+                                            bg_cache_mb=BG_CACHE_MB, force_render=True)
+    finally:
+        renderer.detect_hw_encoder, renderer._run_clip_jobs_parallel = original
+        configure_frame_cache(original_budget_mb)
+    return submitted
+
+
+def test_process_workers_split_cache_budget():
+    """Each process worker gets an equal share of the background cache budget"""
+    renderer = _import_renderer()
+    if renderer is None:
+        return
+    print("Testing per-job cache budget in process mode...")
+    jobs = _collect_jobs(renderer, 2, "process")
+    assert len(jobs) == CLIP_COUNT
+    for job in jobs:
+        assert job['bg_cache_mb'] == BG_CACHE_MB // 2, f"{job['file_stem']}: {job['bg_cache_mb']} MB"
+
+
+def test_thread_workers_share_cache_budget():
+    """Thread workers share the main process cache, so every job carries the full budget"""
+    renderer = _import_renderer()
+    if renderer is None:
+        return
+    print("Testing per-job cache budget in thread mode...")
+    jobs = _collect_jobs(renderer, 2, "thread")
+    assert len(jobs) == CLIP_COUNT
+    for job in jobs:
+        assert job['bg_cache_mb'] == BG_CACHE_MB, f"{job['file_stem']}: {job['bg_cache_mb']} MB"
+
+
+if __name__ == "__main__":
+    test_process_workers_split_cache_budget()
+    test_thread_workers_share_cache_budget()
+    print("All render job tests passed")